@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+"""Measure event-loop lag under mixed vector search and LLM generate load.
+
+Runs the same workload twice: once calling the blocking QdrantClient inside
+async code (the old QdrantService behaviour) and once through the current
+non-blocking QdrantService. A ticker task sleeps for --tick seconds in a loop
+and records how late it wakes up; that delay is time the loop spent blocked.
+
+    python scripts/bench_event_loop_lag.py --searches 2000 --generates 20
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from qdrant_client import QdrantClient  # noqa: E402
+from qdrant_client.http import models  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.services.ai.ollama_service import OllamaService  # noqa: E402
+from app.services.vector.qdrant_service import QdrantService  # noqa: E402
+
+COLLECTION = "bench_event_loop_lag"
+
+async def ticker(lags, stop: asyncio.Event, tick: float):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(tick)
+        lags.append(max(0.0, loop.time() - start - tick) * 1000)
+
+async def run(mode: str, args) -> dict:
+    dim = args.dim
+    if mode == "sync":
+        client = QdrantClient(host=settings.QDRANT_HOST, port=settings.QDRANT_PORT)
+
+        async def search(vector):
+            # Blocking call inside an async def, as QdrantService used to do
+            client.search(collection_name=COLLECTION, query_vector=vector, limit=5)
+    else:
+        service = QdrantService()
+
+        async def search(vector):
+            await service.search_vectors(COLLECTION, vector, limit=5)
+
+    ollama = OllamaService()
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def bounded(coro):
+        async with semaphore:
+            await coro
+
+    async def generate():
+        try:
+            async for _ in ollama.stream_text(
+                args.prompt, options={"num_predict": args.tokens}
+            ):
+                pass
+        except Exception as e:
+            print(f"generate failed: {e}", file=sys.stderr)
+
+    lags = []
+    stop = asyncio.Event()
+    tick_task = asyncio.create_task(ticker(lags, stop, args.tick))
+
+    started = time.perf_counter()
+    jobs = [
+        bounded(search([random.random() for _ in range(dim)]))
+        for _ in range(args.searches)
+    ] + [generate() for _ in range(args.generates)]
+    random.shuffle(jobs)
+    await asyncio.gather(*jobs)
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await tick_task
+    await ollama.cleanup()
+    if mode == "sync":
+        client.close()
+    else:
+        await service.cleanup()
+
+    lags.sort()
+    return {
+        "mode": mode,
+        "elapsed_s": round(elapsed, 2),
+        "lag_p50_ms": round(statistics.median(lags), 2) if lags else 0.0,
+        "lag_p99_ms": round(lags[int(len(lags) * 0.99) - 1], 2) if lags else 0.0,
+        "lag_max_ms": round(lags[-1], 2) if lags else 0.0,
+    }
+
+def seed(dim: int, points: int):
+    client = QdrantClient(host=settings.QDRANT_HOST, port=settings.QDRANT_PORT)
+    client.recreate_collection(
+        collection_name=COLLECTION,
+        vectors_config=models.VectorParams(size=dim, distance=models.Distance.COSINE)
+    )
+    for start in range(0, points, 1000):
+        client.upsert(
+            collection_name=COLLECTION,
+            points=[
+                models.PointStruct(id=i, vector=[random.random() for _ in range(dim)])
+                for i in range(start, min(start + 1000, points))
+            ]
+        )
+    return client
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--points", type=int, default=10000)
+    parser.add_argument("--searches", type=int, default=1000)
+    parser.add_argument("--generates", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--tokens", type=int, default=64)
+    parser.add_argument("--tick", type=float, default=0.005)
+    parser.add_argument("--prompt", default="Write a haiku about event loops.")
+    parser.add_argument("--mode", choices=["sync", "async", "both"], default="both")
+    args = parser.parse_args()
+
+    client = seed(args.dim, args.points)
+    try:
+        modes = ["sync", "async"] if args.mode == "both" else [args.mode]
+        for mode in modes:
+            print(asyncio.run(run(mode, args)))
+    finally:
+        client.delete_collection(COLLECTION)
+        client.close()
+
+if __name__ == "__main__":
+    main()
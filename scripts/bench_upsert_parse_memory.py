@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""Compare peak memory and time of parsing /vector/vectors/upsert bodies.
+
+Encodes the same random batch as JSON, .npy, raw float32 and (if msgpack
+is installed) msgpack, then parses each the way the endpoint does and
+reports the tracemalloc peak and wall time. A second pass also builds the
+Qdrant upsert request from the parsed batch: through qdrant-client's
+models.Batch for JSON lists and for the old tolist() path, and with
+build_upsert_body for float32 matrices. No Qdrant needed.
+
+    python scripts/bench_upsert_parse_memory.py --rows 10000 --dim 1024
+"""
+import argparse
+import io
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import orjson
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from qdrant_client.http import models  # noqa: E402
+
+from app.api.v1.endpoints.vector import VectorUpsertRequest  # noqa: E402
+from app.services.vector.client import build_upsert_body  # noqa: E402
+from app.api.ingest import _msgpack_available, decode_msgpack, decode_npy  # noqa: E402
+from app.utils.vectors import decode_vectors  # noqa: E402
+
+def measure(name: str, parse, body: bytes) -> None:
+    parse(body)  # warm up lazy imports so they are not counted
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = parse(body)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    print(f"{name:<10} body {len(body) / 2**20:8.1f} MiB  peak {peak / 2**20:8.1f} MiB  {elapsed * 1000:8.1f} ms")
+
+def models_body(ids, vectors, payloads) -> bytes:
+    """The body qdrant-client sends: a validated Batch of Python float lists."""
+    vectors = vectors.tolist() if isinstance(vectors, np.ndarray) else vectors
+    batch = models.PointsBatch(batch=models.Batch(ids=ids, vectors=vectors, payloads=payloads))
+    return batch.model_dump_json(exclude_none=True).encode()
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--dim", type=int, default=1024)
+    args = parser.parse_args()
+
+    matrix = np.random.default_rng(0).random((args.rows, args.dim), dtype=np.float32)
+    payloads = [{"i": i} for i in range(args.rows)]
+    ids = list(range(args.rows))
+
+    json_body = orjson.dumps(
+        {"collection_name": "bench", "vectors": matrix, "payloads": payloads},
+        option=orjson.OPT_SERIALIZE_NUMPY
+    )
+    npy = io.BytesIO()
+    np.save(npy, matrix)
+    raw = matrix.tobytes()
+
+    print("parse only")
+    measure("json", VectorUpsertRequest.model_validate_json, json_body)
+    measure("npy", decode_npy, npy.getvalue())
+    measure("raw", lambda body: decode_vectors(body, "float32", args.dim), raw)
+    if _msgpack_available():
+        import msgpack
+        msgpack_body = msgpack.packb({
+            "collection_name": "bench",
+            "vectors": matrix.tobytes(),
+            "dim": args.dim,
+            "payloads": payloads
+        })
+        measure("msgpack", decode_msgpack, msgpack_body)
+
+    print("parse + upsert request body")
+    measure(
+        "json",
+        lambda body: models_body(ids, VectorUpsertRequest.model_validate_json(body).vectors, payloads),
+        json_body
+    )
+    measure("npy+list", lambda body: models_body(ids, decode_npy(body), payloads), npy.getvalue())
+    measure("npy", lambda body: build_upsert_body(ids, decode_npy(body), payloads), npy.getvalue())
+    measure(
+        "raw",
+        lambda body: build_upsert_body(ids, decode_vectors(body, "float32", args.dim), payloads),
+        raw
+    )
+
+if __name__ == "__main__":
+    main()
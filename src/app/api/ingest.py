@@ -0,0 +1,97 @@
+from typing import Any, Dict, List, Optional
+from dataclasses import dataclass
+from fastapi import HTTPException, Request
+import io
+import numpy as np
+
+from .negotiation import OCTET_STREAM
+from ..utils.vectors import VECTOR_DTYPES, decode_vectors
+
+NPY = "application/x-npy"
+MSGPACK = ("application/msgpack", "application/x-msgpack")
+
+@dataclass
+class UpsertBody:
+    collection_name: str
+    vectors: Any
+    payloads: Optional[List[Dict[str, Any]]] = None
+    ids: Optional[List[Any]] = None
+
+def _msgpack_available() -> bool:
+    try:
+        import msgpack  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def decode_npy(data: bytes) -> np.ndarray:
+    """View a 2-D little-endian float32 .npy file as an array without copying it.
+
+    float16 files are widened to float32, which does copy.
+    """
+    f = io.BytesIO(data)
+    version = np.lib.format.read_magic(f)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+    else:
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+    if len(shape) != 2:
+        raise ValueError(f"Expected a 2-D array of vectors, got shape {shape}")
+    if dtype not in VECTOR_DTYPES.values():
+        raise ValueError(f"Unsupported .npy dtype {dtype}, expected little-endian float32 or float16")
+    matrix = np.frombuffer(data, dtype=dtype, count=shape[0] * shape[1], offset=f.tell())
+    matrix = matrix.reshape(shape[::-1]).T if fortran_order else matrix.reshape(shape)
+    return matrix.astype(np.float32, copy=False)
+
+def decode_msgpack(data: bytes) -> UpsertBody:
+    """Decode {"collection_name", "vectors", "payloads"?, "ids"?, "dim"?, "dtype"?}.
+
+    vectors is either raw little-endian float bytes with "dim" set, viewed
+    without copying, or an array of float arrays.
+    """
+    import msgpack
+
+    body = msgpack.unpackb(data, raw=False)
+    if not isinstance(body, dict) or "collection_name" not in body or "vectors" not in body:
+        raise ValueError("msgpack body must be a map with collection_name and vectors")
+    vectors = body["vectors"]
+    if isinstance(vectors, bytes):
+        if not body.get("dim"):
+            raise ValueError("dim is required when vectors are raw bytes")
+        vectors = decode_vectors(vectors, body.get("dtype", "float32"), body["dim"])
+    else:
+        vectors = np.asarray(vectors, dtype=np.float32)
+    return UpsertBody(body["collection_name"], vectors, body.get("payloads"), body.get("ids"))
+
+async def parse_upsert_body(request: Request, collection_name: Optional[str]) -> Optional[UpsertBody]:
+    """Parse a binary upsert body, or return None for JSON.
+
+    .npy and raw bodies carry only vectors: the collection comes from the
+    ?collection_name= query parameter and raw bodies need an X-Vector-Dim
+    header (and optionally X-Vector-Dtype), mirroring binary /embed
+    responses. Points get generated ids and empty payloads; send msgpack to
+    include them.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type not in (NPY, OCTET_STREAM, *MSGPACK):
+        return None
+    if content_type in MSGPACK and not _msgpack_available():
+        raise HTTPException(status_code=415, detail="msgpack bodies need the msgpack extra installed (autodev-commander[msgpack])")
+    if content_type not in MSGPACK and not collection_name:
+        raise HTTPException(status_code=400, detail="collection_name query parameter is required")
+
+    data = await request.body()
+    try:
+        if content_type in MSGPACK:
+            return decode_msgpack(data)
+        if content_type == NPY:
+            return UpsertBody(collection_name, decode_npy(data))
+        dim = int(request.headers.get("x-vector-dim", 0))
+        if dim <= 0:
+            raise ValueError("X-Vector-Dim header is required for raw vector bodies")
+        dtype = request.headers.get("x-vector-dtype", "float32")
+        if len(data) % (dim * VECTOR_DTYPES.get(dtype, VECTOR_DTYPES["float32"]).itemsize):
+            raise ValueError(f"Body length {len(data)} is not a whole number of {dim}-dim {dtype} vectors")
+        return UpsertBody(collection_name, decode_vectors(data, dtype, dim))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid {content_type} body: {e}")
@@ -0,0 +1,64 @@
+from typing import Any, Dict, Optional
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse
+import numpy as np
+
+from ..utils.vectors import VECTOR_DTYPES, encode_vectors, encode_vectors_b64
+
+OCTET_STREAM = "application/octet-stream"
+
+def negotiate_encoding(request: Request, encoding: Optional[str] = None) -> str:
+    """Pick the vector encoding: an explicit ?encoding= wins, then the Accept header."""
+    if encoding:
+        if encoding not in ("json", "base64", "binary"):
+            raise HTTPException(status_code=400, detail=f"Unsupported encoding {encoding}")
+        return encoding
+    if OCTET_STREAM in request.headers.get("accept", ""):
+        return "binary"
+    return "json"
+
+def check_dtype(dtype: str) -> str:
+    if dtype not in VECTOR_DTYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported dtype {dtype}, expected one of {', '.join(VECTOR_DTYPES)}"
+        )
+    return dtype
+
+def vectors_response(
+    vectors: np.ndarray,
+    field: str,
+    encoding: str,
+    dtype: str = "float32",
+    extra: Optional[Dict[str, Any]] = None
+) -> Response:
+    """Render a vector or matrix as JSON, base64-in-JSON or raw little-endian bytes.
+
+    Binary responses carry the shape in X-Vector-Count / X-Vector-Dim headers.
+    """
+    check_dtype(dtype)
+    matrix = vectors.reshape(1, -1) if vectors.ndim == 1 else vectors
+    count, dim = matrix.shape
+
+    if encoding == "binary":
+        return Response(
+            content=encode_vectors(matrix, dtype),
+            media_type=OCTET_STREAM,
+            headers={
+                "X-Vector-Count": str(count),
+                "X-Vector-Dim": str(dim),
+                "X-Vector-Dtype": dtype
+            }
+        )
+
+    if encoding == "base64":
+        content = {
+            field: encode_vectors_b64(vectors, dtype),
+            "encoding": "base64",
+            "dtype": dtype,
+            "count": count,
+            "dim": dim
+        }
+    else:
+        content = {field: vectors}
+    return ORJSONResponse({**content, **(extra or {})})
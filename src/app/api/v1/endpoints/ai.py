@@ -1,7 +1,215 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from typing import Any, AsyncIterator, Dict, List, Optional
+import hashlib
+import hmac
+import json
+from loguru import logger
+from ...negotiation import check_dtype, negotiate_encoding, vectors_response
+from ....core.config import settings
+from ....core.di import get_ollama_service
+from ....core.exceptions import AutoDevCommanderError
+from ....services.ai.admission import set_client_identity
+from ....services.ai.ollama_service import OllamaService
 
-router = APIRouter()
+async def identify_client(request: Request) -> str:
+    """Identify the caller for fair queueing by a configured API key, else by client IP.
+
+    Unrecognised keys are ignored: keying on them would let any caller mint
+    fresh identities and a fresh fair share per request.
+    """
+    api_key = request.headers.get("X-API-Key")
+    if api_key and any(
+        hmac.compare_digest(api_key.encode(), known.encode())
+        for known in settings.OLLAMA_CLIENT_API_KEYS
+    ):
+        identity = f"key:{hashlib.sha256(api_key.encode()).hexdigest()[:12]}"
+    else:
+        identity = request.client.host if request.client else "anonymous"
+    set_client_identity(identity)
+    return identity
+
+router = APIRouter(dependencies=[Depends(identify_client)])
 
 @router.get("/")
 async def ai_root():
-    return {"message": "AI endpoints"}
\ No newline at end of file
+    return {"message": "AI endpoints"}
+
+class EmbeddingRequest(BaseModel):
+    text: str
+
+class EmbeddingResponse(BaseModel):
+    embedding: List[float]
+
+class BatchEmbeddingRequest(BaseModel):
+    texts: List[str]
+
+class BatchEmbeddingResponse(BaseModel):
+    embeddings: List[List[float]]
+
+class GenerateRequest(BaseModel):
+    prompt: str
+    options: Optional[dict] = None
+    use_cache: bool = True
+    session_id: Optional[str] = None
+
+class GenerateResponse(BaseModel):
+    text: str
+
+@router.post("/embed", response_model=EmbeddingResponse)
+async def create_embedding(
+    request: EmbeddingRequest,
+    http_request: Request,
+    encoding: Optional[str] = None,
+    dtype: str = "float32",
+    ollama_service: OllamaService = Depends(get_ollama_service)
+):
+    """Embed one text.
+
+    Responds with JSON floats by default, base64 float bytes with
+    ?encoding=base64, or raw little-endian bytes with ?encoding=binary or
+    Accept: application/octet-stream. ?dtype=float16 halves the payload.
+    """
+    encoding = negotiate_encoding(http_request, encoding)
+    check_dtype(dtype)
+    try:
+        embedding = await ollama_service.get_embedding_array(request.text)
+        return vectors_response(embedding, "embedding", encoding, dtype)
+    except AutoDevCommanderError as e:
+        raise e.to_http_exception()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/embed/batch", response_model=BatchEmbeddingResponse)
+async def create_embeddings(
+    request: BatchEmbeddingRequest,
+    http_request: Request,
+    encoding: Optional[str] = None,
+    dtype: str = "float32",
+    ollama_service: OllamaService = Depends(get_ollama_service)
+):
+    """Embed many texts; supports the same encodings as /embed, row-major."""
+    encoding = negotiate_encoding(http_request, encoding)
+    check_dtype(dtype)
+    try:
+        embeddings = await ollama_service.get_embeddings_array(request.texts)
+        return vectors_response(embeddings, "embeddings", encoding, dtype)
+    except AutoDevCommanderError as e:
+        raise e.to_http_exception()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/generate", response_model=GenerateResponse)
+async def generate_text(
+    request: GenerateRequest,
+    ollama_service: OllamaService = Depends(get_ollama_service)
+):
+    try:
+        text = await ollama_service.generate_text(
+            request.prompt,
+            use_cache=request.use_cache,
+            session_id=request.session_id,
+            **(request.options or {})
+        )
+        return {"text": text}
+    except AutoDevCommanderError as e:
+        raise e.to_http_exception()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _format_sse(event: Dict[str, Any], name: Optional[str] = None) -> str:
+    prefix = f"event: {name}\n" if name else ""
+    return f"{prefix}data: {json.dumps(event)}\n\n"
+
+def _format_ndjson(event: Dict[str, Any], name: Optional[str] = None) -> str:
+    return json.dumps(event) + "\n"
+
+@router.post("/generate/stream")
+async def stream_text(
+    request: GenerateRequest,
+    http_request: Request,
+    ollama_service: OllamaService = Depends(get_ollama_service)
+):
+    """Stream generated tokens as Server-Sent Events or NDJSON.
+
+    SSE is used when the client accepts text/event-stream, NDJSON otherwise.
+    """
+    use_sse = "text/event-stream" in http_request.headers.get("accept", "")
+    fmt = _format_sse if use_sse else _format_ndjson
+    chunks = ollama_service.stream_text(
+        request.prompt,
+        session_id=request.session_id,
+        **(request.options or {})
+    )
+
+    # Pull the first chunk before responding so upstream errors map to an HTTP status
+    try:
+        first = await chunks.__anext__()
+    except StopAsyncIteration:
+        first = None
+    except AutoDevCommanderError as e:
+        raise e.to_http_exception()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def relay() -> AsyncIterator[str]:
+        chunk = first
+        try:
+            while chunk is not None:
+                if chunk.get("done"):
+                    stats = {k: v for k, v in chunk.items() if k not in ("response", "context")}
+                    if chunk.get("response"):
+                        yield fmt({"token": chunk["response"]})
+                    yield fmt(stats, "done")
+                    return
+                yield fmt({"token": chunk.get("response", "")})
+                if await http_request.is_disconnected():
+                    logger.info("Client disconnected, cancelling generation")
+                    return
+                chunk = await chunks.__anext__()
+        except StopAsyncIteration:
+            return
+        except Exception as e:
+            logger.error(f"Error streaming generation: {e}")
+            yield fmt({"error": str(e)}, "error")
+        finally:
+            await chunks.aclose()
+
+    return StreamingResponse(
+        relay(),
+        media_type="text/event-stream" if use_sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/embed/cache")
+async def embedding_cache_stats(
+    ollama_service: OllamaService = Depends(get_ollama_service)
+):
+    return ollama_service.embedding_cache.stats()
+
+@router.get("/singleflight")
+async def singleflight_stats(
+    ollama_service: OllamaService = Depends(get_ollama_service)
+):
+    return ollama_service.singleflight.stats()
+
+@router.get("/generate/cache")
+async def semantic_cache_stats(
+    ollama_service: OllamaService = Depends(get_ollama_service)
+):
+    if ollama_service.semantic_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **ollama_service.semantic_cache.stats()}
+
+@router.get("/admission")
+async def admission_stats(
+    ollama_service: OllamaService = Depends(get_ollama_service)
+):
+    return ollama_service.admission.stats()
+
+@router.get("/backends")
+async def backend_stats(
+    ollama_service: OllamaService = Depends(get_ollama_service)
+):
+    return ollama_service.balancer.stats()
@@ -1,7 +1,49 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from typing import Dict
+import asyncio
+import httpx
+from ....core.config import settings
+from ....core.di import DependencyContainer, get_container, get_http_clients
+from ....core.http import HTTPClientRegistry
 
 router = APIRouter()
 
-@router.get("/")
-async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+async def check_ollama(client: httpx.AsyncClient) -> bool:
+    try:
+        response = await client.get("/api/health", timeout=settings.HEALTH_CHECK_TIMEOUT)
+        return response.status_code == 200
+    except:
+        return False
+
+async def check_qdrant(client: httpx.AsyncClient) -> bool:
+    try:
+        response = await client.get("/readyz", timeout=settings.HEALTH_CHECK_TIMEOUT)
+        return response.status_code == 200
+    except:
+        return False
+
+@router.get("/", response_model=Dict)
+async def health_check(
+    http_clients: HTTPClientRegistry = Depends(get_http_clients),
+    container: DependencyContainer = Depends(get_container)
+):
+    backends = container.ollama_backends
+    probes = await asyncio.gather(*(check_ollama(http_clients.get(name)) for name in backends))
+    return {
+        "status": "healthy",
+        "services": {
+            "ollama": "healthy" if any(probes) else "unhealthy",
+            "ollama_backends": {
+                url: "healthy" if healthy else "unhealthy"
+                for url, healthy in zip(backends.values(), probes)
+            },
+            "qdrant": "healthy" if await check_qdrant(http_clients.get("qdrant")) else "unhealthy",
+            "redis": "healthy",  # Add Redis health check
+            "n8n": "healthy"     # Add n8n health check
+        }
+    }
+
+@router.get("/pools", response_model=Dict)
+async def pool_stats(http_clients: HTTPClientRegistry = Depends(get_http_clients)):
+    """Connection pool statistics for outbound HTTP clients"""
+    return {"pools": http_clients.stats()}
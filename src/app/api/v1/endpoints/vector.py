@@ -1,7 +1,416 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError, model_validator
+from typing import AsyncIterator, List, Dict, Any, Literal, Optional, Union
+from qdrant_client.http import models
+from ...ingest import MSGPACK, NPY, parse_upsert_body
+from ...negotiation import OCTET_STREAM, check_dtype, negotiate_encoding
+from ....core.di import get_qdrant_service
+from ....core.exceptions import CollectionNotFoundError, VectorCountError, VectorDimensionError
+from ....services.vector.qdrant_service import QdrantService
+from ....services.vector.transfer import (
+    EXPORT_FORMATS,
+    PointStreamReader,
+    encode_end,
+    encode_header,
+    encode_points,
+    export_header
+)
+from ....utils.vectors import decode_vectors, encode_vectors_b64
 
 router = APIRouter()
 
+class CollectionCreateRequest(BaseModel):
+    vector_size: Optional[int] = Field(None, gt=0)
+    payload_indexes: Dict[str, models.PayloadSchemaType] = Field(default_factory=dict)
+    on_disk: bool = False
+    distance: models.Distance = models.Distance.COSINE
+    hnsw_m: Optional[int] = Field(None, ge=0)
+    hnsw_ef_construct: Optional[int] = Field(None, ge=4)
+    quantization: Optional[Literal["scalar", "product", "binary"]] = None
+    quantization_always_ram: bool = True
+    product_compression: Literal["x4", "x8", "x16", "x32", "x64"] = "x16"
+
+class SearchTuning(BaseModel):
+    hnsw_ef: Optional[int] = Field(None, gt=0)
+    oversampling: Optional[float] = Field(None, ge=1.0)
+    rescore: Optional[bool] = None
+
+    def params(self) -> Dict[str, Any]:
+        return {"hnsw_ef": self.hnsw_ef, "oversampling": self.oversampling, "rescore": self.rescore}
+
+class VectorUpsertRequest(BaseModel):
+    collection_name: str
+    vectors: List[List[float]]
+    payloads: List[Dict[str, Any]]
+    ids: Optional[List[str]] = None
+
+class VectorBulkUpsertRequest(BaseModel):
+    collection_name: str
+    vectors: List[List[float]]
+    payloads: Optional[List[Dict[str, Any]]] = None
+    ids: Optional[List[str]] = None
+    chunk_size: Optional[int] = Field(None, gt=0)
+    parallel: Optional[int] = Field(None, gt=0)
+    wait: bool = True
+    detail: bool = False
+
+class VectorQuery(BaseModel):
+    query_vector: Optional[List[float]] = None
+    query_vector_b64: Optional[str] = None
+    dtype: str = "float32"
+    limit: int = 5
+    filter: Optional[Dict[str, Any]] = None
+
+    @model_validator(mode="after")
+    def check_query_vector(self) -> "VectorQuery":
+        if (self.query_vector is None) == (self.query_vector_b64 is None):
+            raise ValueError("Provide exactly one of query_vector or query_vector_b64")
+        return self
+
+    def vector(self) -> Any:
+        if self.query_vector_b64 is not None:
+            return decode_vectors(self.query_vector_b64, self.dtype).copy()
+        return self.query_vector
+
+    def query_filter(self) -> Optional[models.Filter]:
+        return models.Filter.model_validate(self.filter) if self.filter is not None else None
+
+    def parsed(self) -> Dict[str, Any]:
+        """Decode the vector and validate the filter, raising 400 on malformed input."""
+        try:
+            return {"vector": self.vector(), "limit": self.limit, "filter": self.query_filter()}
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+class VectorSearchRequest(VectorQuery, SearchTuning):
+    collection_name: str
+    with_vectors: bool = False
+    with_payload: Union[bool, List[str]] = True
+
+class VectorBatchSearchRequest(SearchTuning):
+    collection_name: str
+    queries: List[VectorQuery] = Field(..., min_length=1)
+    with_vectors: bool = False
+    with_payload: Union[bool, List[str]] = True
+
+def _search_encoding(
+    http_request: Request,
+    encoding: Optional[str],
+    dtype: str,
+    query_dtypes: List[str]
+) -> str:
+    encoding = negotiate_encoding(http_request, encoding)
+    if encoding == "binary":
+        raise HTTPException(
+            status_code=406,
+            detail="Search results carry ids and payloads; use ?encoding=base64 for compact vectors"
+        )
+    check_dtype(dtype)
+    for query_dtype in query_dtypes:
+        check_dtype(query_dtype)
+    return encoding
+
+def _encode_hits(hits: List[Dict[str, Any]], encoding: str, dtype: str) -> None:
+    if encoding != "base64":
+        return
+    for hit in hits:
+        if hit.get("vector") is not None:
+            hit["vector"] = encode_vectors_b64(hit["vector"], dtype)
+
 @router.get("/")
 async def vector_root():
-    return {"message": "Vector endpoints"}
\ No newline at end of file
+    return {"message": "Vector endpoints"}
+
+@router.post("/collections/{collection_name}")
+async def create_collection(
+    collection_name: str,
+    vector_size: int = 768,
+    request: Optional[CollectionCreateRequest] = None,
+    qdrant_service: QdrantService = Depends(get_qdrant_service)
+):
+    """Create a collection.
+
+    The optional body can override vector_size, map payload fields to
+    index types (keyword, integer, float, bool, text, ...) so filtered
+    searches on them stay fast, and trade memory for latency with on-disk
+    vectors, scalar/product/binary quantization and HNSW m/ef_construct.
+    """
+    request = request or CollectionCreateRequest()
+    try:
+        await qdrant_service.create_collection(
+            collection_name,
+            request.vector_size or vector_size,
+            payload_indexes=request.payload_indexes,
+            on_disk=request.on_disk,
+            distance=request.distance,
+            hnsw_m=request.hnsw_m,
+            hnsw_ef_construct=request.hnsw_ef_construct,
+            quantization=request.quantization,
+            quantization_always_ram=request.quantization_always_ram,
+            product_compression=request.product_compression
+        )
+        return {"status": "success", "message": f"Collection {collection_name} created"}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/collections/{collection_name}")
+async def get_collection(
+    collection_name: str,
+    qdrant_service: QdrantService = Depends(get_qdrant_service)
+):
+    """Get a collection's vector size, distance and (possibly cached) point count."""
+    try:
+        info = await qdrant_service.get_collection_info(collection_name)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if not info.exists:
+        raise CollectionNotFoundError(collection_name).to_http_exception()
+    return info.as_dict()
+
+@router.delete("/collections/{collection_name}")
+async def delete_collection(
+    collection_name: str,
+    qdrant_service: QdrantService = Depends(get_qdrant_service)
+):
+    try:
+        await qdrant_service.delete_collection(collection_name)
+        return {"status": "success", "message": f"Collection {collection_name} deleted"}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _transfer_format(fmt: Optional[str], content_type: str) -> str:
+    if fmt is None:
+        return "binary" if OCTET_STREAM in content_type else "ndjson"
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format {fmt}")
+    return fmt
+
+@router.get("/collections/{collection_name}/export")
+async def export_collection(
+    collection_name: str,
+    http_request: Request,
+    format: Optional[str] = None,
+    page_size: Optional[int] = None,
+    qdrant_service: QdrantService = Depends(get_qdrant_service)
+):
+    """Stream every point of a collection, vectors included.
+
+    NDJSON by default: a header line, then one {"id", "vector", "payload"}
+    object per line. ?format=binary or Accept: application/octet-stream
+    gives length-prefixed JSON metadata with raw little-endian float32
+    vectors. Both end with a record carrying the point count, so a
+    download that was cut short is refused on import. Points are read one scroll page at a time, never all at once.
+    """
+    fmt = _transfer_format(format, http_request.headers.get("accept", ""))
+    try:
+        info = await qdrant_service.get_collection_info(collection_name)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if not info.exists:
+        raise CollectionNotFoundError(collection_name).to_http_exception()
+    if info.vector_size is None:
+        raise HTTPException(status_code=400, detail="Named-vector collections cannot be exported")
+
+    async def stream() -> AsyncIterator[bytes]:
+        yield encode_header(export_header(collection_name, info.vector_size, info.distance), fmt)
+        count = 0
+        async for points in qdrant_service.export_points(collection_name, page_size):
+            count += len(points)
+            yield encode_points(points, fmt)
+        yield encode_end(count, fmt)
+
+    return StreamingResponse(
+        stream(),
+        media_type=OCTET_STREAM if fmt == "binary" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{collection_name}.{fmt}"'}
+    )
+
+@router.post("/collections/{collection_name}/import")
+async def import_collection(
+    collection_name: str,
+    http_request: Request,
+    format: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    wait: bool = True,
+    qdrant_service: QdrantService = Depends(get_qdrant_service)
+):
+    """Load a stream produced by /export into a collection.
+
+    The format follows ?format= or the Content-Type. The body is parsed as
+    it arrives and upserted in bounded batches. A missing collection is
+    created with the exported vector size and distance. Each point's vector
+    length is checked against the header before its batch is written; a bad
+    point fails the request with 400 and the index of that point, and the
+    points before it stay imported.
+    """
+    fmt = _transfer_format(format, http_request.headers.get("content-type", ""))
+    reader = PointStreamReader(http_request.stream(), fmt)
+    try:
+        header = await reader.read_header()
+        info = await qdrant_service.get_collection_info(collection_name)
+        if not info.exists:
+            await qdrant_service.create_collection(
+                collection_name,
+                header["vector_size"],
+                distance=models.Distance(header.get("distance") or models.Distance.COSINE)
+            )
+        elif info.vector_size is not None and info.vector_size != header["vector_size"]:
+            raise VectorDimensionError(collection_name, info.vector_size, header["vector_size"])
+        result = await qdrant_service.import_points(
+            collection_name,
+            reader.points(),
+            batch_size=batch_size,
+            wait=wait,
+            vector_size=header["vector_size"]
+        )
+        return {"status": "success", **result}
+    except VectorDimensionError as e:
+        raise e.to_http_exception()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post(
+    "/vectors/upsert",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": VectorUpsertRequest.model_json_schema()},
+                NPY: {"schema": {"type": "string", "format": "binary"}},
+                OCTET_STREAM: {"schema": {"type": "string", "format": "binary"}},
+                MSGPACK[0]: {"schema": {"type": "string", "format": "binary"}}
+            }
+        }
+    }
+)
+async def upsert_vectors(
+    http_request: Request,
+    collection_name: Optional[str] = None,
+    qdrant_service: QdrantService = Depends(get_qdrant_service)
+):
+    """Upsert vectors from JSON, .npy, raw float bytes or msgpack.
+
+    Binary bodies are viewed as a float32 matrix in place instead of being
+    validated float by float, which is what makes large JSON batches slow
+    and memory-hungry.
+    """
+    request = await parse_upsert_body(http_request, collection_name)
+    if request is None:
+        try:
+            request = VectorUpsertRequest.model_validate_json(await http_request.body())
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+    try:
+        await qdrant_service.upsert_vectors(
+            request.collection_name,
+            request.vectors,
+            request.payloads,
+            request.ids
+        )
+        return {"status": "success", "message": "Vectors upserted"}
+    except (CollectionNotFoundError, VectorDimensionError, VectorCountError) as e:
+        raise e.to_http_exception()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/vectors/upsert/bulk")
+async def bulk_upsert_vectors(
+    request: VectorBulkUpsertRequest,
+    qdrant_service: QdrantService = Depends(get_qdrant_service)
+):
+    """Upsert a large load in parallel chunks.
+
+    Returns totals and points/sec; set detail for per-chunk progress. With
+    wait=false each chunk is acknowledged once Qdrant has queued it, before
+    it is indexed.
+    """
+    try:
+        result = await qdrant_service.bulk_upsert(
+            request.collection_name,
+            request.vectors,
+            request.payloads,
+            request.ids,
+            chunk_size=request.chunk_size,
+            parallel=request.parallel,
+            wait=request.wait,
+            detail=request.detail
+        )
+        return {"status": "success", **result}
+    except (CollectionNotFoundError, VectorDimensionError, VectorCountError) as e:
+        raise e.to_http_exception()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/vectors/search")
+async def search_vectors(
+    request: VectorSearchRequest,
+    http_request: Request,
+    encoding: Optional[str] = None,
+    dtype: str = "float32",
+    qdrant_service: QdrantService = Depends(get_qdrant_service)
+):
+    """Search for similar vectors.
+
+    The query vector may be sent as base64 little-endian floats. The filter
+    is applied by Qdrant, and with_payload may list the payload fields to
+    return. hnsw_ef, oversampling and rescore tune HNSW and quantized
+    search. With with_vectors, hit vectors are returned as JSON floats or,
+    with ?encoding=base64, as base64 float bytes in the requested dtype.
+    """
+    encoding = _search_encoding(http_request, encoding, dtype, [request.dtype])
+    query = request.parsed()
+    try:
+        results = await qdrant_service.search_vectors(
+            request.collection_name,
+            query["vector"],
+            query["limit"],
+            query_filter=query["filter"],
+            with_vectors=request.with_vectors,
+            with_payload=request.with_payload,
+            **request.params()
+        )
+        _encode_hits(results, encoding, dtype)
+        return ORJSONResponse({"results": results})
+    except (CollectionNotFoundError, VectorDimensionError) as e:
+        raise e.to_http_exception()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/vectors/search/batch")
+async def search_vectors_batch(
+    request: VectorBatchSearchRequest,
+    http_request: Request,
+    encoding: Optional[str] = None,
+    dtype: str = "float32",
+    qdrant_service: QdrantService = Depends(get_qdrant_service)
+):
+    """Run many searches, each with its own limit and filter, in one Qdrant round trip.
+
+    results[i] holds the hits for queries[i]; encodings are as for /vectors/search.
+    """
+    encoding = _search_encoding(http_request, encoding, dtype, [q.dtype for q in request.queries])
+    queries = [query.parsed() for query in request.queries]
+    try:
+        results = await qdrant_service.search_vectors_batch(
+            request.collection_name,
+            queries,
+            with_vectors=request.with_vectors,
+            with_payload=request.with_payload,
+            **request.params()
+        )
+        for hits in results:
+            _encode_hits(hits, encoding, dtype)
+        return ORJSONResponse({"results": results})
+    except (CollectionNotFoundError, VectorDimensionError) as e:
+        raise e.to_http_exception()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/vectors/search/cache")
+async def search_cache_stats(
+    qdrant_service: QdrantService = Depends(get_qdrant_service)
+):
+    return qdrant_service.search_cache.stats()
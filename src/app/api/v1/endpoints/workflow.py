@@ -1,7 +1,65 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Header, Query
+from pydantic import BaseModel
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from ....core.di import get_workflow_service
+from ....core.exceptions import WorkflowCallbackError, WorkflowNotFoundError
+from ....services.workflow.workflow_service import WorkflowService
 
 router = APIRouter()
 
+class ExecutionCallbackRequest(BaseModel):
+    success: bool
+    data: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
 @router.get("/")
 async def workflow_root():
-    return {"message": "Workflow endpoints"}
\ No newline at end of file
+    return {"message": "Workflow endpoints"}
+
+@router.get("/stats")
+async def workflow_stats(
+    workflow_service: WorkflowService = Depends(get_workflow_service)
+):
+    """Dispatcher queue depths and per-priority queue waits, poller, store and workflow cache counters."""
+    return {
+        "dispatcher": workflow_service.dispatcher.stats(),
+        "poller": workflow_service.poller.stats(),
+        "store": workflow_service.executions.stats(),
+        "workflow_cache": workflow_service.workflow_cache.stats()
+    }
+
+@router.post("/executions/{execution_id}/callback")
+async def execution_callback(
+    execution_id: UUID,
+    request: ExecutionCallbackRequest,
+    x_callback_token: Optional[str] = Header(None),
+    workflow_service: WorkflowService = Depends(get_workflow_service)
+):
+    """Completion callback for n8n workflows.
+
+    The workflow posts its result here with the token it was given in
+    input "callback.token", sent as the X-Callback-Token header.
+    """
+    try:
+        execution = await workflow_service.complete_execution(
+            execution_id,
+            x_callback_token,
+            request.model_dump(exclude_none=True)
+        )
+    except (WorkflowNotFoundError, WorkflowCallbackError) as e:
+        raise e.to_http_exception()
+    return {"status": "success", "execution_status": execution.status}
+
+@router.get("/executions/{execution_id}")
+async def get_execution(
+    execution_id: UUID,
+    wait: float = Query(0.0, ge=0.0, le=300.0),
+    workflow_service: WorkflowService = Depends(get_workflow_service)
+):
+    """Get an execution; with ?wait=N, hold the request up to N seconds for it to finish."""
+    try:
+        return await workflow_service.wait_for_execution(execution_id, wait)
+    except WorkflowNotFoundError as e:
+        raise e.to_http_exception()
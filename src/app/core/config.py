@@ -1,5 +1,6 @@
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, List, Optional
 
 class Settings(BaseSettings):
     # Core
@@ -13,11 +14,55 @@ class Settings(BaseSettings):
 
     # Ollama
     OLLAMA_HOST: str = "http://ollama:11434"
+    OLLAMA_HOSTS: List[str] = []  # several backends to balance across; overrides OLLAMA_HOST
+    OLLAMA_PROBE_INTERVAL: float = 10.0
+    OLLAMA_EJECT_AFTER: int = 3  # consecutive errors before a backend is ejected
+    OLLAMA_KEEP_ALIVE: Optional[str] = "30m"
+    OLLAMA_WARMUP: bool = True
+    OLLAMA_WARMUP_MODELS: List[str] = []  # defaults to OLLAMA_MODEL
+    OLLAMA_RESIDENCY_REFRESH: float = 60.0
     OLLAMA_MODEL: str = "llama2"
+    OLLAMA_TIMEOUT: float = 300.0
+    OLLAMA_MAX_CONNECTIONS: int = 32
+    OLLAMA_EMBED_BATCH_WINDOW_MS: float = 5.0
+    OLLAMA_EMBED_MAX_BATCH: int = 64
+    OLLAMA_EMBED_MAX_PARALLEL: int = 4  # concurrent upstream batches per get_embeddings call
+    OLLAMA_EMBED_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    OLLAMA_EMBED_CACHE_TTL: Optional[int] = 7 * 24 * 3600
+    OLLAMA_SINGLEFLIGHT_EMBED: bool = True
+    OLLAMA_SINGLEFLIGHT_GENERATE: str = "deterministic"  # off, deterministic or always
+    OLLAMA_MAX_CONCURRENCY: int = 16
+    OLLAMA_MAX_CONCURRENT_EMBED: int = 16
+    OLLAMA_MAX_CONCURRENT_GENERATE: int = 4
+    OLLAMA_MAX_QUEUE: int = 256
+    OLLAMA_MAX_QUEUE_PER_CLIENT: int = 64
+    OLLAMA_CLIENT_WEIGHTS: Dict[str, float] = {}  # client identity -> fair-share weight
+    OLLAMA_CLIENT_API_KEYS: List[str] = []  # X-API-Key values trusted as client identities; others queue by IP
+
+    # Semantic response cache
+    SEMANTIC_CACHE_ENABLED: bool = False
+    SEMANTIC_CACHE_COLLECTION: str = "llm_response_cache"
+    SEMANTIC_CACHE_THRESHOLD: float = 0.95
+    SEMANTIC_CACHE_TTL: Optional[int] = 86400
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 100000
 
     # Qdrant
+    VECTOR_BACKEND: str = "qdrant"  # "qdrant" or "numpy" (in-process, no server)
+    VECTOR_INDEX_PATH: Optional[str] = None  # numpy backend snapshot directory
     QDRANT_HOST: str = "qdrant"
     QDRANT_PORT: int = 6333
+    QDRANT_GRPC_PORT: int = 6334
+    QDRANT_PREFER_GRPC: bool = False
+    QDRANT_TIMEOUT: int = 30
+    QDRANT_MAX_CONNECTIONS: int = 64
+    QDRANT_MAX_KEEPALIVE_CONNECTIONS: int = 16
+    QDRANT_UPSERT_CHUNK_SIZE: int = 256
+    QDRANT_UPSERT_PARALLEL: int = 4
+    QDRANT_UPSERT_RETRIES: int = 3
+    QDRANT_METADATA_TTL: float = 30.0  # seconds; 0 disables the collection metadata cache
+    QDRANT_EXPORT_PAGE_SIZE: int = 1000
+    QDRANT_SEARCH_CACHE_MAX_BYTES: int = 32 * 1024 * 1024  # 0 disables the search result cache
+    QDRANT_SEARCH_CACHE_TTL: float = 60.0  # seconds; per worker, bounds staleness from writes it cannot see
 
     # Redis
     REDIS_URL: str = "redis://redis:6379/0"
@@ -26,6 +71,47 @@ class Settings(BaseSettings):
     N8N_HOST: str = "localhost"
     N8N_PORT: int = 5678
     N8N_PROTOCOL: str = "http"
+    N8N_POLL_MIN_INTERVAL: float = 1.0
+    N8N_POLL_MAX_INTERVAL: float = 30.0
+    N8N_POLL_BACKOFF: float = 1.5
+    N8N_POLL_BATCH_SIZE: int = 100
+    N8N_POLL_MAX_ERRORS: int = 5
+    N8N_RECONCILE_INTERVAL: float = 60.0  # poll interval when completion callbacks are enabled
+    WORKFLOW_CALLBACK_URL: Optional[str] = None  # e.g. http://autodev:8000/api/v1/workflow
+    WORKFLOW_WAIT_RECHECK: float = 1.0
+    WORKFLOW_MAX_CONCURRENCY: int = 32  # executions running in n8n at once, per worker
+    WORKFLOW_SLOT_RECHECK: float = 2.0  # shared stores: re-read held slots for callbacks taken by other workers
+    WORKFLOW_MAX_QUEUE: int = 10000
+    WORKFLOW_PRIORITY_WEIGHTS: Dict[str, float] = {"low": 1.0, "medium": 2.0, "high": 4.0}
+    WORKFLOW_PRIORITY_AGING: float = 30.0  # seconds of waiting worth one unit of weight
+    WORKFLOW_STORE: str = "memory"  # memory, sqlite or redis
+    WORKFLOW_STORE_MAX_BYTES: int = 64 * 1024 * 1024  # memory store budget for finished executions
+    WORKFLOW_STORE_TTL: Optional[float] = 7 * 24 * 3600
+    WORKFLOW_STORE_PATH: str = "data/executions.db"
+    WORKFLOW_CACHE_TTL: float = 30.0  # 0 disables the workflow definition/list cache
+    WORKFLOW_CACHE_STALE_TTL: float = 300.0  # served while revalidating in the background
+    WORKFLOW_CACHE_MAX_ENTRIES: int = 1000
+    N8N_WORKFLOWS_PAGE_SIZE: int = 100  # n8n caps list pages at 250
+
+    # Outbound HTTP
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP_TIMEOUT: float = 30.0
+    HTTP_POOL_TIMEOUT: float = 10.0
+    HEALTH_CHECK_TIMEOUT: float = 2.0  # per-probe, overrides the client's read timeout
+    HTTP2_ENABLED: bool = False
+
+    @field_validator("WORKFLOW_PRIORITY_WEIGHTS")
+    @classmethod
+    def _check_priority_weights(cls, weights: Dict[str, float]) -> Dict[str, float]:
+        unknown = sorted(name for name in weights if name.lower() not in ("low", "medium", "high"))
+        if unknown:
+            raise ValueError(f"Unknown workflow priorities {unknown}, expected low, medium or high")
+        if any(weight <= 0 for weight in weights.values()):
+            raise ValueError("Workflow priority weights must be positive")
+        return {name.lower(): weight for name, weight in weights.items()}
 
     class Config:
         env_file = ".env"
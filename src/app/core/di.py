@@ -1,55 +1,186 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from functools import lru_cache
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from fastapi import Depends
+from loguru import logger
+
+from .http import HTTPClientConfig, HTTPClientRegistry
 
 class ServiceConfig(BaseModel):
     """Configuration for services"""
     ollama_url: str
+    ollama_urls: List[str] = Field(default_factory=list)
+    ollama_probe_interval: float = 10.0
+    ollama_eject_after: int = 3
     qdrant_host: str
     qdrant_port: int
+    qdrant_timeout: float = 30.0
+    qdrant_max_connections: int = 64
+    qdrant_max_keepalive_connections: int = 16
     n8n_url: str
     redis_url: str
+    ollama_timeout: float = 300.0
+    ollama_max_connections: int = 32
+    embed_cache_max_bytes: int = 64 * 1024 * 1024
+    embed_cache_ttl: Optional[int] = None
+    semantic_cache_enabled: bool = False
+    semantic_cache_collection: str = "llm_response_cache"
+    semantic_cache_threshold: float = 0.95
+    semantic_cache_ttl: Optional[int] = 86400
+    semantic_cache_max_entries: int = 100000
+    workflow_store: str = "memory"
+    workflow_store_max_bytes: int = 64 * 1024 * 1024
+    workflow_store_ttl: Optional[float] = None
+    workflow_store_path: str = "data/executions.db"
+    http: HTTPClientConfig = Field(default_factory=HTTPClientConfig)
 
 class DependencyContainer:
     """Central dependency injection container"""
     def __init__(self, config: ServiceConfig):
         self.config = config
         self._services: Dict[str, Any] = {}
-        
+        self._http: Optional[HTTPClientRegistry] = None
+        self._redis: Optional[Any] = None
+
+    @property
+    def http(self) -> HTTPClientRegistry:
+        """Shared outbound HTTP clients, one pool per upstream"""
+        if self._http is None:
+            registry = HTTPClientRegistry(self.config.http)
+            ollama_config = self.config.http.model_copy(update={
+                "read_timeout": self.config.ollama_timeout,
+                "max_connections": self.config.ollama_max_connections
+            })
+            for name, url in self.ollama_backends.items():
+                registry.register(name, url, config=ollama_config)
+            registry.register(
+                "qdrant",
+                f"http://{self.config.qdrant_host}:{self.config.qdrant_port}",
+                config=self.config.http.model_copy(update={
+                    "read_timeout": self.config.qdrant_timeout,
+                    "write_timeout": self.config.qdrant_timeout,
+                    "max_connections": self.config.qdrant_max_connections,
+                    "max_keepalive_connections": self.config.qdrant_max_keepalive_connections
+                })
+            )
+            registry.register(
+                "n8n",
+                f"{self.config.n8n_url}/api/v1",
+                headers={
+                    "Accept": "application/json",
+                    "Content-Type": "application/json"
+                }
+            )
+            self._http = registry
+        return self._http
+
+    @property
+    def ollama_backends(self) -> Dict[str, str]:
+        """HTTP client name to URL for every configured Ollama backend"""
+        urls = self.config.ollama_urls or [self.config.ollama_url]
+        return {
+            ("ollama" if i == 0 else f"ollama-{i}"): url
+            for i, url in enumerate(urls)
+        }
+
+    @property
+    def redis(self):
+        """Shared async Redis client, or None when Redis is not configured"""
+        if self._redis is None and self.config.redis_url:
+            try:
+                import redis.asyncio as aioredis
+            except ImportError:
+                logger.warning("redis package not installed, Redis-backed features disabled")
+                return None
+            self._redis = aioredis.from_url(self.config.redis_url)
+        return self._redis
+
     @property
     def ollama(self):
         if 'ollama' not in self._services:
+            from ..services.ai.balancer import OllamaBackend, OllamaBalancer
+            from ..services.ai.cache import EmbeddingCache
             from ..services.ai.ollama_service import OllamaService
+            semantic_cache = None
+            if self.config.semantic_cache_enabled:
+                from ..services.ai.semantic_cache import SemanticCache
+                semantic_cache = SemanticCache(
+                    self.qdrant,
+                    collection_name=self.config.semantic_cache_collection,
+                    threshold=self.config.semantic_cache_threshold,
+                    ttl=self.config.semantic_cache_ttl,
+                    max_entries=self.config.semantic_cache_max_entries
+                )
+            balancer = OllamaBalancer(
+                [
+                    OllamaBackend(url, self.http.get(name))
+                    for name, url in self.ollama_backends.items()
+                ],
+                probe_interval=self.config.ollama_probe_interval,
+                eject_after=self.config.ollama_eject_after
+            )
             self._services['ollama'] = OllamaService(
-                base_url=self.config.ollama_url
+                base_url=self.config.ollama_url,
+                balancer=balancer,
+                embedding_cache=EmbeddingCache(
+                    redis=self.redis,
+                    max_bytes=self.config.embed_cache_max_bytes,
+                    ttl=self.config.embed_cache_ttl
+                ),
+                semantic_cache=semantic_cache
             )
         return self._services['ollama']
-    
+
     @property
     def qdrant(self):
         if 'qdrant' not in self._services:
             from ..services.vector.qdrant_service import QdrantService
             self._services['qdrant'] = QdrantService(
                 host=self.config.qdrant_host,
-                port=self.config.qdrant_port
+                port=self.config.qdrant_port,
+                http_client=self.http.get("qdrant")
             )
         return self._services['qdrant']
-    
+
     @property
     def n8n(self):
         if 'n8n' not in self._services:
             from ..services.workflow.n8n_service import N8NService
             self._services['n8n'] = N8NService(
-                base_url=self.config.n8n_url
+                base_url=self.config.n8n_url,
+                http_client=self.http.get("n8n")
             )
         return self._services['n8n']
 
+    @property
+    def workflow(self):
+        if 'workflow' not in self._services:
+            from ..services.workflow.store import create_execution_store
+            from ..services.workflow.workflow_service import WorkflowService
+            self._services['workflow'] = WorkflowService(
+                base_url=self.config.n8n_url,
+                http_client=self.http.get("n8n"),
+                store=create_execution_store(
+                    self.config.workflow_store,
+                    max_bytes=self.config.workflow_store_max_bytes,
+                    ttl=self.config.workflow_store_ttl,
+                    path=self.config.workflow_store_path,
+                    redis=self.redis if self.config.workflow_store == "redis" else None
+                )
+            )
+        return self._services['workflow']
+
     async def cleanup(self):
         """Cleanup services on shutdown"""
         for service in self._services.values():
             if hasattr(service, 'cleanup'):
                 await service.cleanup()
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
 
 @lru_cache()
 def get_container() -> DependencyContainer:
@@ -57,10 +188,39 @@ def get_container() -> DependencyContainer:
     from .config import settings
     config = ServiceConfig(
         ollama_url=settings.OLLAMA_HOST,
+        ollama_urls=settings.OLLAMA_HOSTS,
+        ollama_probe_interval=settings.OLLAMA_PROBE_INTERVAL,
+        ollama_eject_after=settings.OLLAMA_EJECT_AFTER,
         qdrant_host=settings.QDRANT_HOST,
         qdrant_port=settings.QDRANT_PORT,
+        qdrant_timeout=settings.QDRANT_TIMEOUT,
+        qdrant_max_connections=settings.QDRANT_MAX_CONNECTIONS,
+        qdrant_max_keepalive_connections=settings.QDRANT_MAX_KEEPALIVE_CONNECTIONS,
         n8n_url=f"{settings.N8N_PROTOCOL}://{settings.N8N_HOST}:{settings.N8N_PORT}",
-        redis_url=settings.REDIS_URL
+        redis_url=settings.REDIS_URL,
+        ollama_timeout=settings.OLLAMA_TIMEOUT,
+        ollama_max_connections=settings.OLLAMA_MAX_CONNECTIONS,
+        embed_cache_max_bytes=settings.OLLAMA_EMBED_CACHE_MAX_BYTES,
+        embed_cache_ttl=settings.OLLAMA_EMBED_CACHE_TTL,
+        semantic_cache_enabled=settings.SEMANTIC_CACHE_ENABLED,
+        semantic_cache_collection=settings.SEMANTIC_CACHE_COLLECTION,
+        semantic_cache_threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+        semantic_cache_ttl=settings.SEMANTIC_CACHE_TTL,
+        semantic_cache_max_entries=settings.SEMANTIC_CACHE_MAX_ENTRIES,
+        workflow_store=settings.WORKFLOW_STORE,
+        workflow_store_max_bytes=settings.WORKFLOW_STORE_MAX_BYTES,
+        workflow_store_ttl=settings.WORKFLOW_STORE_TTL,
+        workflow_store_path=settings.WORKFLOW_STORE_PATH,
+        http=HTTPClientConfig(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            connect_timeout=settings.HTTP_CONNECT_TIMEOUT,
+            read_timeout=settings.HTTP_TIMEOUT,
+            write_timeout=settings.HTTP_TIMEOUT,
+            pool_timeout=settings.HTTP_POOL_TIMEOUT,
+            http2=settings.HTTP2_ENABLED
+        )
     )
     return DependencyContainer(config)
 
@@ -73,3 +233,9 @@ def get_qdrant_service(container: DependencyContainer = Depends(get_container)):
 
 def get_n8n_service(container: DependencyContainer = Depends(get_container)):
     return container.n8n
+
+def get_workflow_service(container: DependencyContainer = Depends(get_container)):
+    return container.workflow
+
+def get_http_clients(container: DependencyContainer = Depends(get_container)):
+    return container.http
@@ -29,8 +29,13 @@ class AutoDevCommanderError(Exception):
 # AI Service Exceptions
 class AIServiceError(AutoDevCommanderError):
     """Base exception for AI/LLM service errors"""
-    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
-        super().__init__(message, details, status_code=500)
+    def __init__(
+        self,
+        message: str,
+        details: Optional[Dict[str, Any]] = None,
+        status_code: int = 500
+    ):
+        super().__init__(message, details, status_code=status_code)
 
 class OllamaServiceError(AIServiceError):
     """Errors from Ollama service"""
@@ -56,8 +61,13 @@ class GenerationError(OllamaServiceError):
 # Vector Service Exceptions
 class VectorServiceError(AutoDevCommanderError):
     """Base exception for vector operations"""
-    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
-        super().__init__(message, details, status_code=500)
+    def __init__(
+        self,
+        message: str,
+        details: Optional[Dict[str, Any]] = None,
+        status_code: int = 500
+    ):
+        super().__init__(message, details, status_code=status_code)
 
 class QdrantServiceError(VectorServiceError):
     """Errors from Qdrant service"""
@@ -84,16 +94,43 @@ class VectorOperationError(QdrantServiceError):
     """Vector operation errors"""
     pass
 
+class VectorDimensionError(VectorOperationError):
+    """Vector size does not match the collection"""
+    def __init__(self, collection_name: str, expected: int, actual: int, index: int = 0):
+        super().__init__(
+            f"Vector {index} has dimension {actual}, collection {collection_name} expects {expected}",
+            {"collection": collection_name, "expected": expected, "actual": actual, "index": index},
+            status_code=400
+        )
+
+class VectorCountError(VectorOperationError):
+    """Payloads or ids do not line up with the vectors"""
+    def __init__(self, field: str, expected: int, actual: int):
+        super().__init__(
+            f"Got {actual} {field} for {expected} vectors",
+            {"field": field, "expected": expected, "actual": actual},
+            status_code=400
+        )
+
 # Workflow Service Exceptions
 class WorkflowServiceError(AutoDevCommanderError):
     """Base exception for workflow operations"""
-    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
-        super().__init__(message, details, status_code=500)
+    def __init__(
+        self,
+        message: str,
+        details: Optional[Dict[str, Any]] = None,
+        status_code: int = 500
+    ):
+        super().__init__(message, details, status_code=status_code)
 
 class N8NServiceError(WorkflowServiceError):
     """Errors from n8n service"""
     pass
 
+class WorkflowError(N8NServiceError):
+    """Workflow operation failed"""
+    pass
+
 class WorkflowNotFoundError(N8NServiceError):
     """Workflow not found"""
     def __init__(self, workflow_id: str):
@@ -107,6 +144,15 @@ class WorkflowExecutionError(N8NServiceError):
     """Workflow execution failed"""
     pass
 
+class WorkflowCallbackError(N8NServiceError):
+    """Execution callback carried a missing or wrong token"""
+    def __init__(self, execution_id: str):
+        super().__init__(
+            f"Invalid callback token for execution {execution_id}",
+            {"execution_id": execution_id},
+            status_code=401
+        )
+
 class WorkflowTimeoutError(N8NServiceError):
     """Workflow execution timed out"""
     def __init__(self, execution_id: str):
@@ -119,8 +165,13 @@ class WorkflowTimeoutError(N8NServiceError):
 # Configuration Exceptions
 class ConfigurationError(AutoDevCommanderError):
     """Configuration-related errors"""
-    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
-        super().__init__(message, details, status_code=500)
+    def __init__(
+        self,
+        message: str,
+        details: Optional[Dict[str, Any]] = None,
+        status_code: int = 500
+    ):
+        super().__init__(message, details, status_code=status_code)
 
 class EnvironmentError(ConfigurationError):
     """Environment variable errors"""
@@ -141,14 +192,31 @@ class ServiceConnectionError(AutoDevCommanderError):
             status_code=503
         )
 
+class ServiceOverloadedError(AutoDevCommanderError):
+    """Service is at capacity and rejected the request"""
+    def __init__(self, service: str, retry_after: int, details: Optional[Dict[str, Any]] = None):
+        super().__init__(
+            f"{service} service is overloaded, retry after {retry_after}s",
+            {"retry_after": retry_after, **(details or {})},
+            status_code=503
+        )
+        self.retry_after = retry_after
+
+    def to_http_exception(self) -> HTTPException:
+        exc = super().to_http_exception()
+        exc.headers = {"Retry-After": str(self.retry_after)}
+        return exc
+
 # Exception Registry for error handling
 EXCEPTION_STATUS_CODES = {
     ModelNotLoadedError: 503,
     CollectionNotFoundError: 404,
+    VectorDimensionError: 400,
     WorkflowNotFoundError: 404,
     WorkflowTimeoutError: 504,
     ValidationError: 400,
     ServiceConnectionError: 503,
+    ServiceOverloadedError: 503,
     ConfigurationError: 500,
 }
 
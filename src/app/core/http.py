@@ -0,0 +1,170 @@
+from typing import Dict, Any, Optional
+import time
+import httpx
+from loguru import logger
+from pydantic import BaseModel
+
+class HTTPClientConfig(BaseModel):
+    """Connection pool and timeout settings for an upstream client"""
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    write_timeout: float = 30.0
+    pool_timeout: float = 10.0
+    http2: bool = False
+
+class PoolStats:
+    """Request and pool-wait counters for a single upstream"""
+    def __init__(self):
+        self.requests = 0
+        self.in_flight = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record_wait(self, wait: float) -> None:
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "in_flight": self.in_flight,
+            "avg_wait_ms": (self.total_wait / self.requests * 1000) if self.requests else 0.0,
+            "max_wait_ms": self.max_wait * 1000
+        }
+
+class InstrumentedTransport(httpx.AsyncHTTPTransport):
+    """HTTP transport that measures how long requests wait for a pooled connection.
+
+    The first httpcore trace event for a request fires once the pool has handed
+    out a connection (either opening a new one or sending on a reused one), so
+    the time until that event is the pool wait.
+    """
+    def __init__(self, stats: PoolStats, **kwargs):
+        super().__init__(**kwargs)
+        self.stats = stats
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        acquired = False
+        upstream_trace = request.extensions.get("trace")
+
+        async def trace(event_name: str, info: Dict[str, Any]) -> None:
+            nonlocal acquired
+            if not acquired:
+                acquired = True
+                self.stats.record_wait(time.perf_counter() - started)
+            if upstream_trace is not None:
+                await upstream_trace(event_name, info)
+
+        request.extensions["trace"] = trace
+        self.stats.requests += 1
+        self.stats.in_flight += 1
+        try:
+            return await super().handle_async_request(request)
+        finally:
+            self.stats.in_flight -= 1
+
+    def connection_stats(self) -> Dict[str, int]:
+        connections = getattr(self._pool, "connections", [])
+        idle = sum(1 for conn in connections if conn.is_idle())
+        return {
+            "connections": len(connections),
+            "idle": idle,
+            "in_use": len(connections) - idle
+        }
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+class HTTPClientRegistry:
+    """Long-lived, pooled httpx clients shared per upstream service"""
+    def __init__(self, defaults: Optional[HTTPClientConfig] = None):
+        self.defaults = defaults or HTTPClientConfig()
+        self._specs: Dict[str, Dict[str, Any]] = {}
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._transports: Dict[str, InstrumentedTransport] = {}
+        self._stats: Dict[str, PoolStats] = {}
+
+    def register(
+        self,
+        name: str,
+        base_url: str,
+        config: Optional[HTTPClientConfig] = None,
+        headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        """Register an upstream; the client is created on first use."""
+        self._specs[name] = {
+            "base_url": base_url,
+            "config": config or self.defaults,
+            "headers": headers or {}
+        }
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        """Get the shared client for an upstream."""
+        if name not in self._clients:
+            if name not in self._specs:
+                raise KeyError(f"No HTTP client registered for {name}")
+            self._clients[name] = self._build_client(name, **self._specs[name])
+        return self._clients[name]
+
+    def _build_client(
+        self,
+        name: str,
+        base_url: str,
+        config: HTTPClientConfig,
+        headers: Dict[str, str]
+    ) -> httpx.AsyncClient:
+        http2 = config.http2
+        if http2 and not _http2_available():
+            logger.warning(f"HTTP/2 requested for {name} but h2 is not installed, using HTTP/1.1")
+            http2 = False
+
+        stats = self._stats.setdefault(name, PoolStats())
+        transport = InstrumentedTransport(
+            stats,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry
+            )
+        )
+        self._transports[name] = transport
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            transport=transport,
+            timeout=httpx.Timeout(
+                connect=config.connect_timeout,
+                read=config.read_timeout,
+                write=config.write_timeout,
+                pool=config.pool_timeout
+            )
+        )
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Pool statistics for every client that has been created."""
+        return {
+            name: {
+                **self._stats[name].as_dict(),
+                **transport.connection_stats()
+            }
+            for name, transport in self._transports.items()
+        }
+
+    async def close(self) -> None:
+        """Close all clients and their connection pools."""
+        for name, client in self._clients.items():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.error(f"Error closing HTTP client {name}: {e}")
+        self._clients.clear()
+        self._transports.clear()
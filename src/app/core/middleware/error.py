@@ -56,9 +56,11 @@ class ErrorHandlerMiddleware(BaseHTTPMiddleware):
         if self.debug:
             error_response["error"]["traceback"] = traceback.format_exc()
 
+        retry_after = getattr(error, "retry_after", None)
         return JSONResponse(
             status_code=error.status_code,
-            content=error_response
+            content=error_response,
+            headers={"Retry-After": str(retry_after)} if retry_after is not None else None
         )
 
     def _handle_unknown_error(
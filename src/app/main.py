@@ -1,6 +1,7 @@
 # src/app/main.py
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from contextlib import asynccontextmanager
 from loguru import logger
 
@@ -18,6 +19,10 @@ async def lifespan(app: FastAPI):
     container = get_container()
     app.state.container = container
     logger.info("Starting AutoDev Commander...")
+
+    # Load models in the background; /ready reports when they are resident
+    if settings.OLLAMA_WARMUP:
+        await container.ollama.start_residency()
     
     yield
     
@@ -31,7 +36,8 @@ app = FastAPI(
     description="AI-Driven Development Orchestration",
     version="0.1.0",
     lifespan=lifespan,
-    debug=settings.DEBUG
+    debug=settings.DEBUG,
+    default_response_class=ORJSONResponse
 )
 
 # Setup middleware
@@ -50,4 +56,14 @@ app.include_router(api_router, prefix="/api/v1")
 # Add a simple health check
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+@app.get("/ready")
+async def readiness_check():
+    """Ready once the configured Ollama models are resident"""
+    ollama = app.state.container.ollama
+    ready = ollama.ready or not settings.OLLAMA_WARMUP
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "warming_up", "models": ollama.warmup_models}
+    )
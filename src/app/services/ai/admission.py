@@ -0,0 +1,220 @@
+from typing import Any, AsyncIterator, Dict, List, Optional
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+import asyncio
+import itertools
+import time
+
+from ...core.exceptions import ServiceOverloadedError
+
+client_identity: ContextVar[str] = ContextVar("ollama_client_identity", default="anonymous")
+
+def set_client_identity(identity: str) -> None:
+    """Attribute Ollama calls made in the current context to a client."""
+    client_identity.set(identity)
+
+@dataclass
+class _Waiter:
+    tag: float
+    seq: int
+    client: str
+    kind: str
+    future: asyncio.Future
+
+class _KindStats:
+    def __init__(self):
+        self.admitted = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_service = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "avg_wait_ms": (self.total_wait / self.admitted * 1000) if self.admitted else 0.0,
+            "max_wait_ms": self.max_wait * 1000
+        }
+
+class AdmissionScheduler:
+    """Bounded, weighted-fair admission in front of a single Ollama backend.
+
+    Work is admitted under a global concurrency limit and a per-kind limit
+    (e.g. "embed" and "generate"). Waiting requests are ordered by virtual
+    finish time per client, so a client with weight w gets roughly w shares
+    of capacity no matter how many requests it queues. A client may queue at
+    most max_queue_per_client requests; past that, or when the whole queue
+    is full and the client already has the largest backlog, requests are
+    rejected immediately with ServiceOverloadedError. A full queue otherwise
+    makes room by evicting the newest request of the largest backlog, so one
+    client cannot crowd everyone else out.
+    """
+    def __init__(
+        self,
+        max_concurrency: int = 16,
+        kind_limits: Optional[Dict[str, int]] = None,
+        max_queue: int = 256,
+        weights: Optional[Dict[str, float]] = None,
+        max_queue_per_client: Optional[int] = None
+    ):
+        self.max_concurrency = max_concurrency
+        self.kind_limits = kind_limits or {}
+        self.max_queue = max_queue
+        self.max_queue_per_client = max_queue_per_client or max_queue
+        self.weights = weights or {}
+        self._active = 0
+        self._active_by_kind: Dict[str, int] = {}
+        self._waiters: List[_Waiter] = []
+        self._client_tags: Dict[str, float] = {}
+        self._virtual_time = 0.0
+        self._seq = itertools.count()
+        self._stats: Dict[str, _KindStats] = {}
+
+    def _has_capacity(self, kind: str) -> bool:
+        limit = self.kind_limits.get(kind)
+        return self._active < self.max_concurrency and (
+            limit is None or self._active_by_kind.get(kind, 0) < limit
+        )
+
+    def _grant(self, kind: str) -> None:
+        self._active += 1
+        self._active_by_kind[kind] = self._active_by_kind.get(kind, 0) + 1
+
+    def _release(self, kind: str) -> None:
+        self._active -= 1
+        self._active_by_kind[kind] -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self._waiters and self._active < self.max_concurrency:
+            eligible = [w for w in self._waiters if self._has_capacity(w.kind)]
+            if not eligible:
+                return
+            waiter = min(eligible, key=lambda w: (w.tag, w.seq))
+            self._waiters.remove(waiter)
+            if waiter.future.done():
+                # Cancelled while queued, before its task could dequeue itself
+                continue
+            self._virtual_time = max(self._virtual_time, waiter.tag)
+            self._grant(waiter.kind)
+            waiter.future.set_result(None)
+
+        if len(self._client_tags) > 1024:
+            # Clients whose tag is behind virtual time have no backlog to remember
+            self._client_tags = {
+                client: tag for client, tag in self._client_tags.items()
+                if tag > self._virtual_time
+            }
+
+    def retry_after(self, kind: str) -> int:
+        """Estimate seconds until a queued request of this kind would run."""
+        stats = self._stats.get(kind)
+        avg_service = (stats.total_service / stats.admitted) if stats and stats.admitted else 1.0
+        slots = self.kind_limits.get(kind, self.max_concurrency) or 1
+        return max(1, int(avg_service * (len(self._waiters) + 1) / slots))
+
+    def _backlogs(self) -> Dict[str, int]:
+        backlogs: Dict[str, int] = {}
+        for waiter in self._waiters:
+            backlogs[waiter.client] = backlogs.get(waiter.client, 0) + 1
+        return backlogs
+
+    def _overloaded(self, kind: str, client: str, reason: str) -> ServiceOverloadedError:
+        self._stats.setdefault(kind, _KindStats()).rejected += 1
+        return ServiceOverloadedError(
+            "Ollama",
+            self.retry_after(kind),
+            {"queue_depth": len(self._waiters), "kind": kind, "client": client, "reason": reason}
+        )
+
+    def _make_room(self, kind: str, client: str) -> None:
+        """Enforce the queue limits for a request about to be queued by client.
+
+        Raises ServiceOverloadedError if the request itself has to go;
+        otherwise, if the queue is full, evicts the newest request of the
+        client with the largest backlog.
+        """
+        backlogs = self._backlogs()
+        own = backlogs.get(client, 0)
+        if own >= self.max_queue_per_client:
+            raise self._overloaded(kind, client, "client_queue_full")
+        if len(self._waiters) < self.max_queue:
+            return
+
+        heaviest = max(backlogs, key=backlogs.__getitem__)
+        if backlogs[heaviest] <= own + 1:
+            # Evicting would only move the newcomer ahead of an equal backlog
+            raise self._overloaded(kind, client, "queue_full")
+        victim = max((w for w in self._waiters if w.client == heaviest), key=lambda w: w.seq)
+        self._waiters.remove(victim)
+        # The newest waiter holds its client's latest tag; give that share back
+        self._client_tags[heaviest] = victim.tag - 1.0 / self.weights.get(heaviest, 1.0)
+        victim.future.set_exception(self._overloaded(victim.kind, heaviest, "evicted"))
+
+    @asynccontextmanager
+    async def slot(self, kind: str, client: Optional[str] = None) -> AsyncIterator[None]:
+        """Hold an admission slot for the duration of the block."""
+        client = client or client_identity.get()
+        stats = self._stats.setdefault(kind, _KindStats())
+        started = time.perf_counter()
+
+        if not self._waiters and self._has_capacity(kind):
+            self._grant(kind)
+        else:
+            self._make_room(kind, client)
+            weight = self.weights.get(client, 1.0)
+            tag = max(self._virtual_time, self._client_tags.get(client, 0.0)) + 1.0 / weight
+            self._client_tags[client] = tag
+            waiter = _Waiter(
+                tag=tag,
+                seq=next(self._seq),
+                client=client,
+                kind=kind,
+                future=asyncio.get_running_loop().create_future()
+            )
+            self._waiters.append(waiter)
+            self._dispatch()
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                elif waiter.future.done() and not waiter.future.cancelled():
+                    # Granted just as we were cancelled; hand the slot on
+                    self._release(kind)
+                raise
+
+        admitted_at = time.perf_counter()
+        wait = admitted_at - started
+        stats.admitted += 1
+        stats.total_wait += wait
+        stats.max_wait = max(stats.max_wait, wait)
+        try:
+            yield
+        finally:
+            stats.total_service += time.perf_counter() - admitted_at
+            self._release(kind)
+
+    def stats(self) -> Dict[str, Any]:
+        queued_by_kind: Dict[str, int] = {}
+        for waiter in self._waiters:
+            queued_by_kind[waiter.kind] = queued_by_kind.get(waiter.kind, 0) + 1
+        return {
+            "active": self._active,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": len(self._waiters),
+            "max_queue": self.max_queue,
+            "max_queue_per_client": self.max_queue_per_client,
+            "queued_by_client": self._backlogs(),
+            "kinds": {
+                kind: {
+                    **stats.as_dict(),
+                    "active": self._active_by_kind.get(kind, 0),
+                    "limit": self.kind_limits.get(kind),
+                    "queued": queued_by_kind.get(kind, 0)
+                }
+                for kind, stats in self._stats.items()
+            }
+        }
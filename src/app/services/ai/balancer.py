@@ -0,0 +1,230 @@
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Set
+from collections import OrderedDict
+from contextlib import AsyncExitStack, asynccontextmanager
+import asyncio
+import itertools
+import time
+import httpx
+from loguru import logger
+
+def model_tag(model: str) -> str:
+    """Normalize a model name to Ollama's name:tag form."""
+    return model if ":" in model else f"{model}:latest"
+
+class OllamaBackend:
+    """One Ollama server and its routing state"""
+    def __init__(self, url: str, client: httpx.AsyncClient):
+        self.url = url
+        self.client = client
+        self.outstanding = 0
+        self.healthy = True
+        self.loaded_models: Set[str] = set()
+        self.failures = 0
+        self.ejected_at: Optional[float] = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "loaded_models": sorted(self.loaded_models),
+            "failures": self.failures
+        }
+
+class OllamaBalancer:
+    """Routes requests across Ollama backends by least outstanding requests.
+
+    Backends with the requested model loaded are preferred. A backend is
+    ejected after `eject_after` consecutive connection errors or 5xx
+    responses and re-admitted by the active probe loop, which also refreshes
+    each backend's loaded models from /api/ps. If every backend is ejected,
+    requests are still routed rather than failing outright. Requests carrying
+    a session id stick to the backend that served the session before.
+    request() and stream() retry on the next backend when one answers 404
+    because it does not have the model.
+    """
+    def __init__(
+        self,
+        backends: List[OllamaBackend],
+        probe_interval: float = 10.0,
+        eject_after: int = 3,
+        max_sessions: int = 10000
+    ):
+        if not backends:
+            raise ValueError("At least one Ollama backend is required")
+        self.backends = backends
+        self.probe_interval = probe_interval
+        self.eject_after = eject_after
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, OllamaBackend]" = OrderedDict()
+        self._rotation = itertools.count()
+        self._probe_task: Optional[asyncio.Task] = None
+
+    def _choose(
+        self,
+        model: str,
+        session_id: Optional[str],
+        exclude: Sequence[OllamaBackend] = ()
+    ) -> OllamaBackend:
+        if session_id is not None:
+            backend = self._sessions.get(session_id)
+            if backend is not None and backend.healthy and backend not in exclude:
+                self._sessions.move_to_end(session_id)
+                return backend
+
+        remaining = [b for b in self.backends if b not in exclude] or self.backends
+        candidates = [b for b in remaining if b.healthy] or remaining
+        tag = model_tag(model)
+        warm = [b for b in candidates if tag in b.loaded_models]
+        candidates = warm or candidates
+
+        # Rotate the starting point so ties are spread across backends
+        offset = next(self._rotation) % len(candidates)
+        rotated = candidates[offset:] + candidates[:offset]
+        backend = min(rotated, key=lambda b: b.outstanding)
+
+        if session_id is not None:
+            self._sessions[session_id] = backend
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return backend
+
+    @asynccontextmanager
+    async def backend(
+        self,
+        model: str,
+        session_id: Optional[str] = None,
+        exclude: Sequence[OllamaBackend] = ()
+    ) -> AsyncIterator[OllamaBackend]:
+        """Pick a backend for the duration of one upstream request."""
+        self.start()
+        backend = self._choose(model, session_id, exclude)
+        backend.outstanding += 1
+        try:
+            yield backend
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code >= 500:
+                self._record_failure(backend, f"HTTP {e.response.status_code}")
+            elif e.response.status_code == 404:
+                backend.loaded_models.discard(model_tag(model))
+            raise
+        except httpx.RequestError as e:
+            self._record_failure(backend, str(e))
+            raise
+        else:
+            backend.failures = 0
+            backend.loaded_models.add(model_tag(model))
+        finally:
+            backend.outstanding -= 1
+
+    def _fail_over(self, model: str, error: httpx.HTTPStatusError, tried: List[OllamaBackend]) -> bool:
+        """Whether to retry elsewhere after tried[-1] failed with this error."""
+        if error.response.status_code != 404 or len(tried) >= len(self.backends):
+            return False
+        logger.info(f"Model {model} not found on {tried[-1].url}, trying another backend")
+        return True
+
+    async def request(
+        self,
+        model: str,
+        method: str,
+        path: str,
+        session_id: Optional[str] = None,
+        **kwargs: Any
+    ) -> httpx.Response:
+        """Send a request, raising for its status, on the next backend if one lacks the model."""
+        tried: List[OllamaBackend] = []
+        while True:
+            try:
+                async with self.backend(model, session_id, exclude=tried) as backend:
+                    tried.append(backend)
+                    response = await backend.client.request(method, path, **kwargs)
+                    response.raise_for_status()
+                    return response
+            except httpx.HTTPStatusError as e:
+                if not self._fail_over(model, e, tried):
+                    raise
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        model: str,
+        method: str,
+        path: str,
+        session_id: Optional[str] = None,
+        **kwargs: Any
+    ) -> AsyncIterator[httpx.Response]:
+        """Open a streaming request like request(); failover only happens before the first byte."""
+        tried: List[OllamaBackend] = []
+        yielded = False
+        while True:
+            try:
+                async with AsyncExitStack() as stack:
+                    backend = await stack.enter_async_context(
+                        self.backend(model, session_id, exclude=tried)
+                    )
+                    tried.append(backend)
+                    response = await stack.enter_async_context(
+                        backend.client.stream(method, path, **kwargs)
+                    )
+                    response.raise_for_status()
+                    yielded = True
+                    yield response
+                    return
+            except httpx.HTTPStatusError as e:
+                if yielded or not self._fail_over(model, e, tried):
+                    raise
+
+    def _record_failure(self, backend: OllamaBackend, reason: str) -> None:
+        backend.failures += 1
+        if backend.healthy and backend.failures >= self.eject_after:
+            logger.warning(f"Ejecting Ollama backend {backend.url}: {reason}")
+            backend.healthy = False
+            backend.ejected_at = time.monotonic()
+
+    def start(self) -> None:
+        """Start the background probe loop if it is not running."""
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.create_task(self._probe_loop())
+
+    async def _probe_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.probe_interval)
+            await asyncio.gather(*(self.probe(b) for b in self.backends))
+
+    async def probe(self, backend: OllamaBackend) -> bool:
+        """Check a backend and refresh its loaded models."""
+        try:
+            response = await backend.client.get("/api/ps", timeout=5.0)
+            response.raise_for_status()
+            backend.loaded_models = {
+                model_tag(m.get("name") or m.get("model", ""))
+                for m in response.json().get("models", [])
+            }
+        except Exception as e:
+            if backend.healthy:
+                self._record_failure(backend, f"probe failed: {e}")
+            return False
+
+        if not backend.healthy:
+            logger.info(f"Re-admitting Ollama backend {backend.url}")
+        backend.healthy = True
+        backend.failures = 0
+        backend.ejected_at = None
+        return True
+
+    async def close(self) -> None:
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backends": [b.stats() for b in self.backends],
+            "sticky_sessions": len(self._sessions)
+        }
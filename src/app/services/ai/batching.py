@@ -0,0 +1,89 @@
+from typing import Awaitable, Callable, List, Optional, Set, Tuple, Type
+import asyncio
+import numpy as np
+from loguru import logger
+
+EmbedBatchFn = Callable[[List[str]], Awaitable[np.ndarray]]
+
+class EmbeddingBatcher:
+    """Coalesces concurrent single-text embed calls into batched upstream calls.
+
+    Texts submitted within `window` seconds of the first pending one (or until
+    `max_batch_size` is reached) are embedded in one request, and each result
+    is routed back to the future of the caller that submitted it. When a
+    batch fails with one of `split_on`, it is retried in halves until the
+    failing inputs are isolated, so only their callers see the error.
+    """
+    def __init__(
+        self,
+        embed_batch: EmbedBatchFn,
+        window: float = 0.005,
+        max_batch_size: int = 64,
+        split_on: Tuple[Type[BaseException], ...] = (Exception,)
+    ):
+        self.embed_batch = embed_batch
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.split_on = split_on
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, text: str) -> np.ndarray:
+        """Queue a text for the next batch and wait for its embedding."""
+        if self.window <= 0 or self.max_batch_size <= 1:
+            return (await self.embed_batch([text]))[0]
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        batch = [(text, future) for text, future in batch if not future.done()]
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        batch = [(text, future) for text, future in batch if not future.done()]
+        if not batch:
+            return
+        try:
+            embeddings = await self.embed_batch([text for text, _ in batch])
+        except Exception as e:
+            if len(batch) > 1 and isinstance(e, self.split_on):
+                middle = len(batch) // 2
+                await asyncio.gather(self._run(batch[:middle]), self._run(batch[middle:]))
+                return
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), embedding in zip(batch, embeddings):
+            if not future.done():
+                future.set_result(embedding)
+
+    async def close(self) -> None:
+        """Flush pending texts and wait for in-flight batches."""
+        self._flush()
+        if self._tasks:
+            results = await asyncio.gather(*self._tasks, return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.error(f"Error flushing embedding batch: {result}")
@@ -0,0 +1,205 @@
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
+from collections import OrderedDict
+import asyncio
+import hashlib
+import unicodedata
+import numpy as np
+from loguru import logger
+
+def normalize_text(text: str) -> str:
+    """Normalize text so trivially different inputs share a cache entry."""
+    return unicodedata.normalize("NFC", text).strip()
+
+Embedding = Union[np.ndarray, Sequence[float]]
+
+def pack_embedding(embedding: Embedding) -> bytes:
+    """Encode an embedding as little-endian float32 bytes."""
+    return np.asarray(embedding, dtype="<f4").tobytes()
+
+def unpack_embedding(data: bytes) -> np.ndarray:
+    """View little-endian float32 bytes as a read-only embedding array."""
+    return np.frombuffer(data, dtype="<f4")
+
+class EmbeddingCache:
+    """Content-addressed embedding cache with an in-process LRU and a Redis tier.
+
+    Entries are keyed on (model, sha256 of normalized text). The LRU tier is
+    bounded by the total size of the stored float32 bytes; the Redis tier is
+    optional and any Redis failure degrades to memory-only caching.
+    """
+    def __init__(
+        self,
+        redis: Optional[Any] = None,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: Optional[int] = None,
+        prefix: str = "emb"
+    ):
+        self.redis = redis
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.prefix = prefix
+        self._entries: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._bytes = 0
+        self._active_model: Optional[str] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def digest(text: str) -> str:
+        return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+    def _redis_key(self, model: str, digest: str) -> str:
+        return f"{self.prefix}:{model}:{digest}"
+
+    async def get(self, model: str, text: str) -> Optional[np.ndarray]:
+        """Get a cached embedding, or None on a miss."""
+        return (await self.get_many(model, [text]))[0]
+
+    async def get_many(self, model: str, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Get cached embeddings for many texts, None for each miss."""
+        await self._activate(model)
+        digests = [self.digest(text) for text in texts]
+        results: List[Optional[np.ndarray]] = [None] * len(texts)
+        remote: List[int] = []
+
+        for i, digest in enumerate(digests):
+            data = self._entries.get((model, digest))
+            if data is None:
+                remote.append(i)
+                continue
+            self._entries.move_to_end((model, digest))
+            self.hits += 1
+            results[i] = unpack_embedding(data)
+
+        if remote and self.redis is not None:
+            try:
+                values = await self.redis.mget(
+                    [self._redis_key(model, digests[i]) for i in remote]
+                )
+            except Exception as e:
+                logger.warning(f"Embedding cache Redis read failed: {e}")
+                values = [None] * len(remote)
+
+            for i, data in zip(remote, values):
+                if data is None:
+                    continue
+                self.redis_hits += 1
+                self._store((model, digests[i]), data)
+                results[i] = unpack_embedding(data)
+
+        self.misses += sum(1 for result in results if result is None)
+        return results
+
+    async def set(self, model: str, text: str, embedding: Embedding) -> None:
+        await self.set_many(model, [text], [embedding])
+
+    async def set_many(
+        self,
+        model: str,
+        texts: List[str],
+        embeddings: Sequence[Embedding]
+    ) -> None:
+        """Store embeddings in both tiers."""
+        await self._activate(model)
+        items = [
+            (self.digest(text), pack_embedding(embedding))
+            for text, embedding in zip(texts, embeddings)
+        ]
+        for digest, data in items:
+            self._store((model, digest), data)
+
+        if self.redis is None or not items:
+            return
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for digest, data in items:
+                    pipe.set(self._redis_key(model, digest), data, ex=self.ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Embedding cache Redis write failed: {e}")
+
+    def _store(self, key: Tuple[str, str], data: bytes) -> None:
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous)
+        if len(data) > self.max_bytes:
+            return
+
+        self._entries[key] = data
+        self._bytes += len(data)
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+
+    async def _activate(self, model: str) -> None:
+        """Drop entries for the previous model when the configured model changes.
+
+        Keys carry the model, so stale Redis entries can never be returned;
+        they are unlinked in the background rather than on this request.
+        """
+        if model == self._active_model:
+            return
+
+        previous = self._active_model
+        if self.redis is not None:
+            try:
+                stored = await self.redis.getset(f"{self.prefix}:active_model", model)
+                if stored is not None:
+                    previous = stored.decode() if isinstance(stored, bytes) else stored
+            except Exception as e:
+                logger.warning(f"Embedding cache Redis model check failed: {e}")
+
+        if previous is not None and previous != model:
+            logger.info(f"Embedding model changed from {previous} to {model}, invalidating cache")
+            self._drop_model(previous)
+            if self.redis is not None:
+                task = asyncio.create_task(self._unlink_model(previous))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        self._active_model = model
+
+    async def invalidate_model(self, model: str) -> None:
+        """Remove every cached embedding produced by a model."""
+        self._drop_model(model)
+        await self._unlink_model(model)
+
+    def _drop_model(self, model: str) -> None:
+        for key in [key for key in self._entries if key[0] == model]:
+            self._bytes -= len(self._entries.pop(key))
+
+    async def _unlink_model(self, model: str) -> None:
+        if self.redis is None:
+            return
+        try:
+            batch = []
+            async for key in self.redis.scan_iter(match=f"{self.prefix}:{model}:*", count=1000):
+                batch.append(key)
+                if len(batch) >= 1000:
+                    await self.redis.unlink(*batch)
+                    batch = []
+            if batch:
+                await self.redis.unlink(*batch)
+        except Exception as e:
+            logger.warning(f"Embedding cache Redis invalidation failed: {e}")
+
+    async def close(self) -> None:
+        """Wait for background Redis invalidations to finish."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.redis_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.redis_hits) / lookups if lookups else 0.0
+        }
@@ -1,5 +1,8 @@
-from typing import List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
+import asyncio
+import json
 import httpx
+import numpy as np
 from loguru import logger
 from pydantic import BaseModel
 
@@ -9,8 +12,16 @@ from ...core.exceptions import (
     ModelNotLoadedError,
     EmbeddingError,
     GenerationError,
-    ServiceConnectionError
+    ServiceConnectionError,
+    ValidationError
 )
+from .admission import AdmissionScheduler
+from .balancer import OllamaBackend, OllamaBalancer, model_tag
+from .batching import EmbeddingBatcher
+from .cache import EmbeddingCache
+from .semantic_cache import SemanticCache
+from .singleflight import SingleFlight
+from ...utils.vectors import parse_embeddings
 
 class EmbeddingRequest(BaseModel):
     model: str
@@ -21,61 +32,375 @@ class EmbeddingResponse(BaseModel):
     embedding: List[float]
 
 class OllamaService:
-    def __init__(self):
-        self.base_url = settings.OLLAMA_HOST
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        semantic_cache: Optional[SemanticCache] = None,
+        admission: Optional[AdmissionScheduler] = None,
+        balancer: Optional[OllamaBalancer] = None
+    ):
+        self.base_url = base_url or settings.OLLAMA_HOST
         self.model = settings.OLLAMA_MODEL
+        self._owned_client: Optional[httpx.AsyncClient] = None
+        if balancer is None:
+            if http_client is None:
+                http_client = self._owned_client = httpx.AsyncClient(
+                    base_url=self.base_url,
+                    timeout=httpx.Timeout(settings.OLLAMA_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT)
+                )
+            balancer = OllamaBalancer(
+                [OllamaBackend(self.base_url, http_client)],
+                probe_interval=settings.OLLAMA_PROBE_INTERVAL
+            )
+        self.balancer = balancer
+        self.keep_alive = settings.OLLAMA_KEEP_ALIVE
+        self.warmup_models = settings.OLLAMA_WARMUP_MODELS or [self.model]
+        self.residency_refresh = settings.OLLAMA_RESIDENCY_REFRESH
+        self.ready = False
+        self._residency_task: Optional[asyncio.Task] = None
+        self.embedding_cache = embedding_cache or EmbeddingCache(
+            max_bytes=settings.OLLAMA_EMBED_CACHE_MAX_BYTES
+        )
+        self.max_batch_size = settings.OLLAMA_EMBED_MAX_BATCH
+        self.batcher = EmbeddingBatcher(
+            self._embed_admitted,
+            window=settings.OLLAMA_EMBED_BATCH_WINDOW_MS / 1000,
+            max_batch_size=self.max_batch_size,
+            split_on=(EmbeddingError,)
+        )
+        self.max_parallel_batches = settings.OLLAMA_EMBED_MAX_PARALLEL
+        self.semantic_cache = semantic_cache
+        self.admission = admission or AdmissionScheduler(
+            max_concurrency=settings.OLLAMA_MAX_CONCURRENCY,
+            kind_limits={
+                "embed": settings.OLLAMA_MAX_CONCURRENT_EMBED,
+                "generate": settings.OLLAMA_MAX_CONCURRENT_GENERATE
+            },
+            max_queue=settings.OLLAMA_MAX_QUEUE,
+            weights=settings.OLLAMA_CLIENT_WEIGHTS,
+            max_queue_per_client=settings.OLLAMA_MAX_QUEUE_PER_CLIENT
+        )
+        self.singleflight = SingleFlight()
+        self.dedupe_embed = settings.OLLAMA_SINGLEFLIGHT_EMBED
+        self.dedupe_generate = settings.OLLAMA_SINGLEFLIGHT_GENERATE
 
     async def get_embedding(self, text: str) -> List[float]:
         """Get embeddings for text using Ollama."""
+        return (await self.get_embedding_array(text)).tolist()
+
+    async def get_embedding_array(self, text: str) -> np.ndarray:
+        """Get an embedding as a float32 array.
+
+        Cached embeddings are returned directly; concurrent misses are
+        coalesced into batched upstream requests.
+        """
         if not text:
             raise ValidationError("Text cannot be empty")
-            
-        async with httpx.AsyncClient() as client:
+
+        cached = await self.embedding_cache.get(self.model, text)
+        if cached is not None:
+            return cached
+
+        if not self.dedupe_embed:
+            return await self._embed_and_cache(text)
+        return await self.singleflight.do(
+            ("embed", self.model, self.embedding_cache.digest(text)),
+            lambda: self._embed_and_cache(text)
+        )
+
+    async def _embed_and_cache(self, text: str) -> np.ndarray:
+        embedding = await self.batcher.submit(text)
+        await self.embedding_cache.set(self.model, text, embedding)
+        return embedding
+
+    async def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Get embeddings for many texts using Ollama's multi-input embed API."""
+        return (await self.get_embeddings_array(texts)).tolist()
+
+    async def get_embeddings_array(self, texts: List[str]) -> np.ndarray:
+        """Get embeddings for many texts as a (len(texts), dim) float32 matrix."""
+        if not texts:
+            raise ValidationError("Texts cannot be empty")
+        if not all(texts):
+            raise ValidationError("Texts cannot contain empty strings")
+
+        cached = await self.embedding_cache.get_many(self.model, texts)
+        missing = [i for i, embedding in enumerate(cached) if embedding is None]
+        if not missing:
+            return np.stack(cached)
+
+        # Embed each distinct text once even if it repeats within the batch
+        missing_texts = list(dict.fromkeys(texts[i] for i in missing))
+        chunks = [
+            missing_texts[i:i + self.max_batch_size]
+            for i in range(0, len(missing_texts), self.max_batch_size)
+        ]
+        semaphore = asyncio.Semaphore(self.max_parallel_batches)
+
+        async def embed_chunk(chunk: List[str]) -> np.ndarray:
+            async with semaphore:
+                return await self._embed_admitted(chunk)
+
+        results = await asyncio.gather(*(embed_chunk(chunk) for chunk in chunks))
+        computed = np.concatenate(results)
+
+        embeddings = np.empty((len(texts), computed.shape[1]), dtype=np.float32)
+        row_of = {text: row for row, text in enumerate(missing_texts)}
+        for i, embedding in enumerate(cached):
+            embeddings[i] = computed[row_of[texts[i]]] if embedding is None else embedding
+        await self.embedding_cache.set_many(self.model, missing_texts, computed)
+        return embeddings
+
+    async def _embed_admitted(self, texts: List[str]) -> np.ndarray:
+        """Embed one upstream batch under one "embed" admission slot.
+
+        Slots are taken per upstream request rather than per caller, so
+        callers waiting in the coalescing window hold no capacity. A
+        coalesced batch is charged to the client whose call dispatched it.
+        """
+        async with self.admission.slot("embed"):
+            return await self._embed_batch(texts)
+
+    async def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Embed a batch of texts in a single upstream request."""
+        try:
+            response = await self.balancer.request(
+                self.model,
+                "POST",
+                "/api/embed",
+                json={
+                    "model": self.model,
+                    "input": texts,
+                    **self._keep_alive_options()
+                }
+            )
+            embeddings = parse_embeddings(response.content)
+            if len(embeddings) != len(texts):
+                raise EmbeddingError(
+                    f"Expected {len(texts)} embeddings, got {len(embeddings)}"
+                )
+            return embeddings
+        except (EmbeddingError, ServiceConnectionError):
+            raise
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                raise ModelNotLoadedError(self.model)
+            raise EmbeddingError(f"Failed to get embedding: {str(e)}")
+        except httpx.RequestError as e:
+            raise ServiceConnectionError("Ollama", str(e))
+        except Exception as e:
+            logger.error(f"Unexpected error getting embedding: {e}")
+            raise AIServiceError(f"Unexpected error: {str(e)}")
+
+    async def generate_text(
+        self,
+        prompt: str,
+        *,
+        use_cache: bool = True,
+        session_id: Optional[str] = None,
+        **kwargs
+    ) -> str:
+        """Generate text using Ollama.
+
+        When a semantic cache is configured, a stored completion for a
+        sufficiently similar prompt is returned instead; pass
+        `use_cache=False` to bypass it. Identical concurrent requests share
+        one upstream call when their options are dedupe-safe (see
+        `_can_dedupe`). Requests with the same `session_id` stick to one
+        backend.
+        """
+        if not prompt:
+            raise ValidationError("Prompt cannot be empty")
+
+        if self.semantic_cache is None or not use_cache:
+            return await self._generate_shared(prompt, session_id, **kwargs)
+
+        options_key = SemanticCache.options_key(kwargs)
+        try:
+            vector = await self.get_embedding(prompt)
+        except Exception as e:
+            logger.warning(f"Semantic cache bypassed, prompt embedding failed: {e}")
+            return await self._generate_shared(prompt, session_id, **kwargs)
+
+        cached = await self.semantic_cache.lookup(vector, self.model, options_key)
+        if cached is not None:
+            return cached
+
+        text = await self._generate_shared(prompt, session_id, **kwargs)
+        await self.semantic_cache.store(vector, prompt, text, self.model, options_key)
+        return text
+
+    async def _generate_shared(self, prompt: str, session_id: Optional[str] = None, **kwargs) -> str:
+        if not self._can_dedupe(kwargs):
+            return await self._generate(prompt, session_id, **kwargs)
+        return await self.singleflight.do(
+            ("generate", self.model, prompt, json.dumps(kwargs, sort_keys=True, default=str)),
+            lambda: self._generate(prompt, session_id, **kwargs)
+        )
+
+    def _can_dedupe(self, kwargs: Dict[str, Any]) -> bool:
+        """Whether identical requests with these options may share a result.
+
+        In "deterministic" mode only temperature 0 or a fixed seed qualify.
+        """
+        if self.dedupe_generate == "always":
+            return True
+        if self.dedupe_generate != "deterministic":
+            return False
+        options = kwargs.get("options") or {}
+        temperature = options.get("temperature", kwargs.get("temperature"))
+        seed = options.get("seed", kwargs.get("seed"))
+        return temperature == 0 or seed is not None
+
+    async def _generate(self, prompt: str, session_id: Optional[str] = None, **kwargs) -> str:
+        async with self.admission.slot("generate"):
             try:
-                response = await client.post(
-                    f"{self.base_url}/api/embeddings",
+                response = await self.balancer.request(
+                    self.model,
+                    "POST",
+                    "/api/generate",
+                    session_id,
                     json={
                         "model": self.model,
-                        "prompt": text
+                        "prompt": prompt,
+                        **self._keep_alive_options(),
+                        **kwargs,
+                        "stream": False
                     }
                 )
-                response.raise_for_status()
                 data = response.json()
-                return data["embedding"]
+                return data["response"]
             except httpx.HTTPStatusError as e:
                 if e.response.status_code == 404:
                     raise ModelNotLoadedError(self.model)
-                raise EmbeddingError(f"Failed to get embedding: {str(e)}")
+                raise GenerationError(f"Failed to generate text: {str(e)}")
             except httpx.RequestError as e:
                 raise ServiceConnectionError("Ollama", str(e))
             except Exception as e:
-                logger.error(f"Unexpected error getting embedding: {e}")
+                logger.error(f"Unexpected error generating text: {e}")
                 raise AIServiceError(f"Unexpected error: {str(e)}")
 
-    async def generate_text(self, prompt: str, **kwargs) -> str:
-        """Generate text using Ollama."""
+    async def stream_text(
+        self,
+        prompt: str,
+        session_id: Optional[str] = None,
+        **kwargs
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream generation chunks from Ollama as they are produced.
+
+        Yields Ollama's NDJSON chunks (`response` token text, and on the last
+        chunk `done` plus timing stats). Closing or cancelling the iterator
+        closes the upstream connection, which stops the generation in Ollama.
+        Requests with the same `session_id` stick to one backend.
+        """
         if not prompt:
             raise ValidationError("Prompt cannot be empty")
-            
-        async with httpx.AsyncClient() as client:
+
+        async with self.admission.slot("generate"):
             try:
-                response = await client.post(
-                    f"{self.base_url}/api/generate",
+                async with self.balancer.stream(
+                    self.model,
+                    "POST",
+                    "/api/generate",
+                    session_id,
                     json={
                         "model": self.model,
                         "prompt": prompt,
-                        **kwargs
+                        **self._keep_alive_options(),
+                        **kwargs,
+                        "stream": True
                     }
-                )
-                response.raise_for_status()
-                data = response.json()
-                return data["response"]
+                ) as response:
+                    async for line in response.aiter_lines():
+                        if not line:
+                            continue
+                        chunk = json.loads(line)
+                        if "error" in chunk:
+                            raise GenerationError(f"Failed to generate text: {chunk['error']}")
+                        yield chunk
+                        if chunk.get("done"):
+                            break
+            except GenerationError:
+                raise
             except httpx.HTTPStatusError as e:
                 if e.response.status_code == 404:
                     raise ModelNotLoadedError(self.model)
                 raise GenerationError(f"Failed to generate text: {str(e)}")
             except httpx.RequestError as e:
                 raise ServiceConnectionError("Ollama", str(e))
-            except Exception as e:
-                logger.error(f"Unexpected error generating text: {e}")
-                raise AIServiceError(f"Unexpected error: {str(e)}")
\ No newline at end of file
+
+    def _keep_alive_options(self) -> Dict[str, Any]:
+        return {"keep_alive": self.keep_alive} if self.keep_alive else {}
+
+    async def start_residency(self) -> None:
+        """Warm up the configured models in the background and keep them resident."""
+        if self._residency_task is None or self._residency_task.done():
+            self._residency_task = asyncio.create_task(self._residency_loop())
+
+    async def _residency_loop(self) -> None:
+        # Retry quickly until the models are resident, then refresh slowly
+        while True:
+            await self.warm_up()
+            await asyncio.sleep(self.residency_refresh if self.ready else 5.0)
+
+    async def warm_up(self) -> bool:
+        """Load every warm-up model that is not resident on a backend.
+
+        Returns whether all warm-up models are now resident somewhere, which
+        is also stored in `ready`.
+        """
+        await asyncio.gather(*(self.balancer.probe(b) for b in self.balancer.backends))
+        loads = [
+            self._load_model(backend, model)
+            for backend in self.balancer.backends
+            if backend.healthy
+            for model in self.warmup_models
+            if model_tag(model) not in backend.loaded_models
+        ]
+        if loads:
+            await asyncio.gather(*loads)
+
+        resident = set().union(*(b.loaded_models for b in self.balancer.backends if b.healthy))
+        ready = all(model_tag(model) in resident for model in self.warmup_models)
+        if ready and not self.ready:
+            logger.info(f"Ollama models resident: {', '.join(self.warmup_models)}")
+        self.ready = ready
+        return ready
+
+    async def _load_model(self, backend: OllamaBackend, model: str) -> None:
+        """Load a model with a zero-token request, falling back to embed for embedding-only models."""
+        try:
+            response = await backend.client.post(
+                "/api/generate",
+                json={"model": model, **self._keep_alive_options()}
+            )
+            if response.status_code == 400:
+                response = await backend.client.post(
+                    "/api/embed",
+                    json={"model": model, "input": [], **self._keep_alive_options()}
+                )
+            response.raise_for_status()
+            backend.loaded_models.add(model_tag(model))
+            logger.info(f"Loaded model {model} on {backend.url}")
+        except Exception as e:
+            logger.warning(f"Failed to load model {model} on {backend.url}: {e}")
+
+    async def cleanup(self):
+        """Stop background tasks, flush pending embeddings and close the HTTP client if this service created it"""
+        if self._residency_task is not None:
+            self._residency_task.cancel()
+            try:
+                await self._residency_task
+            except asyncio.CancelledError:
+                pass
+            self._residency_task = None
+        await self.batcher.close()
+        await self.embedding_cache.close()
+        if self.semantic_cache is not None:
+            await self.semantic_cache.close()
+        await self.balancer.close()
+        if self._owned_client is not None:
+            await self._owned_client.aclose()
+            self._owned_client = None
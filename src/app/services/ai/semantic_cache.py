@@ -0,0 +1,187 @@
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+import asyncio
+import hashlib
+import json
+import time
+from loguru import logger
+from qdrant_client.http import models
+
+from ...core.exceptions import CollectionNotFoundError
+
+class SemanticCache:
+    """Completion cache that matches prompts by embedding similarity.
+
+    Entries live in a dedicated Qdrant collection and only match prompts for
+    the same model and generation options. Entries older than `ttl` are
+    ignored and swept in a background task every `sweep_interval` stores;
+    when the collection grows past `max_entries` the oldest entries are
+    deleted. Cache failures are logged and never fail the generation itself.
+    """
+    def __init__(
+        self,
+        qdrant: Any,
+        collection_name: str = "llm_response_cache",
+        threshold: float = 0.95,
+        ttl: Optional[int] = 86400,
+        max_entries: int = 100000,
+        sweep_interval: int = 100
+    ):
+        self.qdrant = qdrant
+        self.collection_name = collection_name
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.sweep_interval = sweep_interval
+        self._stores_since_sweep = 0
+        self._sweep_task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def options_key(options: Dict[str, Any]) -> str:
+        return hashlib.sha256(
+            json.dumps(options, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+
+    def _scope_filter(self, model: str, options_key: str) -> models.Filter:
+        conditions = [
+            models.FieldCondition(key="model", match=models.MatchValue(value=model)),
+            models.FieldCondition(key="options_key", match=models.MatchValue(value=options_key))
+        ]
+        if self.ttl:
+            conditions.append(
+                models.FieldCondition(
+                    key="created_at",
+                    range=models.Range(gte=time.time() - self.ttl)
+                )
+            )
+        return models.Filter(must=conditions)
+
+    async def lookup(
+        self,
+        vector: List[float],
+        model: str,
+        options_key: str
+    ) -> Optional[str]:
+        """Return a stored completion for a similar prompt, if any."""
+        try:
+            results = await self.qdrant.search_vectors(
+                self.collection_name,
+                vector,
+                limit=1,
+                query_filter=self._scope_filter(model, options_key),
+                # The TTL bound makes every filter unique; caching would only churn
+                use_cache=False
+            )
+        except CollectionNotFoundError:
+            results = []
+        except Exception as e:
+            logger.warning(f"Semantic cache lookup failed: {e}")
+            return None
+
+        if results and results[0]["score"] >= self.threshold:
+            self.hits += 1
+            return results[0]["payload"]["response"]
+        self.misses += 1
+        return None
+
+    async def store(
+        self,
+        vector: List[float],
+        prompt: str,
+        response: str,
+        model: str,
+        options_key: str
+    ) -> None:
+        """Insert a completion, creating the collection on first use."""
+        payload = {
+            "prompt": prompt,
+            "response": response,
+            "model": model,
+            "options_key": options_key,
+            "created_at": time.time()
+        }
+        try:
+            try:
+                await self._upsert(vector, payload)
+            except CollectionNotFoundError:
+                await self._create_collection(len(vector))
+                await self._upsert(vector, payload)
+
+            self._stores_since_sweep += 1
+            if self._stores_since_sweep >= self.sweep_interval:
+                self._stores_since_sweep = 0
+                self._start_sweep()
+        except Exception as e:
+            logger.warning(f"Semantic cache store failed: {e}")
+
+    def _start_sweep(self) -> None:
+        if self._sweep_task is None or self._sweep_task.done():
+            self._sweep_task = asyncio.create_task(self._sweep_in_background())
+
+    async def _sweep_in_background(self) -> None:
+        try:
+            await self.sweep()
+        except Exception as e:
+            logger.warning(f"Semantic cache sweep failed: {e}")
+
+    async def _upsert(self, vector: List[float], payload: Dict[str, Any]) -> None:
+        await self.qdrant.upsert_vectors(
+            self.collection_name,
+            [vector],
+            [payload],
+            [str(uuid4())]
+        )
+
+    async def _create_collection(self, vector_size: int) -> None:
+        await self.qdrant.create_collection(self.collection_name, vector_size)
+        for field, schema in (
+            ("model", models.PayloadSchemaType.KEYWORD),
+            ("options_key", models.PayloadSchemaType.KEYWORD),
+            ("created_at", models.PayloadSchemaType.FLOAT)
+        ):
+            await self.qdrant.create_payload_index(self.collection_name, field, schema)
+
+    async def sweep(self) -> None:
+        """Delete expired entries, then the oldest ones beyond max_entries."""
+        if self.ttl:
+            await self.qdrant.delete_vectors(
+                self.collection_name,
+                delete_filter=models.Filter(must=[
+                    models.FieldCondition(
+                        key="created_at",
+                        range=models.Range(lt=time.time() - self.ttl)
+                    )
+                ])
+            )
+
+        excess = await self.qdrant.count_vectors(self.collection_name) - self.max_entries
+        if excess > 0:
+            oldest, _ = await self.qdrant.scroll_vectors(
+                self.collection_name,
+                limit=excess,
+                order_by="created_at",
+                with_payload=False
+            )
+            await self.qdrant.delete_vectors(
+                self.collection_name,
+                ids=[point["id"] for point in oldest]
+            )
+
+    async def close(self) -> None:
+        if self._sweep_task is not None:
+            self._sweep_task.cancel()
+            try:
+                await self._sweep_task
+            except asyncio.CancelledError:
+                pass
+            self._sweep_task = None
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
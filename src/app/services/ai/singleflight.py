@@ -0,0 +1,56 @@
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+from collections import defaultdict
+import asyncio
+
+class SingleFlight:
+    """Shares one upstream call between concurrent callers with the same key.
+
+    Keys are tuples whose first element names the endpoint, which is used to
+    group the saved-call counters. The shared call is cancelled only once
+    every caller waiting on it has been cancelled.
+    """
+    def __init__(self):
+        self._calls: Dict[Hashable, Tuple[asyncio.Task, list]] = {}
+        self.upstream_calls: Dict[str, int] = defaultdict(int)
+        self.saved_calls: Dict[str, int] = defaultdict(int)
+
+    async def do(self, key: Tuple[Any, ...], fn: Callable[[], Awaitable[Any]]) -> Any:
+        endpoint = str(key[0])
+        entry = self._calls.get(key)
+        if entry is None:
+            self.upstream_calls[endpoint] += 1
+            task = asyncio.ensure_future(fn())
+            entry = (task, [0])
+            self._calls[key] = entry
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            self.saved_calls[endpoint] += 1
+
+        task, waiters = entry
+        waiters[0] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if waiters[0] == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            waiters[0] -= 1
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        entry = self._calls.get(key)
+        if entry is not None and entry[0] is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every waiter went away
+            task.exception()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            endpoint: {
+                "upstream_calls": calls,
+                "saved_calls": self.saved_calls[endpoint],
+                "in_flight": sum(1 for key in self._calls if str(key[0]) == endpoint)
+            }
+            for endpoint, calls in self.upstream_calls.items()
+        }
@@ -0,0 +1,78 @@
+from typing import Any, List, Optional, Protocol, Tuple
+from qdrant_client.http import models
+
+class VectorBackend(Protocol):
+    """The subset of the AsyncQdrantClient API that QdrantService relies on.
+
+    AsyncQdrantClient satisfies it as is; NumpyIndex implements it in-process.
+    """
+    async def create_collection(
+        self,
+        collection_name: str,
+        vectors_config: models.VectorParams,
+        **kwargs: Any
+    ) -> bool: ...
+
+    async def delete_collection(self, collection_name: str, **kwargs: Any) -> bool: ...
+
+    async def collection_exists(self, collection_name: str, **kwargs: Any) -> bool: ...
+
+    async def get_collection(self, collection_name: str, **kwargs: Any) -> Any: ...
+
+    async def upsert(
+        self,
+        collection_name: str,
+        points: Any,
+        wait: bool = True,
+        **kwargs: Any
+    ) -> Any: ...
+
+    async def search(
+        self,
+        collection_name: str,
+        query_vector: Any,
+        query_filter: Optional[models.Filter] = None,
+        limit: int = 10,
+        with_payload: Any = True,
+        with_vectors: Any = False,
+        **kwargs: Any
+    ) -> List[models.ScoredPoint]: ...
+
+    async def search_batch(
+        self,
+        collection_name: str,
+        requests: List[models.SearchRequest],
+        **kwargs: Any
+    ) -> List[List[models.ScoredPoint]]: ...
+
+    async def count(
+        self,
+        collection_name: str,
+        count_filter: Optional[models.Filter] = None,
+        exact: bool = True,
+        **kwargs: Any
+    ) -> models.CountResult: ...
+
+    async def delete(self, collection_name: str, points_selector: Any, **kwargs: Any) -> Any: ...
+
+    async def scroll(
+        self,
+        collection_name: str,
+        scroll_filter: Optional[models.Filter] = None,
+        limit: int = 10,
+        offset: Optional[Any] = None,
+        with_payload: Any = True,
+        with_vectors: Any = False,
+        order_by: Optional[Any] = None,
+        **kwargs: Any
+    ) -> Tuple[List[models.Record], Optional[Any]]: ...
+
+    async def create_payload_index(
+        self,
+        collection_name: str,
+        field_name: str,
+        field_schema: Any = None,
+        **kwargs: Any
+    ) -> Any: ...
+
+    async def close(self, **kwargs: Any) -> None: ...
@@ -0,0 +1,138 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from dataclasses import dataclass
+import asyncio
+import random
+import time
+import httpx
+from loguru import logger
+from qdrant_client.http.exceptions import ResponseHandlingException, UnexpectedResponse
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+@dataclass
+class ChunkProgress:
+    index: int
+    total_chunks: int
+    points: int
+    attempts: int
+    elapsed: float
+    points_done: int
+    points_per_sec: float
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "chunk": self.index,
+            "total_chunks": self.total_chunks,
+            "points": self.points,
+            "attempts": self.attempts,
+            "elapsed_ms": self.elapsed * 1000,
+            "points_done": self.points_done,
+            "points_per_sec": self.points_per_sec
+        }
+
+ProgressCallback = Callable[[ChunkProgress], Any]
+
+def is_transient(error: Exception) -> bool:
+    """Whether a failed upsert is worth retrying."""
+    if isinstance(error, (httpx.TransportError, ResponseHandlingException, asyncio.TimeoutError)):
+        return True
+    if isinstance(error, UnexpectedResponse):
+        return error.status_code in RETRYABLE_STATUS_CODES
+    # grpc.aio.AioRpcError, without importing grpc when it is not installed
+    code = getattr(error, "code", None)
+    if callable(code):
+        try:
+            return getattr(code(), "name", None) in ("UNAVAILABLE", "DEADLINE_EXCEEDED", "RESOURCE_EXHAUSTED")
+        except Exception:
+            return False
+    return False
+
+async def run_chunks(
+    total: int,
+    upsert_chunk: Callable[[int, int], Awaitable[None]],
+    chunk_size: int,
+    parallel: int,
+    max_retries: int = 3,
+    backoff: float = 0.5,
+    on_progress: Optional[ProgressCallback] = None,
+    detail: bool = False
+) -> Dict[str, Any]:
+    """Upsert `total` points as [start, end) chunks with at most `parallel` in flight.
+
+    Workers pull the next chunk only after finishing their current one, so
+    memory and Qdrant load stay bounded however large the input is. Each
+    chunk is retried on transient errors with jittered exponential backoff;
+    the first permanent failure stops the remaining chunks and is raised.
+    Returns totals; with detail, also one progress entry per chunk.
+    """
+    bounds: List[Tuple[int, int]] = [
+        (start, min(start + chunk_size, total)) for start in range(0, total, chunk_size)
+    ]
+    pending = iter(enumerate(bounds))
+    progress: List[ChunkProgress] = []
+    started = time.monotonic()
+    points_done = 0
+    retries = 0
+
+    async def upsert_with_retry(start: int, end: int) -> int:
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                await upsert_chunk(start, end)
+                return attempt
+            except Exception as e:
+                if attempt > max_retries or not is_transient(e):
+                    raise
+                delay = backoff * 2 ** (attempt - 1) * (0.5 + random.random())
+                logger.warning(f"Chunk [{start}:{end}] failed ({e}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    async def worker():
+        nonlocal points_done, retries
+        for index, (start, end) in pending:
+            chunk_started = time.monotonic()
+            attempts = await upsert_with_retry(start, end)
+            points_done += end - start
+            retries += attempts - 1
+            elapsed = time.monotonic() - started
+            chunk = ChunkProgress(
+                index=index,
+                total_chunks=len(bounds),
+                points=end - start,
+                attempts=attempts,
+                elapsed=time.monotonic() - chunk_started,
+                points_done=points_done,
+                points_per_sec=points_done / elapsed if elapsed else 0.0
+            )
+            if detail:
+                progress.append(chunk)
+            logger.debug(
+                f"Upserted chunk {index + 1}/{len(bounds)} "
+                f"({points_done}/{total} points, {chunk.points_per_sec:.0f} points/s)"
+            )
+            if on_progress is not None:
+                result = on_progress(chunk)
+                if asyncio.iscoroutine(result):
+                    await result
+
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, min(parallel, len(bounds))))]
+    try:
+        await asyncio.gather(*workers)
+    except Exception:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        raise
+
+    elapsed = time.monotonic() - started
+    result = {
+        "points": total,
+        "chunks": len(bounds),
+        "retries": retries,
+        "elapsed_ms": elapsed * 1000,
+        "points_per_sec": total / elapsed if elapsed else 0.0
+    }
+    if detail:
+        result["progress"] = [chunk.as_dict() for chunk in sorted(progress, key=lambda c: c.index)]
+    return result
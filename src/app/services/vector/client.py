@@ -0,0 +1,69 @@
+from typing import Any, Dict, List, Optional
+import httpx
+import numpy as np
+import orjson
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http.exceptions import UnexpectedResponse
+
+def create_qdrant_client(
+    host: str,
+    port: int,
+    grpc_port: int = 6334,
+    prefer_grpc: bool = False,
+    timeout: Optional[int] = None,
+    max_connections: int = 64,
+    max_keepalive_connections: int = 16
+) -> AsyncQdrantClient:
+    """Create a non-blocking Qdrant client with a bounded connection pool."""
+    return AsyncQdrantClient(
+        host=host,
+        port=port,
+        grpc_port=grpc_port,
+        prefer_grpc=prefer_grpc,
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections
+        )
+    )
+
+def build_upsert_body(
+    ids: List[Any],
+    vectors: np.ndarray,
+    payloads: Optional[List[Dict[str, Any]]] = None
+) -> bytes:
+    """Serialize a points batch straight from the float32 matrix, without Python floats."""
+    batch: Dict[str, Any] = {"ids": ids, "vectors": np.ascontiguousarray(vectors, dtype=np.float32)}
+    if payloads is not None:
+        batch["payloads"] = payloads
+    return orjson.dumps({"batch": batch}, option=orjson.OPT_SERIALIZE_NUMPY)
+
+class RestUpserter:
+    """Upserts numpy batches through Qdrant's REST API.
+
+    qdrant-client validates a Batch into pydantic models, which needs the
+    matrix as nested lists of Python floats. This sends the same request
+    with the body encoded by orjson from the array itself, on the shared
+    pooled client for Qdrant's REST port, which its owner closes. Errors
+    are raised as UnexpectedResponse, so retries treat them like the
+    client's.
+    """
+    def __init__(self, http_client: httpx.AsyncClient):
+        self._http = http_client
+
+    async def upsert(
+        self,
+        collection_name: str,
+        ids: List[Any],
+        vectors: np.ndarray,
+        payloads: Optional[List[Dict[str, Any]]] = None,
+        wait: bool = True
+    ) -> None:
+        response = await self._http.put(
+            f"/collections/{collection_name}/points",
+            params={"wait": "true" if wait else "false"},
+            content=build_upsert_body(ids, vectors, payloads),
+            headers={"Content-Type": "application/json"}
+        )
+        if response.is_error:
+            raise UnexpectedResponse.for_response(response)
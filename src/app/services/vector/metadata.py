@@ -0,0 +1,63 @@
+from typing import Any, Dict, Optional
+from dataclasses import dataclass, field
+import time
+
+@dataclass
+class CollectionInfo:
+    name: str
+    exists: bool
+    vector_size: Optional[int] = None
+    distance: Optional[str] = None
+    points_count: Optional[int] = None
+    fetched_at: float = field(default_factory=time.monotonic)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "exists": self.exists,
+            "vector_size": self.vector_size,
+            "distance": self.distance,
+            "points_count": self.points_count
+        }
+
+class CollectionMetadataCache:
+    """Short-lived in-process cache of collection existence and vector config.
+
+    Lets hot paths skip a collection_exists round trip per call. Missing
+    collections are cached too, so repeated calls against a bad name fail
+    fast. Point counts are only as fresh as the TTL.
+    """
+    def __init__(self, ttl: float = 30.0):
+        self.ttl = ttl
+        self._entries: Dict[str, CollectionInfo] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name: str) -> Optional[CollectionInfo]:
+        info = self._entries.get(name)
+        if info is None or time.monotonic() - info.fetched_at > self.ttl:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return info
+
+    def set(self, info: CollectionInfo) -> None:
+        if self.ttl > 0:
+            self._entries[info.name] = info
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Forget one collection, or every collection when no name is given."""
+        if name is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(name, None)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "collections": len(self._entries),
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
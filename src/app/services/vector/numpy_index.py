@@ -0,0 +1,620 @@
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from types import SimpleNamespace
+from uuid import UUID
+import asyncio
+import os
+import shutil
+import struct
+import numpy as np
+import orjson
+from loguru import logger
+from qdrant_client.http import models
+
+def _point_id(point_id: Any) -> Any:
+    """Normalize ids the way Qdrant does: unsigned ints or canonical UUID strings."""
+    if isinstance(point_id, (int, np.integer)):
+        return int(point_id)
+    return str(UUID(str(point_id)))
+
+_RECORD = struct.Struct("<II")
+
+def _id_order(point_id: Any) -> Tuple[bool, Any]:
+    return isinstance(point_id, str), point_id
+
+def _payload_values(payload: Dict[str, Any], key: str) -> List[Any]:
+    """Values at a dotted payload key, with arrays flattened."""
+    values: List[Any] = [payload]
+    for part in key.split("."):
+        found = []
+        for value in values:
+            if isinstance(value, dict) and part in value:
+                value = value[part]
+                found.extend(value if isinstance(value, list) else [value])
+        values = found
+    return values
+
+def _matches(condition: Any, point_id: Any, payload: Dict[str, Any]) -> bool:
+    if isinstance(condition, models.Filter):
+        return _matches_filter(condition, point_id, payload)
+    if isinstance(condition, models.HasIdCondition):
+        return point_id in {_point_id(i) for i in condition.has_id}
+    if isinstance(condition, models.IsEmptyCondition):
+        return not [v for v in _payload_values(payload, condition.is_empty.key) if v is not None]
+    if isinstance(condition, models.IsNullCondition):
+        return None in _payload_values(payload, condition.is_null.key)
+    if not isinstance(condition, models.FieldCondition):
+        raise ValueError(f"Unsupported filter condition {type(condition).__name__}")
+
+    values = [v for v in _payload_values(payload, condition.key) if v is not None]
+    match = condition.match
+    if isinstance(match, models.MatchValue):
+        return match.value in values
+    if isinstance(match, models.MatchAny):
+        return any(v in match.any for v in values)
+    if isinstance(match, models.MatchExcept):
+        return bool(values) and all(v not in match.except_ for v in values)
+    if isinstance(match, models.MatchText):
+        return any(isinstance(v, str) and match.text in v for v in values)
+    if match is not None:
+        raise ValueError(f"Unsupported match {type(match).__name__}")
+
+    bounds = condition.range
+    if bounds is None:
+        raise ValueError(f"Unsupported condition on {condition.key}")
+    return any(
+        isinstance(v, (int, float))
+        and (bounds.gt is None or v > bounds.gt)
+        and (bounds.gte is None or v >= bounds.gte)
+        and (bounds.lt is None or v < bounds.lt)
+        and (bounds.lte is None or v <= bounds.lte)
+        for v in values
+    )
+
+def _matches_filter(query_filter: models.Filter, point_id: Any, payload: Dict[str, Any]) -> bool:
+    def as_list(conditions: Any) -> List[Any]:
+        if conditions is None:
+            return []
+        return conditions if isinstance(conditions, list) else [conditions]
+
+    must, should, must_not = (
+        as_list(query_filter.must), as_list(query_filter.should), as_list(query_filter.must_not)
+    )
+    return (
+        all(_matches(c, point_id, payload) for c in must)
+        and (not should or any(_matches(c, point_id, payload) for c in should))
+        and not any(_matches(c, point_id, payload) for c in must_not)
+    )
+
+def _select_payload(payload: Dict[str, Any], with_payload: Any) -> Optional[Dict[str, Any]]:
+    if with_payload is True:
+        return dict(payload)
+    if not with_payload:
+        return None
+    if isinstance(with_payload, models.PayloadSelectorExclude):
+        return {k: v for k, v in payload.items() if k not in with_payload.exclude}
+    keys = with_payload.include if isinstance(with_payload, models.PayloadSelectorInclude) else with_payload
+    return {k: payload[k] for k in keys if k in payload}
+
+class _Collection:
+    """One collection: a contiguous float32 matrix plus parallel id and payload lists."""
+    def __init__(self, size: int, distance: models.Distance):
+        if distance not in (models.Distance.COSINE, models.Distance.DOT, models.Distance.EUCLID):
+            raise ValueError(f"Unsupported distance {distance}")
+        self.size = size
+        self.distance = distance
+        self.vectors = np.empty((16, size), dtype=np.float32)
+        self.count = 0
+        self.ids: List[Any] = []
+        self.payloads: List[Dict[str, Any]] = []
+        self.rows: Dict[Any, int] = {}
+        self.payload_schema: Dict[str, Any] = {}
+        self.version = 0
+        self.mutations = 0
+
+    def prepare(self, vectors: Any) -> np.ndarray:
+        matrix = np.array(vectors, dtype=np.float32, ndmin=2)
+        if matrix.shape[1] != self.size:
+            raise ValueError(f"Wrong input: expected dim {self.size}, got {matrix.shape[1]}")
+        if self.distance == models.Distance.COSINE:
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+    def reserve(self, rows: int) -> None:
+        """Grow capacity geometrically; also copies a read-only memory map into RAM."""
+        if rows <= len(self.vectors) and self.vectors.flags.writeable:
+            return
+        capacity = max(rows, 2 * len(self.vectors), 16)
+        grown = np.empty((capacity, self.size), dtype=np.float32)
+        grown[:self.count] = self.vectors[:self.count]
+        self.vectors = grown
+
+    def upsert(self, ids: List[Any], vectors: Any, payloads: List[Optional[Dict[str, Any]]]) -> np.ndarray:
+        """Insert or overwrite points, returning the prepared matrix that was stored."""
+        matrix = self.prepare(vectors)
+        self.reserve(self.count + len(ids))
+        self.mutations += 1
+        for point_id, vector, payload in zip(ids, matrix, payloads):
+            row = self.rows.get(point_id)
+            if row is None:
+                row = self.count
+                self.count += 1
+                self.rows[point_id] = row
+                self.ids.append(point_id)
+                self.payloads.append({})
+            self.vectors[row] = vector
+            self.payloads[row] = payload or {}
+        return matrix
+
+    def delete(self, ids: List[Any]) -> None:
+        """Swap-remove each point so the live rows stay contiguous."""
+        for point_id in ids:
+            row = self.rows.pop(point_id, None)
+            if row is None:
+                continue
+            self.reserve(self.count)
+            self.mutations += 1
+            last = self.count - 1
+            if row != last:
+                self.vectors[row] = self.vectors[last]
+                self.ids[row] = self.ids[last]
+                self.payloads[row] = self.payloads[last]
+                self.rows[self.ids[row]] = row
+            self.ids.pop()
+            self.payloads.pop()
+            self.count -= 1
+
+    def mask(self, query_filter: Optional[models.Filter]) -> Optional[np.ndarray]:
+        if query_filter is None:
+            return None
+        return np.fromiter(
+            (_matches_filter(query_filter, self.ids[i], self.payloads[i]) for i in range(self.count)),
+            dtype=bool,
+            count=self.count
+        )
+
+    def score(self, q: np.ndarray) -> np.ndarray:
+        """Score every live row against a prepared query vector."""
+        matrix = self.vectors[:self.count]
+        if self.distance == models.Distance.EUCLID:
+            return np.linalg.norm(matrix - q, axis=1)
+        return matrix @ q
+
+    def rank(
+        self,
+        scores: np.ndarray,
+        limit: int,
+        offset: int = 0,
+        query_filter: Optional[models.Filter] = None,
+        score_threshold: Optional[float] = None
+    ) -> List[Tuple[int, float]]:
+        """Top-k rows by score with an argpartition, after filtering."""
+        keys = scores if self.distance == models.Distance.EUCLID else -scores
+        candidates = np.arange(self.count)
+        mask = self.mask(query_filter)
+        if mask is not None:
+            candidates = candidates[mask]
+        if score_threshold is not None:
+            passes = (scores[candidates] <= score_threshold if self.distance == models.Distance.EUCLID
+                      else scores[candidates] >= score_threshold)
+            candidates = candidates[passes]
+
+        k = min(limit + offset, len(candidates))
+        if k == 0:
+            return []
+        if k < len(candidates):
+            candidates = candidates[np.argpartition(keys[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(keys[candidates], kind="stable")][offset:]
+        return [(int(row), float(scores[row])) for row in candidates]
+
+class NumpyIndex:
+    """In-process vector store implementing the VectorBackend subset of AsyncQdrantClient.
+
+    Meant for small collections and for running without a Qdrant server.
+    With a `path`, every write is appended to a per-collection log before
+    it returns, so a crashed process loses nothing it acknowledged. flush(),
+    close() and a log outgrowing wal_max_bytes fold the log into a snapshot
+    under `<path>/<name>/`: a versioned .npy matrix, then meta.json naming
+    that version, whose rename is the single commit point. Writes made while
+    a snapshot is being written go to the next version's log, which loading
+    replays too. All file I/O runs in order on a single worker thread, so
+    the event loop never waits on disk. Snapshots are reopened memory-mapped, so startup does not read the vectors into RAM
+    until the first write. Searches over more than offload_above matrix
+    elements score in a worker thread. Payload indexes are accepted but not
+    needed: filters are evaluated by scanning payloads.
+    """
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        wal_max_bytes: int = 64 * 1024 * 1024,
+        offload_above: int = 1 << 20
+    ):
+        self.path = Path(path) if path else None
+        self.wal_max_bytes = wal_max_bytes
+        self.offload_above = offload_above
+        self._collections: Dict[str, _Collection] = {}
+        self._dirty: set = set()
+        self._wal_bytes: Dict[str, int] = {}
+        # Open log files by collection, with their version; only touched by the I/O thread
+        self._wals: Dict[str, Tuple[int, BinaryIO]] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if self.path is not None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="numpy-index")
+            self._load()
+
+    def _run(self, fn: Any, *args: Any) -> "asyncio.Future[Any]":
+        """Queue fn on the I/O thread; jobs run in submission order."""
+        return asyncio.get_running_loop().run_in_executor(self._executor, partial(fn, *args))
+
+    def _get(self, collection_name: str) -> _Collection:
+        collection = self._collections.get(collection_name)
+        if collection is None:
+            raise ValueError(f"Collection {collection_name} not found")
+        return collection
+
+    async def create_collection(
+        self,
+        collection_name: str,
+        vectors_config: models.VectorParams,
+        **kwargs: Any
+    ) -> bool:
+        if collection_name in self._collections:
+            raise ValueError(f"Collection {collection_name} already exists")
+        collection = _Collection(vectors_config.size, vectors_config.distance)
+        self._collections[collection_name] = collection
+        if self.path is not None:
+            await self._snapshot(collection_name)
+        return True
+
+    async def delete_collection(self, collection_name: str, **kwargs: Any) -> bool:
+        existed = self._collections.pop(collection_name, None) is not None
+        self._dirty.discard(collection_name)
+        self._wal_bytes.pop(collection_name, None)
+        if self.path is not None:
+            await self._run(self._remove, collection_name)
+        return existed
+
+    async def collection_exists(self, collection_name: str, **kwargs: Any) -> bool:
+        return collection_name in self._collections
+
+    async def get_collection(self, collection_name: str, **kwargs: Any) -> Any:
+        collection = self._get(collection_name)
+        return SimpleNamespace(
+            status=models.CollectionStatus.GREEN,
+            points_count=collection.count,
+            payload_schema=dict(collection.payload_schema),
+            config=SimpleNamespace(
+                params=SimpleNamespace(
+                    vectors=models.VectorParams(size=collection.size, distance=collection.distance)
+                )
+            )
+        )
+
+    async def upsert(
+        self,
+        collection_name: str,
+        points: Any,
+        wait: bool = True,
+        **kwargs: Any
+    ) -> models.UpdateResult:
+        collection = self._get(collection_name)
+        if isinstance(points, models.Batch):
+            ids, vectors = points.ids, points.vectors
+            payloads = points.payloads or [None] * len(ids)
+        else:
+            ids = [point.id for point in points]
+            vectors = [point.vector for point in points]
+            payloads = [point.payload for point in points]
+        ids = [_point_id(i) for i in ids]
+        payloads = [payload or {} for payload in payloads]
+        matrix = collection.upsert(ids, vectors, payloads)
+        await self._log(collection_name, {"op": "upsert", "ids": ids, "payloads": payloads}, matrix)
+        return models.UpdateResult(operation_id=0, status=models.UpdateStatus.COMPLETED)
+
+    def _scored(
+        self,
+        collection: _Collection,
+        hits: List[Tuple[int, float]],
+        with_payload: Any,
+        with_vectors: Any
+    ) -> List[models.ScoredPoint]:
+        return [
+            models.ScoredPoint(
+                id=collection.ids[row],
+                version=0,
+                score=score,
+                payload=_select_payload(collection.payloads[row], with_payload),
+                vector=collection.vectors[row].tolist() if with_vectors else None
+            )
+            for row, score in hits
+        ]
+
+    async def search(
+        self,
+        collection_name: str,
+        query_vector: Any,
+        query_filter: Optional[models.Filter] = None,
+        limit: int = 10,
+        offset: Optional[int] = None,
+        with_payload: Any = True,
+        with_vectors: Any = False,
+        score_threshold: Optional[float] = None,
+        **kwargs: Any
+    ) -> List[models.ScoredPoint]:
+        collection = self._get(collection_name)
+        if collection.count == 0:
+            return []
+        q = collection.prepare(query_vector)[0]
+        if collection.count * collection.size > self.offload_above:
+            mutations = collection.mutations
+            scores = await asyncio.to_thread(collection.score, q)
+            if collection.mutations != mutations:
+                # A write landed while the thread was scoring; rescore the current rows
+                scores = collection.score(q)
+        else:
+            scores = collection.score(q)
+        hits = collection.rank(scores, limit, offset or 0, query_filter, score_threshold)
+        return self._scored(collection, hits, with_payload, with_vectors)
+
+    async def search_batch(
+        self,
+        collection_name: str,
+        requests: List[models.SearchRequest],
+        **kwargs: Any
+    ) -> List[List[models.ScoredPoint]]:
+        return [
+            await self.search(
+                collection_name,
+                request.vector,
+                query_filter=request.filter,
+                limit=request.limit,
+                offset=request.offset,
+                with_payload=request.with_payload,
+                with_vectors=request.with_vector,
+                score_threshold=request.score_threshold
+            )
+            for request in requests
+        ]
+
+    async def count(
+        self,
+        collection_name: str,
+        count_filter: Optional[models.Filter] = None,
+        exact: bool = True,
+        **kwargs: Any
+    ) -> models.CountResult:
+        collection = self._get(collection_name)
+        mask = collection.mask(count_filter)
+        return models.CountResult(count=collection.count if mask is None else int(mask.sum()))
+
+    async def delete(self, collection_name: str, points_selector: Any, **kwargs: Any) -> models.UpdateResult:
+        collection = self._get(collection_name)
+        if isinstance(points_selector, models.FilterSelector):
+            mask = collection.mask(points_selector.filter)
+            ids = [collection.ids[row] for row in np.flatnonzero(mask)]
+        elif isinstance(points_selector, models.PointIdsList):
+            ids = [_point_id(i) for i in points_selector.points]
+        else:
+            ids = [_point_id(i) for i in points_selector]
+        collection.delete(ids)
+        await self._log(collection_name, {"op": "delete", "ids": ids})
+        return models.UpdateResult(operation_id=0, status=models.UpdateStatus.COMPLETED)
+
+    async def scroll(
+        self,
+        collection_name: str,
+        scroll_filter: Optional[models.Filter] = None,
+        limit: int = 10,
+        offset: Optional[Any] = None,
+        with_payload: Any = True,
+        with_vectors: Any = False,
+        order_by: Optional[Any] = None,
+        **kwargs: Any
+    ) -> Tuple[List[models.Record], Optional[Any]]:
+        collection = self._get(collection_name)
+        mask = collection.mask(scroll_filter)
+        rows = range(collection.count) if mask is None else np.flatnonzero(mask).tolist()
+
+        next_offset = None
+        if order_by is not None:
+            if isinstance(order_by, str):
+                order_by = models.OrderBy(key=order_by)
+            elif isinstance(order_by, dict):
+                order_by = models.OrderBy(**order_by)
+            keyed = [
+                (value, row) for row in rows
+                for value in _payload_values(collection.payloads[row], order_by.key)[:1]
+                if isinstance(value, (int, float))
+            ]
+            keyed.sort(key=lambda item: item[0], reverse=order_by.direction == models.Direction.DESC)
+            page = [row for _, row in keyed[:limit]]
+        else:
+            ordered = sorted(rows, key=lambda row: _id_order(collection.ids[row]))
+            if offset is not None:
+                start = _id_order(_point_id(offset))
+                ordered = [row for row in ordered if _id_order(collection.ids[row]) >= start]
+            page = ordered[:limit]
+            if len(ordered) > limit:
+                next_offset = collection.ids[ordered[limit]]
+
+        return [
+            models.Record(
+                id=collection.ids[row],
+                payload=_select_payload(collection.payloads[row], with_payload),
+                vector=collection.vectors[row].tolist() if with_vectors else None
+            )
+            for row in page
+        ], next_offset
+
+    async def create_payload_index(
+        self,
+        collection_name: str,
+        field_name: str,
+        field_schema: Any = None,
+        **kwargs: Any
+    ) -> models.UpdateResult:
+        self._get(collection_name).payload_schema[field_name] = field_schema
+        await self._log(
+            collection_name,
+            {"op": "index", "field": field_name, "schema": getattr(field_schema, "value", field_schema)}
+        )
+        return models.UpdateResult(operation_id=0, status=models.UpdateStatus.COMPLETED)
+
+    async def _log(self, name: str, record: Dict[str, Any], matrix: Optional[np.ndarray] = None) -> None:
+        """Append one write to the collection's log, compacting it into a snapshot when it grows too big."""
+        if self.path is None:
+            return
+        header = orjson.dumps(record)
+        data = b"" if matrix is None else np.ascontiguousarray(matrix, dtype=np.float32).tobytes()
+        entry = _RECORD.pack(len(header), len(data)) + header + data
+        # Queued before any await, so log order matches the order writes were applied
+        appended = self._run(self._append, name, self._collections[name].version, entry)
+        self._dirty.add(name)
+        self._wal_bytes[name] = self._wal_bytes.get(name, 0) + len(entry)
+        compacted = self._snapshot(name) if self._wal_bytes[name] > self.wal_max_bytes else None
+        await appended
+        if compacted is not None:
+            await compacted
+
+    def _append(self, name: str, version: int, entry: bytes) -> None:
+        opened = self._wals.get(name)
+        if opened is None or opened[0] != version:
+            if opened is not None:
+                opened[1].close()
+            opened = (version, open(self.path / name / f"wal-{version}.log", "ab"))
+            self._wals[name] = opened
+        opened[1].write(entry)
+        opened[1].flush()
+
+    async def flush(self) -> None:
+        """Fold each collection's log into a fresh snapshot."""
+        if self.path is None:
+            return
+        saves = [self._snapshot(name) for name in list(self._dirty) if name in self._collections]
+        self._dirty.clear()
+        await asyncio.gather(*saves)
+
+    async def close(self, **kwargs: Any) -> None:
+        if self._executor is None:
+            return
+        await self.flush()
+        await self._run(self._close_wals)
+        self._executor.shutdown(wait=False)
+        self._executor = None
+
+    def _close_wals(self) -> None:
+        for _, wal in self._wals.values():
+            wal.close()
+        self._wals.clear()
+
+    def _remove(self, name: str) -> None:
+        opened = self._wals.pop(name, None)
+        if opened is not None:
+            opened[1].close()
+        shutil.rmtree(self.path / name, ignore_errors=True)
+
+    def _snapshot(self, name: str) -> "asyncio.Future[None]":
+        """Capture a collection and queue writing it as the next snapshot version.
+
+        The version moves on right away, so writes made before the snapshot
+        is on disk are logged under the new version and survive a crash
+        either side of the meta.json rename.
+        """
+        collection = self._collections[name]
+        collection.version += 1
+        self._wal_bytes[name] = 0
+        self._dirty.discard(name)
+        meta = {
+            "version": collection.version,
+            "size": collection.size,
+            "distance": collection.distance.value,
+            "ids": list(collection.ids),
+            "payloads": list(collection.payloads),
+            "payload_schema": {
+                field: getattr(schema, "value", schema) for field, schema in collection.payload_schema.items()
+            }
+        }
+        return self._run(self._save, name, meta, collection.vectors[:collection.count].copy())
+
+    def _save(self, name: str, meta: Dict[str, Any], vectors: np.ndarray) -> None:
+        directory = self.path / name
+        directory.mkdir(parents=True, exist_ok=True)
+        version = meta["version"]
+        # The vectors go to a new versioned file; renaming meta.json over the
+        # old one is what switches to it, so a crash leaves one consistent pair
+        with open(directory / f"vectors-{version}.npy", "wb") as f:
+            np.save(f, vectors)
+            f.flush()
+            os.fsync(f.fileno())
+        with open(directory / "meta.json.tmp", "wb") as f:
+            f.write(orjson.dumps(meta))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(directory / "meta.json.tmp", directory / "meta.json")
+
+        opened = self._wals.get(name)
+        if opened is not None and opened[0] < version:
+            opened[1].close()
+            del self._wals[name]
+        for stale in [*directory.glob("vectors-*.npy"), *directory.glob("wal-*.log")]:
+            if int(stale.stem.split("-", 1)[1]) < version:
+                stale.unlink(missing_ok=True)
+
+    def _replay(self, wal_path: Path, collection: _Collection) -> None:
+        """Reapply the writes in one log, dropping a torn trailing record."""
+        if not wal_path.exists():
+            return
+        data = wal_path.read_bytes()
+        position = 0
+        while position + _RECORD.size <= len(data):
+            header_len, data_len = _RECORD.unpack_from(data, position)
+            end = position + _RECORD.size + header_len + data_len
+            if end > len(data):
+                break
+            record = orjson.loads(data[position + _RECORD.size:position + _RECORD.size + header_len])
+            if record["op"] == "upsert":
+                vectors = np.frombuffer(
+                    data, dtype=np.float32, count=data_len // 4, offset=end - data_len
+                ).reshape(-1, collection.size)
+                collection.upsert(record["ids"], vectors, record["payloads"])
+            elif record["op"] == "delete":
+                collection.delete(record["ids"])
+            elif record["op"] == "index":
+                collection.payload_schema[record["field"]] = record["schema"]
+            position = end
+        if position < len(data):
+            logger.warning(f"Dropping a torn record at the end of {wal_path}")
+            with open(wal_path, "r+b") as f:
+                f.truncate(position)
+
+    def _load(self) -> None:
+        if not self.path.is_dir():
+            return
+        for directory in sorted(self.path.iterdir()):
+            try:
+                meta = orjson.loads((directory / "meta.json").read_bytes())
+                collection = _Collection(meta["size"], models.Distance(meta["distance"]))
+                collection.version = meta["version"]
+                collection.vectors = np.load(directory / f"vectors-{collection.version}.npy", mmap_mode="r")
+                collection.count = len(meta["ids"])
+                collection.ids = meta["ids"]
+                collection.payloads = meta["payloads"]
+                collection.rows = {point_id: row for row, point_id in enumerate(collection.ids)}
+                collection.payload_schema = meta.get("payload_schema", {})
+                self._replay(directory / f"wal-{collection.version}.log", collection)
+                # Logs of a snapshot that was still being written when the process stopped
+                while (directory / f"wal-{collection.version + 1}.log").exists():
+                    collection.version += 1
+                    self._replay(directory / f"wal-{collection.version}.log", collection)
+                wal_path = directory / f"wal-{collection.version}.log"
+                self._wal_bytes[directory.name] = wal_path.stat().st_size if wal_path.exists() else 0
+                self._collections[directory.name] = collection
+                if collection.mutations:
+                    self._dirty.add(directory.name)
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                logger.error(f"Error loading vector index {directory.name}: {e}")
@@ -1,5 +1,8 @@
-from typing import List, Optional, Dict, Any
-from qdrant_client import QdrantClient
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple, Union
+import asyncio
+import httpx
+from uuid import uuid4
+import numpy as np
 from qdrant_client.http import models
 from loguru import logger
 
@@ -9,89 +12,609 @@ from ...core.exceptions import (
     CollectionNotFoundError,
     CollectionCreateError,
     VectorOperationError,
-    ServiceConnectionError
+    VectorDimensionError,
+    VectorCountError,
+    ServiceConnectionError,
+    ConfigurationError
 )
+from .bulk import ProgressCallback, run_chunks
+from .backend import VectorBackend
+from .client import RestUpserter, create_qdrant_client
+from .metadata import CollectionInfo, CollectionMetadataCache
+from .numpy_index import NumpyIndex
+from .result_cache import SearchResultCache
 
 class QdrantService:
-    def __init__(self):
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        client: Optional[VectorBackend] = None,
+        http_client: Optional[httpx.AsyncClient] = None
+    ):
+        self.metadata = CollectionMetadataCache(ttl=settings.QDRANT_METADATA_TTL)
+        self.search_cache = SearchResultCache(
+            max_bytes=settings.QDRANT_SEARCH_CACHE_MAX_BYTES,
+            ttl=settings.QDRANT_SEARCH_CACHE_TTL
+        )
+        self.rest: Optional[RestUpserter] = None
+        if client is not None:
+            self.client = client
+            return
+        if settings.VECTOR_BACKEND == "numpy":
+            self.client = NumpyIndex(path=settings.VECTOR_INDEX_PATH)
+            return
+        if settings.VECTOR_BACKEND != "qdrant":
+            raise ConfigurationError(f"Unknown VECTOR_BACKEND {settings.VECTOR_BACKEND}")
         try:
-            self.client = QdrantClient(
-                host=settings.QDRANT_HOST,
-                port=settings.QDRANT_PORT
+            self.client = create_qdrant_client(
+                host=host or settings.QDRANT_HOST,
+                port=port or settings.QDRANT_PORT,
+                grpc_port=settings.QDRANT_GRPC_PORT,
+                prefer_grpc=settings.QDRANT_PREFER_GRPC,
+                timeout=settings.QDRANT_TIMEOUT,
+                max_connections=settings.QDRANT_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.QDRANT_MAX_KEEPALIVE_CONNECTIONS
             )
+            if http_client is not None and not settings.QDRANT_PREFER_GRPC:
+                self.rest = RestUpserter(http_client)
         except Exception as e:
             raise ServiceConnectionError("Qdrant", str(e))
 
     async def create_collection(
         self,
         collection_name: str,
-        vector_size: int = 768
+        vector_size: int = 768,
+        payload_indexes: Optional[Dict[str, models.PayloadSchemaType]] = None,
+        on_disk: bool = False,
+        distance: models.Distance = models.Distance.COSINE,
+        hnsw_m: Optional[int] = None,
+        hnsw_ef_construct: Optional[int] = None,
+        quantization: Optional[str] = None,
+        quantization_always_ram: bool = True,
+        product_compression: str = "x16"
     ) -> None:
-        """Create a new collection."""
+        """Create a new collection, indexing the given payload fields for filtering.
+
+        on_disk keeps the original vectors in memory-mapped storage, and
+        quantization ("scalar", "product" or "binary") keeps a compressed
+        copy, in RAM with quantization_always_ram, for the search itself.
+        hnsw_m and hnsw_ef_construct trade index size and build time for
+        recall; unset values use Qdrant's defaults.
+        """
         try:
-            self.client.create_collection(
+            quantization_config = self._quantization_config(
+                quantization, quantization_always_ram, product_compression
+            )
+            await self.client.create_collection(
                 collection_name=collection_name,
                 vectors_config=models.VectorParams(
                     size=vector_size,
-                    distance=models.Distance.COSINE
-                )
+                    distance=distance,
+                    on_disk=on_disk or None
+                ),
+                hnsw_config=(
+                    models.HnswConfigDiff(m=hnsw_m, ef_construct=hnsw_ef_construct)
+                    if hnsw_m is not None or hnsw_ef_construct is not None else None
+                ),
+                quantization_config=quantization_config
             )
+            for field_name, field_schema in (payload_indexes or {}).items():
+                await self.client.create_payload_index(
+                    collection_name=collection_name,
+                    field_name=field_name,
+                    field_schema=field_schema
+                )
         except Exception as e:
             logger.error(f"Error creating collection: {e}")
             raise CollectionCreateError(f"Failed to create collection: {str(e)}")
+        finally:
+            self._changed(collection_name)
+
+    @staticmethod
+    def _quantization_config(
+        kind: Optional[str],
+        always_ram: bool,
+        product_compression: str
+    ) -> Optional[models.QuantizationConfig]:
+        if kind is None:
+            return None
+        if kind == "scalar":
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    always_ram=always_ram
+                )
+            )
+        if kind == "product":
+            return models.ProductQuantization(
+                product=models.ProductQuantizationConfig(
+                    compression=models.CompressionRatio(product_compression),
+                    always_ram=always_ram
+                )
+            )
+        if kind == "binary":
+            return models.BinaryQuantization(
+                binary=models.BinaryQuantizationConfig(always_ram=always_ram)
+            )
+        raise ValueError(f"Unknown quantization {kind}")
+
+    @staticmethod
+    def _search_params(
+        hnsw_ef: Optional[int],
+        oversampling: Optional[float],
+        rescore: Optional[bool]
+    ) -> Optional[models.SearchParams]:
+        if hnsw_ef is None and oversampling is None and rescore is None:
+            return None
+        quantization = None
+        if oversampling is not None or rescore is not None:
+            quantization = models.QuantizationSearchParams(
+                oversampling=oversampling,
+                rescore=rescore
+            )
+        return models.SearchParams(hnsw_ef=hnsw_ef, quantization=quantization)
+
+    async def delete_collection(self, collection_name: str) -> None:
+        """Delete a collection and all of its points."""
+        try:
+            await self.client.delete_collection(collection_name=collection_name)
+        except Exception as e:
+            logger.error(f"Error deleting collection: {e}")
+            raise VectorOperationError(f"Failed to delete collection: {str(e)}")
+        finally:
+            self._changed(collection_name)
+
+    async def get_collection_info(self, collection_name: str) -> CollectionInfo:
+        """Get a collection's existence, vector config and point count, cached for a short TTL."""
+        info = self.metadata.get(collection_name)
+        if info is not None:
+            return info
+
+        try:
+            collection = await self.client.get_collection(collection_name=collection_name)
+        except Exception as e:
+            try:
+                exists = await self.client.collection_exists(collection_name)
+            except Exception:
+                exists = True
+            if exists:
+                logger.error(f"Error fetching collection info: {e}")
+                raise VectorOperationError(f"Failed to fetch collection info: {str(e)}")
+            info = CollectionInfo(name=collection_name, exists=False)
+        else:
+            params = collection.config.params.vectors
+            # Named-vector collections have no single size to validate against
+            single = isinstance(params, models.VectorParams)
+            info = CollectionInfo(
+                name=collection_name,
+                exists=True,
+                vector_size=params.size if single else None,
+                distance=params.distance.value if single else None,
+                points_count=collection.points_count
+            )
+
+        self.metadata.set(info)
+        return info
+
+    def _changed(self, collection_name: str, confirmed: bool = True) -> None:
+        """Drop cached metadata and search results after a write.
+
+        confirmed=False marks a wait=False write that Qdrant may not have
+        applied yet, so search results are not cached until it is.
+        """
+        self.metadata.invalidate(collection_name)
+        self.search_cache.bump(collection_name, confirmed=confirmed)
+
+    async def _require_collection(
+        self,
+        collection_name: str,
+        vectors: Optional[List[Any]] = None
+    ) -> CollectionInfo:
+        """Fail before any write or search I/O if the collection or vector size is wrong."""
+        info = await self.get_collection_info(collection_name)
+        if not info.exists:
+            raise CollectionNotFoundError(collection_name)
+        if info.vector_size is not None and isinstance(vectors, np.ndarray) and vectors.ndim == 2:
+            if len(vectors) and vectors.shape[1] != info.vector_size:
+                raise VectorDimensionError(collection_name, info.vector_size, vectors.shape[1])
+        elif info.vector_size is not None and vectors is not None:
+            for i, vector in enumerate(vectors):
+                if len(vector) != info.vector_size:
+                    raise VectorDimensionError(
+                        collection_name, info.vector_size, len(vector), index=i
+                    )
+        return info
 
     async def upsert_vectors(
         self,
         collection_name: str,
-        vectors: List[List[float]],
-        payloads: List[Dict[str, Any]],
-        ids: Optional[List[str]] = None
+        vectors: Union[List[List[float]], np.ndarray],
+        payloads: Optional[List[Dict[str, Any]]] = None,
+        ids: Optional[List[str]] = None,
+        wait: bool = True
     ) -> None:
         """Upsert vectors into collection."""
+        if payloads is not None and len(payloads) != len(vectors):
+            raise VectorCountError("payloads", len(vectors), len(payloads))
+        if ids is not None and len(ids) != len(vectors):
+            raise VectorCountError("ids", len(vectors), len(ids))
+        await self._require_collection(collection_name, vectors)
         try:
-            if not self.client.collection_exists(collection_name):
-                raise CollectionNotFoundError(collection_name)
-                
-            self.client.upsert(
-                collection_name=collection_name,
-                points=models.Batch(
-                    ids=ids,
-                    vectors=vectors,
-                    payloads=payloads
-                )
-            )
-        except CollectionNotFoundError:
-            raise
+            await self._upsert_batch(collection_name, vectors, payloads, ids, wait)
         except Exception as e:
             logger.error(f"Error upserting vectors: {e}")
             raise VectorOperationError(f"Failed to upsert vectors: {str(e)}")
+        finally:
+            self.search_cache.bump(collection_name, confirmed=wait)
+
+    async def bulk_upsert(
+        self,
+        collection_name: str,
+        vectors: List[List[float]],
+        payloads: Optional[List[Dict[str, Any]]] = None,
+        ids: Optional[List[str]] = None,
+        chunk_size: Optional[int] = None,
+        parallel: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        wait: bool = True,
+        on_progress: Optional[ProgressCallback] = None,
+        detail: bool = False
+    ) -> Dict[str, Any]:
+        """Upsert a large load in chunks, several in flight at once.
+
+        With wait=False Qdrant acknowledges each chunk once it is queued
+        rather than once it is indexed. Returns totals, plus per-chunk
+        progress when detail is set.
+        """
+        if payloads is not None and len(payloads) != len(vectors):
+            raise VectorCountError("payloads", len(vectors), len(payloads))
+        if ids is not None and len(ids) != len(vectors):
+            raise VectorCountError("ids", len(vectors), len(ids))
+
+        await self._require_collection(collection_name, vectors)
+        if ids is None:
+            ids = [str(uuid4()) for _ in range(len(vectors))]
+
+        async def upsert_chunk(start: int, end: int) -> None:
+            await self._upsert_batch(
+                collection_name,
+                vectors[start:end],
+                payloads[start:end] if payloads is not None else None,
+                ids[start:end],
+                wait
+            )
+
+        try:
+            result = await run_chunks(
+                len(vectors),
+                upsert_chunk,
+                chunk_size=chunk_size or settings.QDRANT_UPSERT_CHUNK_SIZE,
+                parallel=parallel or settings.QDRANT_UPSERT_PARALLEL,
+                max_retries=settings.QDRANT_UPSERT_RETRIES if max_retries is None else max_retries,
+                on_progress=on_progress,
+                detail=detail
+            )
+        except Exception as e:
+            logger.error(f"Error bulk upserting vectors: {e}")
+            raise VectorOperationError(f"Failed to bulk upsert vectors: {str(e)}")
+        finally:
+            self._changed(collection_name, confirmed=wait)
+        return {"collection": collection_name, "wait": wait, **result}
+
+    async def _upsert_batch(
+        self,
+        collection_name: str,
+        vectors: Any,
+        payloads: Optional[List[Dict[str, Any]]],
+        ids: Optional[List[str]],
+        wait: bool
+    ) -> None:
+        """Upsert one batch; float32 matrices skip the per-float conversion over REST."""
+        ids = ids if ids is not None else [str(uuid4()) for _ in range(len(vectors))]
+        if self.rest is not None and isinstance(vectors, np.ndarray):
+            await self.rest.upsert(collection_name, ids, vectors, payloads, wait)
+            return
+        await self.client.upsert(
+            collection_name=collection_name,
+            points=models.Batch(
+                ids=ids,
+                vectors=self._as_list(vectors),
+                payloads=payloads
+            ),
+            wait=wait
+        )
 
     async def search_vectors(
         self,
         collection_name: str,
         query_vector: List[float],
-        limit: int = 5
+        limit: int = 5,
+        query_filter: Optional[Union[models.Filter, Dict[str, Any]]] = None,
+        with_vectors: bool = False,
+        with_payload: Union[bool, List[str]] = True,
+        hnsw_ef: Optional[int] = None,
+        oversampling: Optional[float] = None,
+        rescore: Optional[bool] = None,
+        use_cache: bool = True
     ) -> List[Dict[str, Any]]:
-        """Search for similar vectors."""
+        """Search for similar vectors.
+
+        The filter is evaluated by Qdrant, and with_payload may name the
+        payload fields to return instead of the whole payload. hnsw_ef,
+        oversampling and rescore tune the speed/recall trade-off of the HNSW
+        and quantized search. Results are cached until the next write to the
+        collection through this service or QDRANT_SEARCH_CACHE_TTL, and are
+        not cached while a wait=False write may still be pending; pass
+        use_cache=False for queries that are unlikely to repeat.
+        """
+        await self._require_collection(collection_name, [query_vector])
+        query_filter = self._as_filter(query_filter)
+        search_params = self._search_params(hnsw_ef, oversampling, rescore)
+        cache_key = None
+        if use_cache and self.search_cache.enabled and self.search_cache.cacheable(collection_name):
+            cache_key = self.search_cache.key(
+                collection_name,
+                self.search_cache.generation(collection_name),
+                query_vector,
+                limit,
+                query_filter.model_dump(mode="json", exclude_none=True) if query_filter else None,
+                with_vectors,
+                with_payload,
+                search_params.model_dump(mode="json", exclude_none=True) if search_params else None
+            )
+            cached = self.search_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         try:
-            if not self.client.collection_exists(collection_name):
-                raise CollectionNotFoundError(collection_name)
-                
-            results = self.client.search(
+            results = await self.client.search(
                 collection_name=collection_name,
                 query_vector=query_vector,
-                limit=limit
+                query_filter=query_filter,
+                limit=limit,
+                with_payload=with_payload,
+                with_vectors=with_vectors,
+                search_params=search_params
+            )
+            hits = [self._format_hit(hit, with_vectors) for hit in results]
+        except Exception as e:
+            logger.error(f"Error searching vectors: {e}")
+            raise VectorOperationError(f"Failed to search vectors: {str(e)}")
+
+        if cache_key is not None:
+            self.search_cache.set(cache_key, hits)
+        return hits
+
+    async def search_vectors_batch(
+        self,
+        collection_name: str,
+        queries: List[Dict[str, Any]],
+        with_vectors: bool = False,
+        with_payload: Union[bool, List[str]] = True,
+        hnsw_ef: Optional[int] = None,
+        oversampling: Optional[float] = None,
+        rescore: Optional[bool] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """Run many searches in one round trip.
+
+        Each query is a dict with "vector" and optional "limit" and "filter"
+        (a models.Filter or its dict form). The search tuning parameters
+        apply to every query. Results are in query order.
+        """
+        if not queries:
+            return []
+        await self._require_collection(collection_name, [query["vector"] for query in queries])
+        search_params = self._search_params(hnsw_ef, oversampling, rescore)
+        try:
+            requests = [
+                models.SearchRequest(
+                    vector=self._as_list(query["vector"]),
+                    limit=query.get("limit", 5),
+                    filter=self._as_filter(query.get("filter")),
+                    with_payload=with_payload,
+                    with_vector=with_vectors,
+                    params=search_params
+                )
+                for query in queries
+            ]
+            batches = await self.client.search_batch(
+                collection_name=collection_name,
+                requests=requests
+            )
+            return [[self._format_hit(hit, with_vectors) for hit in hits] for hits in batches]
+        except Exception as e:
+            logger.error(f"Error batch searching vectors: {e}")
+            raise VectorOperationError(f"Failed to batch search vectors: {str(e)}")
+
+    @staticmethod
+    def _format_hit(hit: Any, with_vectors: bool) -> Dict[str, Any]:
+        return {
+            "id": hit.id,
+            "score": hit.score,
+            "payload": hit.payload,
+            **({"vector": hit.vector} if with_vectors else {})
+        }
+
+    @staticmethod
+    def _as_list(vector: Any) -> List[float]:
+        return vector.tolist() if hasattr(vector, "tolist") else vector
+
+    @staticmethod
+    def _as_filter(query_filter: Any) -> Optional[models.Filter]:
+        if query_filter is None or isinstance(query_filter, models.Filter):
+            return query_filter
+        return models.Filter.model_validate(query_filter)
+
+    async def count_vectors(
+        self,
+        collection_name: str,
+        count_filter: Optional[models.Filter] = None
+    ) -> int:
+        """Count points in a collection, optionally matching a filter."""
+        try:
+            result = await self.client.count(
+                collection_name=collection_name,
+                count_filter=count_filter,
+                exact=True
+            )
+            return result.count
+        except Exception as e:
+            logger.error(f"Error counting vectors: {e}")
+            raise VectorOperationError(f"Failed to count vectors: {str(e)}")
+
+    async def delete_vectors(
+        self,
+        collection_name: str,
+        ids: Optional[List[str]] = None,
+        delete_filter: Optional[models.Filter] = None
+    ) -> None:
+        """Delete points by id or by filter."""
+        if ids is None and delete_filter is None:
+            raise VectorOperationError("Either ids or a filter is required to delete vectors")
+        try:
+            await self.client.delete(
+                collection_name=collection_name,
+                points_selector=(
+                    models.PointIdsList(points=ids) if ids is not None
+                    else models.FilterSelector(filter=delete_filter)
+                )
+            )
+        except Exception as e:
+            logger.error(f"Error deleting vectors: {e}")
+            raise VectorOperationError(f"Failed to delete vectors: {str(e)}")
+        finally:
+            self._changed(collection_name)
+
+    async def scroll_vectors(
+        self,
+        collection_name: str,
+        limit: int = 100,
+        offset: Optional[Any] = None,
+        scroll_filter: Optional[models.Filter] = None,
+        order_by: Optional[str] = None,
+        with_payload: bool = True,
+        with_vectors: bool = False
+    ) -> Tuple[List[Dict[str, Any]], Optional[Any]]:
+        """Page through points, returning the page and the next offset."""
+        try:
+            kwargs: Dict[str, Any] = {}
+            if order_by is not None:
+                kwargs["order_by"] = order_by
+            else:
+                kwargs["offset"] = offset
+            points, next_offset = await self.client.scroll(
+                collection_name=collection_name,
+                scroll_filter=scroll_filter,
+                limit=limit,
+                with_payload=with_payload,
+                with_vectors=with_vectors,
+                **kwargs
             )
             return [
                 {
-                    "id": hit.id,
-                    "score": hit.score,
-                    "payload": hit.payload
+                    "id": point.id,
+                    "payload": point.payload,
+                    "vector": point.vector
                 }
-                for hit in results
-            ]
-        except CollectionNotFoundError:
-            raise
+                for point in points
+            ], next_offset
         except Exception as e:
-            logger.error(f"Error searching vectors: {e}")
-            raise VectorOperationError(f"Failed to search vectors: {str(e)}")
\ No newline at end of file
+            logger.error(f"Error scrolling vectors: {e}")
+            raise VectorOperationError(f"Failed to scroll vectors: {str(e)}")
+
+    async def export_points(
+        self,
+        collection_name: str,
+        page_size: Optional[int] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield every point with its vector, one scroll page at a time.
+
+        The next page is fetched while the caller consumes the current one,
+        so at most two pages are held in memory.
+        """
+        await self._require_collection(collection_name)
+        page_size = page_size or settings.QDRANT_EXPORT_PAGE_SIZE
+
+        def fetch(offset: Any) -> "asyncio.Task[Tuple[List[Dict[str, Any]], Optional[Any]]]":
+            return asyncio.ensure_future(self.scroll_vectors(
+                collection_name, limit=page_size, offset=offset, with_vectors=True
+            ))
+
+        pending = fetch(None)
+        try:
+            while pending is not None:
+                points, next_offset = await pending
+                pending = fetch(next_offset) if next_offset is not None else None
+                if points:
+                    yield points
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    async def import_points(
+        self,
+        collection_name: str,
+        points: AsyncIterator[Dict[str, Any]],
+        batch_size: Optional[int] = None,
+        wait: bool = True,
+        vector_size: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Upsert a stream of {"id", "vector", "payload"} points in bounded batches.
+
+        Each batch goes through bulk_upsert, so it is chunked, parallel and
+        retried like any other large load; only one batch is held at a time.
+        With vector_size set, every point is checked before it joins a
+        batch; a bad one raises VectorDimensionError with its index, after
+        only the batches before it were written.
+        """
+        batch_size = batch_size or settings.QDRANT_UPSERT_CHUNK_SIZE * settings.QDRANT_UPSERT_PARALLEL
+        total = 0
+        batches = 0
+        batch: List[Dict[str, Any]] = []
+
+        async def flush() -> None:
+            nonlocal total, batches
+            await self.bulk_upsert(
+                collection_name,
+                np.asarray([point["vector"] for point in batch], dtype=np.float32),
+                [point.get("payload") or {} for point in batch],
+                [point["id"] for point in batch],
+                wait=wait
+            )
+            total += len(batch)
+            batches += 1
+            batch.clear()
+
+        async for point in points:
+            vector = point.get("vector")
+            size = 0 if vector is None else len(vector)
+            if vector_size is not None and size != vector_size:
+                raise VectorDimensionError(collection_name, vector_size, size, index=total + len(batch))
+            batch.append(point)
+            if len(batch) >= batch_size:
+                await flush()
+        if batch:
+            await flush()
+        return {"collection": collection_name, "points": total, "batches": batches}
+
+    async def create_payload_index(
+        self,
+        collection_name: str,
+        field_name: str,
+        field_schema: models.PayloadSchemaType
+    ) -> None:
+        """Index a payload field for filtering and ordering."""
+        try:
+            await self.client.create_payload_index(
+                collection_name=collection_name,
+                field_name=field_name,
+                field_schema=field_schema
+            )
+        except Exception as e:
+            logger.error(f"Error creating payload index: {e}")
+            raise VectorOperationError(f"Failed to create payload index: {str(e)}")
+
+    async def cleanup(self):
+        """Close the Qdrant client; the shared HTTP client belongs to its registry"""
+        await self.client.close()
@@ -0,0 +1,130 @@
+from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+import hashlib
+import time
+import numpy as np
+import orjson
+
+class SearchResultCache:
+    """In-process LRU of search results, invalidated by per-collection generations.
+
+    Keys hash the query vector's float32 bytes together with the limit,
+    filter, payload and vector selection, search params and the
+    collection's generation counter. Every write that goes through this
+    QdrantService bumps the generation, so entries from before the write
+    can no longer be looked up and age out of the LRU. A write Qdrant has
+    only queued (wait=False) also stops results for that collection being
+    cached until a later acknowledged write confirms it, or for at most ttl.
+
+    Generations live in this process, so the cache is per worker: writes
+    made by other workers, or to Qdrant directly, are not seen, and ttl is
+    what bounds how stale a hit can be after them. Results are held as
+    orjson bytes: the byte bound is exact and every hit hands the caller a
+    fresh copy it is free to mutate.
+    """
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, ttl: float = 60.0):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._bytes = 0
+        self._generations: Dict[str, int] = {}
+        self._unconfirmed: Dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 and self.ttl > 0
+
+    def generation(self, collection_name: str) -> int:
+        return self._generations.get(collection_name, 0)
+
+    def bump(self, collection_name: str, confirmed: bool = True) -> None:
+        """Mark a collection's data as changed.
+
+        confirmed=False is for writes Qdrant has accepted but not yet
+        applied: caching for the collection stays off until a confirmed
+        bump, or until ttl has passed.
+        """
+        self._generations[collection_name] = self.generation(collection_name) + 1
+        if confirmed:
+            self._unconfirmed.pop(collection_name, None)
+        else:
+            self._unconfirmed[collection_name] = time.monotonic() + self.ttl
+
+    def cacheable(self, collection_name: str) -> bool:
+        """Whether results for the collection may be served from or stored in the cache."""
+        deadline = self._unconfirmed.get(collection_name)
+        if deadline is None:
+            return True
+        if time.monotonic() < deadline:
+            return False
+        del self._unconfirmed[collection_name]
+        return True
+
+    def key(
+        self,
+        collection_name: str,
+        generation: int,
+        query_vector: Any,
+        limit: int,
+        query_filter: Optional[Dict[str, Any]],
+        with_vectors: bool,
+        with_payload: Any = True,
+        search_params: Optional[Dict[str, Any]] = None
+    ) -> str:
+        digest = hashlib.sha256(np.asarray(query_vector, dtype="<f4").tobytes())
+        digest.update(orjson.dumps(
+            [limit, with_vectors, with_payload, query_filter, search_params],
+            option=orjson.OPT_SORT_KEYS
+        ))
+        return f"{collection_name}:{generation}:{digest.hexdigest()}"
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[1] > self.ttl:
+            self._pop(key)
+            self.expirations += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return orjson.loads(entry[0])
+
+    def _pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[0])
+
+    def set(self, key: str, results: List[Dict[str, Any]]) -> None:
+        data = orjson.dumps(results)
+        self._pop(key)
+        if len(data) > self.max_bytes:
+            return
+
+        self._entries[key] = (data, time.monotonic())
+        self._bytes += len(data)
+        while self._bytes > self.max_bytes:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "unconfirmed": sorted(self._unconfirmed),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
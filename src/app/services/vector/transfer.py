@@ -0,0 +1,165 @@
+from typing import Any, AsyncIterator, Dict, List, Optional
+import struct
+import numpy as np
+import orjson
+
+EXPORT_FORMATS = ("ndjson", "binary")
+
+# Binary layout, all little-endian:
+#   b"AVX1" | u32 header length | header JSON
+#   then per point: u32 meta length | {"id", "payload"} JSON | dim float32s
+#   then the end record: u32 0 | u64 point count
+# NDJSON ends with an {"end": true, "count": n} line. A stream without its
+# end record, or whose count disagrees, was cut short and is rejected.
+MAGIC = b"AVX1"
+_LENGTH = struct.Struct("<I")
+_COUNT = struct.Struct("<Q")
+_VECTOR = np.dtype("<f4")
+
+def export_header(collection_name: str, vector_size: int, distance: Optional[str]) -> Dict[str, Any]:
+    return {"collection": collection_name, "vector_size": vector_size, "distance": distance}
+
+def encode_header(header: Dict[str, Any], fmt: str) -> bytes:
+    data = orjson.dumps(header)
+    if fmt == "binary":
+        return MAGIC + _LENGTH.pack(len(data)) + data
+    return data + b"\n"
+
+def encode_points(points: List[Dict[str, Any]], fmt: str) -> bytes:
+    """Encode one page of {"id", "vector", "payload"} points."""
+    if fmt != "binary":
+        return b"".join(orjson.dumps(point, option=orjson.OPT_APPEND_NEWLINE) for point in points)
+
+    parts = []
+    for point in points:
+        meta = orjson.dumps({"id": point["id"], "payload": point.get("payload")})
+        parts.append(_LENGTH.pack(len(meta)))
+        parts.append(meta)
+        parts.append(np.asarray(point["vector"], dtype=_VECTOR).tobytes())
+    return b"".join(parts)
+
+def encode_end(count: int, fmt: str) -> bytes:
+    """Encode the end record that closes a stream of count points."""
+    if fmt == "binary":
+        return _LENGTH.pack(0) + _COUNT.pack(count)
+    return orjson.dumps({"end": True, "count": count}, option=orjson.OPT_APPEND_NEWLINE)
+
+def _point_meta(meta: Any, index: int) -> Dict[str, Any]:
+    if not isinstance(meta, dict) or meta.get("id") is None:
+        raise ValueError(f"Point {index} of the export stream has no id")
+    return meta
+
+class PointStreamReader:
+    """Incrementally parse an export stream from an async iterator of byte chunks.
+
+    Only the bytes of the record being decoded are buffered, so an import
+    of any size runs in memory bounded by the caller's batch size.
+    """
+    def __init__(self, chunks: AsyncIterator[bytes], fmt: str):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported format {fmt}, expected one of {', '.join(EXPORT_FORMATS)}")
+        self._chunks = chunks.__aiter__()
+        self._buffer = bytearray()
+        self._eof = False
+        self.fmt = fmt
+        self.header: Optional[Dict[str, Any]] = None
+        self.count = 0
+
+    async def _fill(self) -> bool:
+        if self._eof:
+            return False
+        try:
+            self._buffer += await self._chunks.__anext__()
+        except StopAsyncIteration:
+            self._eof = True
+            return False
+        return True
+
+    async def _read_exact(self, size: int, required: bool = True) -> Optional[bytes]:
+        """Read size bytes; at a clean end of stream return None unless required."""
+        while len(self._buffer) < size:
+            if not await self._fill():
+                if self._buffer or required:
+                    raise ValueError("Truncated export stream")
+                return None
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    async def _read_line(self) -> Optional[bytes]:
+        start = 0
+        while True:
+            end = self._buffer.find(b"\n", start)
+            if end >= 0:
+                line = bytes(self._buffer[:end])
+                del self._buffer[:end + 1]
+                return line
+            start = len(self._buffer)
+            if not await self._fill():
+                line, self._buffer = bytes(self._buffer), bytearray()
+                return line or None
+
+    async def read_header(self) -> Dict[str, Any]:
+        if self.header is not None:
+            return self.header
+        if self.fmt == "binary":
+            if await self._read_exact(len(MAGIC)) != MAGIC:
+                raise ValueError("Not a binary vector export")
+            size = _LENGTH.unpack(await self._read_exact(_LENGTH.size))[0]
+            self.header = orjson.loads(await self._read_exact(size))
+        else:
+            line = await self._read_line()
+            if line is None:
+                raise ValueError("Empty export stream")
+            self.header = orjson.loads(line)
+        if not isinstance(self.header.get("vector_size"), int):
+            raise ValueError("Export header has no vector_size")
+        return self.header
+
+    def _end(self, count: int) -> None:
+        if count != self.count:
+            raise ValueError(f"Export stream ended after {self.count} points but its end record says {count}")
+
+    async def points(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield {"id", "vector", "payload"} dicts; binary vectors are float32 arrays.
+
+        Raises ValueError if the stream stops before its end record, has
+        anything after it, or its point count disagrees with the record.
+        """
+        header = await self.read_header()
+        if self.fmt != "binary":
+            while (line := await self._read_line()) is not None:
+                if not line.strip():
+                    continue
+                record = orjson.loads(line)
+                if isinstance(record, dict) and record.get("end") is True:
+                    self._end(record.get("count"))
+                    break
+                yield _point_meta(record, self.count)
+                self.count += 1
+            else:
+                raise ValueError(f"Export stream ended after {self.count} points without its end record")
+            while (line := await self._read_line()) is not None:
+                if line.strip():
+                    raise ValueError("Data after the end of the export stream")
+            return
+
+        vector_bytes = header["vector_size"] * _VECTOR.itemsize
+        while True:
+            data = await self._read_exact(_LENGTH.size, required=False)
+            if data is None:
+                raise ValueError(f"Export stream ended after {self.count} points without its end record")
+            size = _LENGTH.unpack(data)[0]
+            if size == 0:
+                self._end(_COUNT.unpack(await self._read_exact(_COUNT.size))[0])
+                break
+            meta = _point_meta(orjson.loads(await self._read_exact(size)), self.count)
+            vector = await self._read_exact(vector_bytes)
+            yield {
+                "id": meta["id"],
+                "payload": meta.get("payload"),
+                "vector": np.frombuffer(vector, dtype=_VECTOR)
+            }
+            self.count += 1
+        if await self._read_exact(1, required=False) is not None:
+            raise ValueError("Data after the end of the export stream")
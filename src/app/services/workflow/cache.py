@@ -0,0 +1,182 @@
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import asyncio
+import time
+import orjson
+from loguru import logger
+
+Fetch = Callable[[], Awaitable[Any]]
+
+@dataclass
+class _Entry:
+    data: bytes
+    updated_at: Optional[str]
+    fetched_at: float = field(default_factory=time.monotonic)
+
+class WorkflowCache:
+    """Stale-while-revalidate cache of n8n workflow definitions and list pages.
+
+    An entry is served as-is for ttl seconds. Until stale_ttl it is still
+    served, but the first such hit starts a background refetch; past
+    stale_ttl callers wait for n8n. Concurrent fetches of one key share a
+    single request. A refetched definition whose updatedAt has not moved
+    keeps the cached copy, and list pages revalidate the definitions they
+    contain the same way. Writes bump a generation so fetches that were in
+    flight during the write are not stored. Values are held as orjson
+    bytes, so every hit hands the caller a fresh copy.
+    """
+    def __init__(self, ttl: float = 30.0, stale_ttl: float = 300.0, max_entries: int = 1000):
+        self.ttl = ttl
+        self.stale_ttl = max(stale_ttl, ttl)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, int], asyncio.Task] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._generation = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.unchanged = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    @staticmethod
+    def workflow_key(workflow_id: str) -> str:
+        return f"workflow:{workflow_id}"
+
+    @staticmethod
+    def list_key(params: Dict[str, Any]) -> str:
+        return "list:" + orjson.dumps(params, option=orjson.OPT_SORT_KEYS).decode()
+
+    async def get(self, key: str, fetch: Fetch) -> Any:
+        if not self.enabled:
+            return await fetch()
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry.fetched_at
+            if age <= self.stale_ttl:
+                self._entries.move_to_end(key)
+                if age <= self.ttl:
+                    self.hits += 1
+                else:
+                    self.stale_hits += 1
+                    self._revalidate(key, fetch)
+                return orjson.loads(entry.data)
+            self._drop(key)
+
+        self.misses += 1
+        return orjson.loads(await asyncio.shield(self._load(key, fetch)))
+
+    def _load(self, key: str, fetch: Fetch) -> asyncio.Task:
+        inflight = (key, self._generation)
+        task = self._inflight.get(inflight)
+        if task is None:
+            task = asyncio.create_task(self._fetch(key, fetch, self._generation))
+            self._inflight[inflight] = task
+            task.add_done_callback(lambda done: self._fetched(inflight, done))
+        return task
+
+    def _fetched(self, inflight: Tuple[str, int], task: asyncio.Task) -> None:
+        self._inflight.pop(inflight, None)
+        if not task.cancelled():
+            # Retrieved by whoever awaited it; this keeps orphaned failures quiet
+            task.exception()
+
+    async def _fetch(self, key: str, fetch: Fetch, generation: int) -> bytes:
+        value = await fetch()
+        updated_at = value.get("updatedAt") if isinstance(value, dict) else None
+        previous = self._entries.get(key)
+        if previous is not None and updated_at is not None and previous.updated_at == updated_at:
+            self.unchanged += 1
+            data = previous.data
+        else:
+            data = orjson.dumps(value)
+        if generation == self._generation:
+            self._store(key, data, updated_at)
+        return data
+
+    def _revalidate(self, key: str, fetch: Fetch) -> None:
+        if (key, self._generation) in self._inflight:
+            return
+        self.revalidations += 1
+        task = asyncio.create_task(self._background(key, self._load(key, fetch)))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    async def _background(key: str, task: asyncio.Task) -> None:
+        try:
+            await task
+        except Exception as e:
+            logger.warning(f"Revalidating {key} failed, serving the cached copy: {e}")
+
+    def _store(self, key: str, data: bytes, updated_at: Optional[str]) -> None:
+        self._entries[key] = _Entry(data, updated_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _drop(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def put_workflow(self, workflow: Dict[str, Any]) -> None:
+        """Cache a definition n8n just returned from a write."""
+        if self.enabled and workflow.get("id") is not None:
+            self._store(self.workflow_key(str(workflow["id"])), orjson.dumps(workflow), workflow.get("updatedAt"))
+
+    def observe(self, workflows: Iterable[Dict[str, Any]]) -> None:
+        """Revalidate cached definitions against rows of a freshly fetched list page.
+
+        A definition whose updatedAt matches is marked fresh, one that
+        differs is dropped so the next lookup refetches it.
+        """
+        now = time.monotonic()
+        for workflow in workflows:
+            key = self.workflow_key(str(workflow.get("id")))
+            entry = self._entries.get(key)
+            if entry is None:
+                continue
+            if entry.updated_at is not None and entry.updated_at == workflow.get("updatedAt"):
+                entry.fetched_at = now
+                self.unchanged += 1
+            else:
+                self._drop(key)
+
+    def invalidate(self, workflow_id: Optional[str] = None) -> None:
+        """Forget every list page, and one definition when workflow_id is given."""
+        self._generation += 1
+        for key in [key for key in self._entries if key.startswith("list:")]:
+            self._drop(key)
+        if workflow_id is not None:
+            self._drop(self.workflow_key(workflow_id))
+
+    async def close(self) -> None:
+        for task in list(self._tasks) + list(self._inflight.values()):
+            task.cancel()
+        pending = self._tasks | set(self._inflight.values())
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "stale_ttl": self.stale_ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "unchanged": self.unchanged,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0
+        }
@@ -0,0 +1,136 @@
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, Optional, Set
+from collections import deque
+from dataclasses import dataclass, field
+import asyncio
+import time
+from loguru import logger
+
+from ...core.exceptions import ServiceOverloadedError
+
+@dataclass
+class _Job:
+    key: Hashable
+    priority: int
+    start: Callable[[], Awaitable[None]]
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+class _PriorityStats:
+    def __init__(self):
+        self.dispatched = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "dispatched": self.dispatched,
+            "rejected": self.rejected,
+            "avg_wait_ms": (self.total_wait / self.dispatched * 1000) if self.dispatched else 0.0,
+            "max_wait_ms": self.max_wait * 1000
+        }
+
+class ExecutionDispatcher:
+    """Priority queues in front of n8n with a global cap on running executions.
+
+    A slot is taken when an execution is started and held until release()
+    is called for it, i.e. until the execution finishes. When a slot frees,
+    the queue whose head scores highest goes next, where the score is the
+    priority's weight plus the head's wait divided by `aging` seconds, so
+    low-priority work waiting long enough overtakes fresh high-priority work.
+    Slots live in this process, so with several workers each enforces
+    max_concurrency on its own.
+    """
+    def __init__(
+        self,
+        max_concurrency: int = 32,
+        weights: Optional[Dict[int, float]] = None,
+        aging: float = 30.0,
+        max_queue: int = 10000
+    ):
+        self.max_concurrency = max_concurrency
+        self.weights = weights or {}
+        self.aging = aging
+        self.max_queue = max_queue
+        self._queues: Dict[int, Deque[_Job]] = {}
+        self._queued = 0
+        self._running: Set[Hashable] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._stats: Dict[int, _PriorityStats] = {}
+
+    def _score(self, job: _Job, now: float) -> float:
+        age = now - job.enqueued_at
+        return self.weights.get(job.priority, float(job.priority) + 1.0) + (age / self.aging if self.aging > 0 else 0.0)
+
+    def submit(self, key: Hashable, priority: int, start: Callable[[], Awaitable[None]]) -> None:
+        """Queue an execution; start() is awaited once a slot is free."""
+        stats = self._stats.setdefault(priority, _PriorityStats())
+        if self._queued >= self.max_queue:
+            stats.rejected += 1
+            raise ServiceOverloadedError(
+                "n8n",
+                self.retry_after(),
+                {"queue_depth": self._queued, "priority": priority}
+            )
+        self._queues.setdefault(priority, deque()).append(_Job(key, priority, start))
+        self._queued += 1
+        self._dispatch()
+
+    def release(self, key: Hashable) -> None:
+        """Free the slot held by an execution; repeated calls are ignored."""
+        if key in self._running:
+            self._running.discard(key)
+            self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self._queued and len(self._running) < self.max_concurrency:
+            now = time.monotonic()
+            queue = max(
+                (q for q in self._queues.values() if q),
+                key=lambda q: self._score(q[0], now)
+            )
+            job = queue.popleft()
+            self._queued -= 1
+            self._running.add(job.key)
+
+            wait = now - job.enqueued_at
+            stats = self._stats[job.priority]
+            stats.dispatched += 1
+            stats.total_wait += wait
+            stats.max_wait = max(stats.max_wait, wait)
+
+            task = asyncio.create_task(self._start(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _start(self, job: _Job) -> None:
+        try:
+            await job.start()
+        except Exception as e:
+            logger.error(f"Failed to start execution {job.key}: {e}")
+            self.release(job.key)
+
+    def retry_after(self) -> int:
+        """Rough seconds until a newly queued execution would start."""
+        return max(1, int(self._queued / max(self.max_concurrency, 1)))
+
+    async def close(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": len(self._running),
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": self._queued,
+            "max_queue": self.max_queue,
+            "priorities": {
+                priority: {
+                    **stats.as_dict(),
+                    "queued": len(self._queues.get(priority, ())),
+                    "weight": self.weights.get(priority, float(priority) + 1.0)
+                }
+                for priority, stats in sorted(self._stats.items())
+            }
+        }
@@ -5,10 +5,15 @@ from ...core.config import settings
 from ...schemas.workflow import WorkflowStatus, WorkflowCreate
 
 class N8NService:
-    def __init__(self):
-        self.base_url = f"{settings.N8N_PROTOCOL}://{settings.N8N_HOST}:{settings.N8N_PORT}"
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None
+    ):
+        self.base_url = base_url or f"{settings.N8N_PROTOCOL}://{settings.N8N_HOST}:{settings.N8N_PORT}"
         self.api_url = f"{self.base_url}/api/v1"
-        self._session: Optional[httpx.AsyncClient] = None
+        self._session: Optional[httpx.AsyncClient] = http_client
+        self._owns_session = http_client is None
 
     async def get_session(self) -> httpx.AsyncClient:
         if self._session is None:
@@ -72,7 +77,11 @@ class N8NService:
             raise
 
     async def close(self):
-        """Close the HTTP session."""
-        if self._session:
+        """Close the HTTP session if this service created it."""
+        if self._session and self._owns_session:
             await self._session.aclose()
-            self._session = None
+        self._session = None
+
+    async def cleanup(self):
+        """Cleanup service resources"""
+        await self.close()
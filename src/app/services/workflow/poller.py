@@ -0,0 +1,178 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+from dataclasses import dataclass
+import asyncio
+import heapq
+import inspect
+import itertools
+import time
+from loguru import logger
+
+FetchStatuses = Callable[[List[str]], Awaitable[Dict[str, Dict[str, Any]]]]
+OnFinished = Callable[[Any, Dict[str, Any]], Union[None, Awaitable[None]]]
+OnError = Callable[[Any, str], Union[None, Awaitable[None]]]
+
+@dataclass
+class _Pending:
+    token: Any
+    interval: float
+    max_interval: float
+    next_at: float
+    polls: int = 0
+    errors: int = 0
+
+class ExecutionPoller:
+    """One background task that polls every pending n8n execution.
+
+    Due executions are fetched in batches with a single list call each.
+    Every execution backs off on its own: it is polled after min_interval,
+    and each poll that finds it still running multiplies its interval by
+    backoff, up to max_interval. An execution that fails to poll max_errors
+    times in a row is reported through on_error and dropped.
+    """
+    def __init__(
+        self,
+        fetch: FetchStatuses,
+        on_finished: OnFinished,
+        on_error: OnError,
+        min_interval: float = 1.0,
+        max_interval: float = 30.0,
+        backoff: float = 1.5,
+        batch_size: int = 100,
+        max_errors: int = 5
+    ):
+        self.fetch = fetch
+        self.on_finished = on_finished
+        self.on_error = on_error
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self._pending: Dict[str, _Pending] = {}
+        self._schedule: List[Tuple[float, int, str]] = []
+        self._seq = itertools.count()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.polls = 0
+        self.batches = 0
+        self.finished = 0
+        self.failed = 0
+
+    def track(self, execution_id: str, token: Any, interval: Optional[float] = None) -> None:
+        """Start polling an execution; token is handed back to the callbacks.
+
+        interval overrides min_interval for this execution, e.g. for a slow
+        reconciliation poll when completion is normally pushed to us.
+        """
+        interval = interval or self.min_interval
+        entry = _Pending(
+            token=token,
+            interval=interval,
+            max_interval=max(interval, self.max_interval),
+            next_at=time.monotonic() + interval
+        )
+        self._pending[execution_id] = entry
+        heapq.heappush(self._schedule, (entry.next_at, next(self._seq), execution_id))
+        self._wake.set()
+        self.start()
+
+    def untrack(self, execution_id: str) -> None:
+        self._pending.pop(execution_id, None)
+
+    def start(self) -> None:
+        """Start the poll loop if it is not running."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def _reschedule(self, execution_id: str, entry: _Pending) -> None:
+        entry.next_at = time.monotonic() + entry.interval
+        heapq.heappush(self._schedule, (entry.next_at, next(self._seq), execution_id))
+
+    def _take_due(self) -> List[str]:
+        now = time.monotonic()
+        due: List[str] = []
+        while self._schedule and self._schedule[0][0] <= now:
+            next_at, _, execution_id = heapq.heappop(self._schedule)
+            entry = self._pending.get(execution_id)
+            # Skip entries superseded by a reschedule or untracked since
+            if entry is not None and entry.next_at == next_at:
+                due.append(execution_id)
+        return due
+
+    async def _run(self) -> None:
+        while True:
+            due = self._take_due()
+            if not due:
+                self._wake.clear()
+                timeout = self._schedule[0][0] - time.monotonic() if self._schedule else None
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            for start in range(0, len(due), self.batch_size):
+                await self._poll(due[start:start + self.batch_size])
+
+    async def _poll(self, execution_ids: List[str]) -> None:
+        self.batches += 1
+        self.polls += len(execution_ids)
+        try:
+            statuses = await self.fetch(execution_ids)
+        except Exception as e:
+            logger.warning(f"Polling {len(execution_ids)} executions failed: {e}")
+            statuses = {}
+            reason = str(e)
+        else:
+            reason = "execution not found"
+
+        for execution_id in execution_ids:
+            entry = self._pending.get(execution_id)
+            if entry is None:
+                continue
+            entry.polls += 1
+            status = statuses.get(execution_id)
+            if status is None:
+                entry.errors += 1
+                if entry.errors >= self.max_errors:
+                    del self._pending[execution_id]
+                    self.failed += 1
+                    await self._notify(self.on_error, entry.token, reason)
+                else:
+                    self._reschedule(execution_id, entry)
+                continue
+
+            entry.errors = 0
+            if status.get("finished"):
+                del self._pending[execution_id]
+                self.finished += 1
+                await self._notify(self.on_finished, entry.token, status)
+            else:
+                entry.interval = min(entry.interval * self.backoff, entry.max_interval)
+                self._reschedule(execution_id, entry)
+
+    @staticmethod
+    async def _notify(callback: Callable[..., Any], token: Any, value: Any) -> None:
+        try:
+            result = callback(token, value)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logger.error(f"Execution poller callback failed: {e}")
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._pending),
+            "polls": self.polls,
+            "batches": self.batches,
+            "finished": self.finished,
+            "failed": self.failed
+        }
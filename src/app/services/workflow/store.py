@@ -0,0 +1,330 @@
+from typing import Any, Dict, Optional, Protocol
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+import asyncio
+import sqlite3
+import time
+import orjson
+from loguru import logger
+
+class ExecutionStore(Protocol):
+    """Where WorkflowService keeps executions.
+
+    Records are split in two: small, frequently read status fields, and the
+    result body, written once when the execution reaches a terminal state
+    and only read when a caller asks for it.
+    """
+    async def put(
+        self,
+        execution_id: str,
+        fields: Dict[str, Any],
+        result: Any = None,
+        terminal: bool = False
+    ) -> None: ...
+
+    async def get(self, execution_id: str, with_result: bool = True) -> Optional[Dict[str, Any]]: ...
+
+    async def close(self) -> None: ...
+
+    def stats(self) -> Dict[str, Any]: ...
+
+@dataclass
+class _Finished:
+    fields: bytes
+    result: Optional[bytes]
+    stored_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def size(self) -> int:
+        return len(self.fields) + len(self.result or b"")
+
+class MemoryExecutionStore:
+    """In-process store: running executions are pinned, finished ones form a byte-bounded LRU.
+
+    Finished executions are kept as orjson bytes, so the budget counts
+    what is actually held. They expire ttl seconds after they finish.
+    """
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl: Optional[float] = None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._active: Dict[str, bytes] = {}
+        self._finished: "OrderedDict[str, _Finished]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    async def put(
+        self,
+        execution_id: str,
+        fields: Dict[str, Any],
+        result: Any = None,
+        terminal: bool = False
+    ) -> None:
+        data = orjson.dumps(fields)
+        self._drop(execution_id)
+        if not terminal:
+            self._active[execution_id] = data
+            return
+
+        self._active.pop(execution_id, None)
+        entry = _Finished(data, orjson.dumps(result) if result is not None else None)
+        if entry.size > self.max_bytes:
+            logger.warning(f"Result of execution {execution_id} exceeds the store budget, keeping status only")
+            entry.result = None
+        self._finished[execution_id] = entry
+        self._bytes += entry.size
+        self._expire()
+        while self._bytes > self.max_bytes and self._finished:
+            _, evicted = self._finished.popitem(last=False)
+            self._bytes -= evicted.size
+            self.evictions += 1
+
+    def _drop(self, execution_id: str) -> None:
+        previous = self._finished.pop(execution_id, None)
+        if previous is not None:
+            self._bytes -= previous.size
+
+    def _expired(self, entry: _Finished) -> bool:
+        return self.ttl is not None and time.monotonic() - entry.stored_at > self.ttl
+
+    def _expire(self) -> None:
+        """Drop expired entries from the cold end of the LRU."""
+        while self._finished:
+            execution_id, entry = next(iter(self._finished.items()))
+            if not self._expired(entry):
+                break
+            self._drop(execution_id)
+            self.expirations += 1
+
+    async def get(self, execution_id: str, with_result: bool = True) -> Optional[Dict[str, Any]]:
+        data = self._active.get(execution_id)
+        if data is not None:
+            self.hits += 1
+            return orjson.loads(data)
+
+        entry = self._finished.get(execution_id)
+        if entry is None or self._expired(entry):
+            if entry is not None:
+                self._drop(execution_id)
+                self.expirations += 1
+            self.misses += 1
+            return None
+        self._finished.move_to_end(execution_id)
+        self.hits += 1
+        fields = orjson.loads(entry.fields)
+        if with_result:
+            fields["result"] = orjson.loads(entry.result) if entry.result is not None else None
+        return fields
+
+    async def close(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "memory",
+            "active": len(self._active),
+            "finished": len(self._finished),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+class SQLiteExecutionStore:
+    """On-disk store, shareable between workers on one host.
+
+    Status fields and results live in separate tables. Calls run on a
+    single worker thread, so the connection is never used concurrently
+    and the event loop never blocks on disk. Finished executions older
+    than ttl are purged every purge_every writes.
+    """
+    def __init__(self, path: str, ttl: Optional[float] = None, purge_every: int = 1000):
+        self.path = path
+        self.ttl = ttl
+        self.purge_every = purge_every
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="execution-store")
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS executions ("
+            "id TEXT PRIMARY KEY, terminal INTEGER NOT NULL, fields BLOB NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS results (id TEXT PRIMARY KEY, result BLOB NOT NULL)")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS executions_finished ON executions (terminal, updated_at)"
+        )
+
+    async def _run(self, fn: Any, *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, partial(fn, *args))
+
+    def _put(self, execution_id: str, fields: bytes, result: Optional[bytes], terminal: bool) -> None:
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                "INSERT OR REPLACE INTO executions (id, terminal, fields, updated_at) VALUES (?, ?, ?, ?)",
+                (execution_id, int(terminal), fields, time.time())
+            )
+            if result is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO results (id, result) VALUES (?, ?)", (execution_id, result)
+                )
+            else:
+                self._conn.execute("DELETE FROM results WHERE id = ?", (execution_id,))
+
+        self._writes += 1
+        if self.ttl is not None and self._writes % self.purge_every == 0:
+            self._purge()
+
+    def _purge(self) -> None:
+        cutoff = time.time() - self.ttl
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                "DELETE FROM results WHERE id IN "
+                "(SELECT id FROM executions WHERE terminal = 1 AND updated_at < ?)",
+                (cutoff,)
+            )
+            self._conn.execute("DELETE FROM executions WHERE terminal = 1 AND updated_at < ?", (cutoff,))
+
+    def _get(self, execution_id: str, with_result: bool) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute(
+            "SELECT fields, terminal, updated_at FROM executions WHERE id = ?", (execution_id,)
+        ).fetchone()
+        if row is None or (row[1] and self.ttl is not None and time.time() - row[2] > self.ttl):
+            return None
+        fields = orjson.loads(row[0])
+        if with_result:
+            result = self._conn.execute(
+                "SELECT result FROM results WHERE id = ?", (execution_id,)
+            ).fetchone()
+            fields["result"] = orjson.loads(result[0]) if result is not None else None
+        return fields
+
+    async def put(
+        self,
+        execution_id: str,
+        fields: Dict[str, Any],
+        result: Any = None,
+        terminal: bool = False
+    ) -> None:
+        await self._run(
+            self._put,
+            execution_id,
+            orjson.dumps(fields),
+            orjson.dumps(result) if result is not None else None,
+            terminal
+        )
+
+    async def get(self, execution_id: str, with_result: bool = True) -> Optional[Dict[str, Any]]:
+        fields = await self._run(self._get, execution_id, with_result)
+        if fields is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return fields
+
+    async def close(self) -> None:
+        await self._run(self._conn.close)
+        self._executor.shutdown(wait=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self._writes
+        }
+
+class RedisExecutionStore:
+    """Redis store, shared by every worker.
+
+    Each execution is two keys, status fields and result, written in one
+    pipelined round trip and read with a single MGET. Every key gets the
+    TTL, so executions whose worker died do not accumulate. The TTL is set
+    in milliseconds, so a sub-second ttl still expires instead of being
+    truncated to an EX of 0, which Redis rejects.
+    """
+    def __init__(self, redis: Any, ttl: Optional[float] = None, prefix: str = "wfexec"):
+        self.redis = redis
+        self.ttl = ttl or None
+        self._ttl_ms = max(1, int(ttl * 1000)) if ttl else None
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, execution_id: str) -> str:
+        return f"{self.prefix}:{execution_id}"
+
+    async def put(
+        self,
+        execution_id: str,
+        fields: Dict[str, Any],
+        result: Any = None,
+        terminal: bool = False
+    ) -> None:
+        key = self._key(execution_id)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.set(key, orjson.dumps(fields), px=self._ttl_ms)
+            if result is not None:
+                pipe.set(f"{key}:result", orjson.dumps(result), px=self._ttl_ms)
+            else:
+                pipe.delete(f"{key}:result")
+            await pipe.execute()
+
+    async def get(self, execution_id: str, with_result: bool = True) -> Optional[Dict[str, Any]]:
+        key = self._key(execution_id)
+        if with_result:
+            data, result = await self.redis.mget([key, f"{key}:result"])
+        else:
+            data, result = await self.redis.get(key), None
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        fields = orjson.loads(data)
+        if with_result:
+            fields["result"] = orjson.loads(result) if result is not None else None
+        return fields
+
+    async def close(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "redis",
+            "prefix": self.prefix,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+def create_execution_store(
+    backend: str = "memory",
+    max_bytes: int = 64 * 1024 * 1024,
+    ttl: Optional[float] = None,
+    path: str = "data/executions.db",
+    redis: Optional[Any] = None
+) -> ExecutionStore:
+    if backend == "memory":
+        return MemoryExecutionStore(max_bytes=max_bytes, ttl=ttl)
+    if backend == "sqlite":
+        return SQLiteExecutionStore(path, ttl=ttl)
+    if backend == "redis":
+        if redis is None:
+            logger.warning("Redis unavailable, falling back to the in-memory execution store")
+            return MemoryExecutionStore(max_bytes=max_bytes, ttl=ttl)
+        return RedisExecutionStore(redis, ttl=ttl)
+    raise ValueError(f"Unknown execution store {backend}")
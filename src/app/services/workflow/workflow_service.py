@@ -1,15 +1,28 @@
-from typing import Dict, List, Any, Optional
+from typing import AsyncIterator, Dict, List, Any, Optional, Set
 import asyncio
 from datetime import datetime
+import hmac
 import json
+import secrets
+import time
 from uuid import UUID, uuid4
 from enum import Enum
+from functools import partial
 from pydantic import BaseModel, Field
 import httpx
 from loguru import logger
 
 from ...core.config import settings
-from ...core.exceptions import WorkflowError, WorkflowNotFoundError
+from ...core.exceptions import (
+    ServiceOverloadedError,
+    WorkflowCallbackError,
+    WorkflowError,
+    WorkflowNotFoundError
+)
+from .cache import WorkflowCache
+from .dispatcher import ExecutionDispatcher
+from .poller import ExecutionPoller
+from .store import ExecutionStore, MemoryExecutionStore
 
 class WorkflowStatus(str, Enum):
     PENDING = "pending"
@@ -31,6 +44,11 @@ class WorkflowDefinition(BaseModel):
     tags: List[str] = Field(default_factory=list)
     settings: Dict[str, Any] = Field(default_factory=dict)
 
+TERMINAL_STATUSES = (WorkflowStatus.COMPLETED, WorkflowStatus.FAILED, WorkflowStatus.CANCELLED)
+
+# Largest page n8n's public API returns from /executions
+N8N_EXECUTIONS_PAGE_SIZE = 250
+
 class WorkflowExecution(BaseModel):
     id: UUID = Field(default_factory=uuid4)
     workflow_id: str
@@ -39,12 +57,54 @@ class WorkflowExecution(BaseModel):
     completed_at: Optional[datetime] = None
     result: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
+    callback_token: Optional[str] = Field(None, exclude=True, repr=False)
 
 class WorkflowService:
-    def __init__(self):
-        self.base_url = f"{settings.N8N_PROTOCOL}://{settings.N8N_HOST}:{settings.N8N_PORT}/api/v1"
-        self._session: Optional[httpx.AsyncClient] = None
-        self.executions: Dict[UUID, WorkflowExecution] = {}
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        callback_url: Optional[str] = None,
+        store: Optional[ExecutionStore] = None
+    ):
+        n8n_url = base_url or f"{settings.N8N_PROTOCOL}://{settings.N8N_HOST}:{settings.N8N_PORT}"
+        self.base_url = f"{n8n_url}/api/v1"
+        self._session: Optional[httpx.AsyncClient] = http_client
+        self._owns_session = http_client is None
+        self.callback_url = (callback_url or settings.WORKFLOW_CALLBACK_URL or "").rstrip("/") or None
+        self.executions: ExecutionStore = store or MemoryExecutionStore(
+            max_bytes=settings.WORKFLOW_STORE_MAX_BYTES,
+            ttl=settings.WORKFLOW_STORE_TTL
+        )
+        self._n8n_ids: Dict[UUID, str] = {}
+        self._n8n_workflows: Dict[str, str] = {}
+        self._waiters: Dict[UUID, asyncio.Event] = {}
+        self._waiting: Dict[UUID, int] = {}
+        self._recheck: Optional[asyncio.Task] = None
+        self.dispatcher = ExecutionDispatcher(
+            max_concurrency=settings.WORKFLOW_MAX_CONCURRENCY,
+            weights={
+                WorkflowPriority[name.upper()].value: weight
+                for name, weight in settings.WORKFLOW_PRIORITY_WEIGHTS.items()
+            },
+            aging=settings.WORKFLOW_PRIORITY_AGING,
+            max_queue=settings.WORKFLOW_MAX_QUEUE
+        )
+        self.workflow_cache = WorkflowCache(
+            ttl=settings.WORKFLOW_CACHE_TTL,
+            stale_ttl=settings.WORKFLOW_CACHE_STALE_TTL,
+            max_entries=settings.WORKFLOW_CACHE_MAX_ENTRIES
+        )
+        self.poller = ExecutionPoller(
+            fetch=self.get_execution_statuses,
+            on_finished=self._execution_finished,
+            on_error=self._execution_poll_failed,
+            min_interval=settings.N8N_POLL_MIN_INTERVAL,
+            max_interval=settings.N8N_POLL_MAX_INTERVAL,
+            backoff=settings.N8N_POLL_BACKOFF,
+            batch_size=settings.N8N_POLL_BATCH_SIZE,
+            max_errors=settings.N8N_POLL_MAX_ERRORS
+        )
 
     async def get_session(self) -> httpx.AsyncClient:
         """Get or create HTTP session"""
@@ -78,7 +138,10 @@ class WorkflowService:
                 }
             )
             response.raise_for_status()
-            return response.json()
+            workflow = response.json()
+            self.workflow_cache.invalidate()
+            self.workflow_cache.put_workflow(workflow)
+            return workflow
         except httpx.HTTPError as e:
             logger.error(f"Failed to create workflow: {e}")
             raise WorkflowError(f"Failed to create workflow: {str(e)}")
@@ -86,60 +149,198 @@ class WorkflowService:
     async def execute_workflow(
         self,
         workflow_id: str,
-        input_, Any],
+        input_data: Dict[str, Any],
         priority: WorkflowPriority = WorkflowPriority.MEDIUM
     ) -> WorkflowExecution:
-        """Execute a workflow with input data"""
+        """Queue a workflow execution and return it while still PENDING.
+
+        The dispatcher starts it in n8n once a slot under
+        WORKFLOW_MAX_CONCURRENCY is free, higher priorities first. Slots are
+        per worker: the limit applies to each process on its own. With a
+        callback URL configured, the workflow is handed a URL and a one-off
+        token to POST its result to, and polling drops to a slow
+        reconciliation pass for callbacks that never arrive. A callback
+        taken by another worker frees this worker's slot within
+        WORKFLOW_SLOT_RECHECK seconds when the execution store is shared.
+        """
+        execution = WorkflowExecution(workflow_id=workflow_id)
+        payload: Dict[str, Any] = {
+            "data": input_data,
+            "priority": priority.value
+        }
+        if self.callback_url is not None:
+            execution.callback_token = secrets.token_urlsafe(32)
+            payload["callback"] = {
+                "url": f"{self.callback_url}/executions/{execution.id}/callback",
+                "token": execution.callback_token
+            }
+
+        await self._save(execution)
         try:
-            session = await self.get_session()
-            response = await session.post(
-                f"/workflows/{workflow_id}/execute",
-                json={
-                    "data": input_data,
-                    "priority": priority.value
-                }
+            self.dispatcher.submit(
+                execution.id,
+                priority.value,
+                partial(self._start_execution, execution, payload)
             )
+        except ServiceOverloadedError as e:
+            execution.status = WorkflowStatus.FAILED
+            execution.error = e.message
+            execution.completed_at = datetime.utcnow()
+            await self._save(execution)
+            raise
+        return execution
+
+    async def _start_execution(self, execution: WorkflowExecution, payload: Dict[str, Any]) -> None:
+        # Saved as RUNNING before the POST so a fast completion callback is never overwritten
+        execution.status = WorkflowStatus.RUNNING
+        execution.started_at = datetime.utcnow()
+        await self._save(execution)
+        try:
+            session = await self.get_session()
+            response = await session.post(f"/workflows/{execution.workflow_id}/execute", json=payload)
             response.raise_for_status()
-            data = response.json()
+            n8n_execution_id = str(response.json()["executionId"])
+        except (httpx.HTTPError, KeyError, ValueError) as e:
+            logger.error(f"Failed to execute workflow: {e}")
+            await self._execution_finished(execution.id, {
+                "success": False,
+                "error": f"Failed to execute workflow: {str(e)}"
+            })
+            return
 
-            execution = WorkflowExecution(
-                workflow_id=workflow_id,
-                status=WorkflowStatus.RUNNING
-            )
-            self.executions[execution.id] = execution
+        self._n8n_ids[execution.id] = n8n_execution_id
+        self._n8n_workflows[n8n_execution_id] = execution.workflow_id
+        self.poller.track(
+            n8n_execution_id,
+            execution.id,
+            interval=settings.N8N_RECONCILE_INTERVAL if execution.callback_token else None
+        )
+        if execution.callback_token and not isinstance(self.executions, MemoryExecutionStore):
+            self._start_recheck()
 
-            # Start monitoring execution
-            asyncio.create_task(self._monitor_execution(execution.id, data["executionId"]))
+    def _start_recheck(self) -> None:
+        if self._recheck is None or self._recheck.done():
+            self._recheck = asyncio.create_task(self._recheck_slots())
 
-            return execution
-        except httpx.HTTPError as e:
-            logger.error(f"Failed to execute workflow: {e}")
-            raise WorkflowError(f"Failed to execute workflow: {str(e)}")
+    async def _recheck_slots(self) -> None:
+        """Free slots whose completion callback was recorded by another worker.
+
+        The dispatcher's slots belong to this worker, and a callback that
+        lands elsewhere only updates the shared store. Rather than hold the
+        slot until the next reconcile poll of n8n, the executions this
+        worker started are re-read from the store every
+        WORKFLOW_SLOT_RECHECK seconds while any are running.
+        """
+        while self._n8n_ids:
+            await asyncio.sleep(settings.WORKFLOW_SLOT_RECHECK)
+            for execution_id in list(self._n8n_ids):
+                try:
+                    execution = await self._load(execution_id, with_result=False)
+                except Exception as e:
+                    logger.warning(f"Rechecking execution {execution_id} failed: {e}")
+                    continue
+                if execution is None or execution.status in TERMINAL_STATUSES:
+                    self._settle(execution_id)
+
+    async def _save(self, execution: WorkflowExecution) -> None:
+        """Write status fields, and the result once terminal, as separate records."""
+        terminal = execution.status in TERMINAL_STATUSES
+        fields = execution.model_dump(mode="json", exclude={"result"})
+        fields["callback_token"] = execution.callback_token
+        await self.executions.put(
+            str(execution.id),
+            fields,
+            result=execution.result if terminal else None,
+            terminal=terminal
+        )
+
+    async def _load(self, execution_id: UUID, with_result: bool = True) -> Optional[WorkflowExecution]:
+        fields = await self.executions.get(str(execution_id), with_result=with_result)
+        return WorkflowExecution.model_validate(fields) if fields is not None else None
+
+    async def _execution_finished(self, execution_id: UUID, status: Dict[str, Any]) -> None:
+        execution = await self._load(execution_id, with_result=False)
+        if execution is None or execution.status in TERMINAL_STATUSES:
+            self._settle(execution_id)
+            return
+        execution.status = (
+            WorkflowStatus.COMPLETED if status.get("success")
+            else WorkflowStatus.FAILED
+        )
+        execution.completed_at = datetime.utcnow()
+        execution.result = status.get("data", {})
+        if not status.get("success"):
+            execution.error = status.get("error", "Unknown error")
+        await self._save(execution)
+        self._settle(execution_id)
+
+    async def _execution_poll_failed(self, execution_id: UUID, error: str) -> None:
+        logger.error(f"Error monitoring execution {execution_id}: {error}")
+        execution = await self._load(execution_id, with_result=False)
+        if execution is not None and execution.status not in TERMINAL_STATUSES:
+            execution.status = WorkflowStatus.FAILED
+            execution.error = error
+            await self._save(execution)
+        self._settle(execution_id)
+
+    def _settle(self, execution_id: UUID) -> None:
+        """Stop polling a finished execution, free its slot and wake anyone waiting on it."""
+        self.dispatcher.release(execution_id)
+        n8n_execution_id = self._n8n_ids.pop(execution_id, None)
+        if n8n_execution_id is not None:
+            self.poller.untrack(n8n_execution_id)
+            self._n8n_workflows.pop(n8n_execution_id, None)
+        waiter = self._waiters.pop(execution_id, None)
+        if waiter is not None:
+            waiter.set()
+
+    async def complete_execution(
+        self,
+        execution_id: UUID,
+        token: Optional[str],
+        status: Dict[str, Any]
+    ) -> WorkflowExecution:
+        """Record a result pushed by the workflow itself.
+
+        status has the shape of an n8n execution: "success", optional "data"
+        and "error". Repeated callbacks for a finished execution are ignored.
+        With a shared store the callback may land on any worker.
+        """
+        execution = await self._load(execution_id, with_result=False)
+        if execution is None:
+            raise WorkflowNotFoundError(f"Execution {execution_id} not found")
+        expected = execution.callback_token
+        if expected is None or token is None or not hmac.compare_digest(expected, token):
+            raise WorkflowCallbackError(str(execution_id))
+        await self._execution_finished(execution_id, status)
+        return await self.get_workflow_execution(execution_id)
 
-    async def _monitor_execution(self, execution_id: UUID, n8n_execution_id: str):
-        """Monitor workflow execution status"""
+    async def wait_for_execution(self, execution_id: UUID, timeout: float) -> WorkflowExecution:
+        """Return the execution once it finishes, or as it is after timeout seconds.
+
+        Completions on this worker wake the wait at once; the store is
+        re-read every WORKFLOW_WAIT_RECHECK seconds to catch those recorded
+        by other workers.
+        """
+        deadline = time.monotonic() + timeout
+        self._waiting[execution_id] = self._waiting.get(execution_id, 0) + 1
         try:
             while True:
-                status = await self.get_execution_status(n8n_execution_id)
-                execution = self.executions[execution_id]
-                
-                if status["finished"]:
-                    execution.status = (
-                        WorkflowStatus.COMPLETED if status["success"]
-                        else WorkflowStatus.FAILED
-                    )
-                    execution.completed_at = datetime.utcnow()
-                    execution.result = status.get("data", {})
-                    if not status["success"]:
-                        execution.error = status.get("error", "Unknown error")
-                    break
-
-                await asyncio.sleep(2)
-        except Exception as e:
-            logger.error(f"Error monitoring execution {execution_id}: {e}")
-            if execution_id in self.executions:
-                self.executions[execution_id].status = WorkflowStatus.FAILED
-                self.executions[execution_id].error = str(e)
+                execution = await self.get_workflow_execution(execution_id)
+                remaining = deadline - time.monotonic()
+                if execution.status in TERMINAL_STATUSES or remaining <= 0:
+                    return execution
+                waiter = self._waiters.setdefault(execution_id, asyncio.Event())
+                try:
+                    await asyncio.wait_for(waiter.wait(), min(remaining, settings.WORKFLOW_WAIT_RECHECK))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            # The last caller to stop waiting drops the event, however the wait ended
+            self._waiting[execution_id] -= 1
+            if not self._waiting[execution_id]:
+                del self._waiting[execution_id]
+                self._waiters.pop(execution_id, None)
 
     async def get_execution_status(self, n8n_execution_id: str) -> Dict[str, Any]:
         """Get workflow execution status from n8n"""
@@ -152,39 +353,142 @@ class WorkflowService:
             logger.error(f"Failed to get execution status: {e}")
             raise WorkflowError(f"Failed to get execution status: {str(e)}")
 
+    async def get_execution_statuses(self, n8n_execution_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get the status of many executions, listing the running ones per workflow.
+
+        n8n's execution list filters by status, workflowId and cursor only,
+        not by id. So the running executions of each workflow involved are
+        paged through, stopping once every tracked id has been seen, and
+        those come back as unfinished. The rest have finished, are waiting,
+        or are unknown, and are fetched one by one, which also picks up the
+        result data of the finished ones.
+        """
+        by_workflow: Dict[Optional[str], Set[str]] = {}
+        for execution_id in n8n_execution_ids:
+            by_workflow.setdefault(self._n8n_workflows.get(execution_id), set()).add(execution_id)
+
+        listed = await asyncio.gather(*(
+            self._running_executions(workflow_id, wanted)
+            for workflow_id, wanted in by_workflow.items() if workflow_id is not None
+        ))
+        statuses: Dict[str, Dict[str, Any]] = {
+            execution_id: {"id": execution_id, "finished": False, "status": "running"}
+            for running in listed for execution_id in running
+        }
+
+        refetch = [execution_id for execution_id in n8n_execution_ids if execution_id not in statuses]
+        results = await asyncio.gather(
+            *(self.get_execution_status(execution_id) for execution_id in refetch),
+            return_exceptions=True
+        )
+        for execution_id, result in zip(refetch, results):
+            if isinstance(result, dict):
+                statuses[execution_id] = result
+        return statuses
+
+    async def _running_executions(self, workflow_id: str, wanted: Set[str]) -> Set[str]:
+        """The ids in wanted that n8n lists as running for the workflow."""
+        session = await self.get_session()
+        running: Set[str] = set()
+        cursor: Optional[str] = None
+        while True:
+            params: Dict[str, Any] = {
+                "status": "running",
+                "workflowId": workflow_id,
+                "limit": N8N_EXECUTIONS_PAGE_SIZE,
+                "includeData": "false"
+            }
+            if cursor:
+                params["cursor"] = cursor
+            response = await session.get("/executions", params=params)
+            response.raise_for_status()
+            body = response.json()
+            rows = body.get("data", []) if isinstance(body, dict) else body
+            running.update(str(row.get("id")) for row in rows if str(row.get("id")) in wanted)
+            cursor = body.get("nextCursor") if isinstance(body, dict) else None
+            if not cursor or not rows or running >= wanted:
+                return running
+
     async def get_workflow_execution(self, execution_id: UUID) -> WorkflowExecution:
         """Get workflow execution details"""
-        if execution_id not in self.executions:
+        execution = await self._load(execution_id)
+        if execution is None:
             raise WorkflowNotFoundError(f"Execution {execution_id} not found")
-        return self.executions[execution_id]
+        return execution
+
+    async def get_workflow(self, workflow_id: str) -> Dict[str, Any]:
+        """Get a workflow definition, served from the workflow cache when fresh enough"""
+        async def fetch() -> Dict[str, Any]:
+            session = await self.get_session()
+            response = await session.get(f"/workflows/{workflow_id}")
+            if response.status_code == 404:
+                raise WorkflowNotFoundError(workflow_id)
+            response.raise_for_status()
+            return response.json()
+
+        try:
+            return await self.workflow_cache.get(WorkflowCache.workflow_key(workflow_id), fetch)
+        except httpx.HTTPError as e:
+            logger.error(f"Failed to get workflow: {e}")
+            raise WorkflowError(f"Failed to get workflow: {str(e)}")
 
     async def list_workflows(
         self,
         tags: Optional[List[str]] = None,
-        active: Optional[bool] = None
-    ) -> List[Dict[str, Any]]:
-        """List workflows with optional filtering"""
-        try:
-            session = await self.get_session()
-            params = {}
-            if tags:
-                params["tags"] = ",".join(tags)
-            if active is not None:
-                params["active"] = str(active).lower()
+        active: Optional[bool] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """List one page of workflows with optional filtering.
 
+        Returns n8n's page as {"data": [...], "nextCursor": ...}; pass
+        nextCursor back as cursor for the following page. Pages are cached
+        per filter, limit and cursor.
+        """
+        params: Dict[str, Any] = {"limit": min(limit or settings.N8N_WORKFLOWS_PAGE_SIZE, 250)}
+        if tags:
+            params["tags"] = ",".join(tags)
+        if active is not None:
+            params["active"] = str(active).lower()
+        if cursor:
+            params["cursor"] = cursor
+
+        async def fetch() -> Dict[str, Any]:
+            session = await self.get_session()
             response = await session.get("/workflows", params=params)
             response.raise_for_status()
-            return response.json()
+            page = response.json()
+            self.workflow_cache.observe(page.get("data", []))
+            return page
+
+        try:
+            return await self.workflow_cache.get(WorkflowCache.list_key(params), fetch)
         except httpx.HTTPError as e:
             logger.error(f"Failed to list workflows: {e}")
             raise WorkflowError(f"Failed to list workflows: {str(e)}")
 
+    async def iter_workflows(
+        self,
+        tags: Optional[List[str]] = None,
+        active: Optional[bool] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield every matching workflow, following n8n's cursor one page at a time"""
+        cursor = None
+        while True:
+            page = await self.list_workflows(tags=tags, active=active, cursor=cursor)
+            for workflow in page.get("data", []):
+                yield workflow
+            cursor = page.get("nextCursor")
+            if not cursor:
+                return
+
     async def delete_workflow(self, workflow_id: str):
         """Delete a workflow"""
         try:
             session = await self.get_session()
             response = await session.delete(f"/workflows/{workflow_id}")
             response.raise_for_status()
+            self.workflow_cache.invalidate(workflow_id)
         except httpx.HTTPError as e:
             logger.error(f"Failed to delete workflow: {e}")
             raise WorkflowError(f"Failed to delete workflow: {str(e)}")
@@ -208,13 +512,27 @@ class WorkflowService:
                 }
             )
             response.raise_for_status()
-            return response.json()
+            workflow = response.json()
+            self.workflow_cache.invalidate(workflow_id)
+            self.workflow_cache.put_workflow(workflow)
+            return workflow
         except httpx.HTTPError as e:
             logger.error(f"Failed to update workflow: {e}")
             raise WorkflowError(f"Failed to update workflow: {str(e)}")
 
     async def cleanup(self):
         """Cleanup service resources"""
-        if self._session:
+        await self.dispatcher.close()
+        await self.poller.close()
+        if self._recheck is not None:
+            self._recheck.cancel()
+            try:
+                await self._recheck
+            except asyncio.CancelledError:
+                pass
+            self._recheck = None
+        await self.workflow_cache.close()
+        await self.executions.close()
+        if self._session and self._owns_session:
             await self._session.aclose()
-            self._session = None
\ No newline at end of file
+        self._session = None
\ No newline at end of file
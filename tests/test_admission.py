@@ -0,0 +1,111 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+
+from app.api.v1.endpoints.ai import identify_client
+from app.core.config import settings
+from app.core.exceptions import ServiceOverloadedError
+from app.services.ai.admission import AdmissionScheduler
+
+async def _hold(scheduler: AdmissionScheduler, client: str, release: asyncio.Event, log: list) -> None:
+    async with scheduler.slot("embed", client):
+        log.append(client)
+        await release.wait()
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+async def test_waiter_cancelled_with_the_holder_does_not_leak_the_slot():
+    scheduler = AdmissionScheduler(max_concurrency=1)
+    release = asyncio.Event()
+    log: list = []
+    holder = asyncio.create_task(_hold(scheduler, "a", release, log))
+    await _settle()
+    waiter = asyncio.create_task(_hold(scheduler, "b", release, log))
+    await _settle()
+    assert scheduler.stats()["queue_depth"] == 1
+
+    # Same tick: the holder's release dispatches to a waiter whose future is already cancelled
+    holder.cancel()
+    waiter.cancel()
+    await asyncio.gather(holder, waiter, return_exceptions=True)
+
+    assert scheduler.stats()["active"] == 0
+    assert scheduler.stats()["queue_depth"] == 0
+    release.set()
+    await asyncio.wait_for(_hold(scheduler, "c", release, log), 1.0)
+    assert log == ["a", "c"]
+
+async def test_per_client_queue_cap_rejects_only_that_client():
+    scheduler = AdmissionScheduler(max_concurrency=1, max_queue=10, max_queue_per_client=2)
+    release = asyncio.Event()
+    log: list = []
+    tasks = [asyncio.create_task(_hold(scheduler, "greedy", release, log)) for _ in range(3)]
+    await _settle()
+
+    with pytest.raises(ServiceOverloadedError) as excinfo:
+        async with scheduler.slot("embed", "greedy"):
+            pass
+    assert excinfo.value.details["reason"] == "client_queue_full"
+
+    tasks.append(asyncio.create_task(_hold(scheduler, "polite", release, log)))
+    await _settle()
+    assert scheduler.stats()["queued_by_client"] == {"greedy": 2, "polite": 1}
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert sorted(log) == ["greedy"] * 3 + ["polite"]
+
+async def test_full_queue_evicts_from_the_largest_backlog():
+    scheduler = AdmissionScheduler(max_concurrency=1, max_queue=3)
+    release = asyncio.Event()
+    log: list = []
+    holder = asyncio.create_task(_hold(scheduler, "greedy", release, log))
+    await _settle()
+    greedy = [asyncio.create_task(_hold(scheduler, "greedy", release, log)) for _ in range(3)]
+    await _settle()
+
+    newcomer = asyncio.create_task(_hold(scheduler, "polite", release, log))
+    await _settle()
+    assert scheduler.stats()["queued_by_client"] == {"greedy": 2, "polite": 1}
+    # The newest greedy request made room
+    assert greedy[-1].done()
+    assert isinstance(greedy[-1].exception(), ServiceOverloadedError)
+    assert greedy[-1].exception().details["reason"] == "evicted"
+
+    # A client at the largest backlog is turned away rather than evicting an equal one
+    with pytest.raises(ServiceOverloadedError) as excinfo:
+        async with scheduler.slot("embed", "greedy"):
+            pass
+    assert excinfo.value.details["reason"] == "queue_full"
+
+    release.set()
+    await asyncio.gather(holder, newcomer, *greedy[:-1])
+    assert "polite" in log
+    assert scheduler.stats()["active"] == 0
+
+@pytest.fixture
+def identity_api():
+    app = FastAPI()
+
+    @app.get("/whoami")
+    async def whoami(identity: str = Depends(identify_client)):
+        return {"identity": identity}
+
+    return app
+
+async def _whoami(app: FastAPI, headers: dict) -> str:
+    transport = httpx.ASGITransport(app=app, client=("10.0.0.7", 1234))
+    async with httpx.AsyncClient(transport=transport, base_url="http://autodev") as client:
+        response = await client.get("/whoami", headers=headers)
+    return response.json()["identity"]
+
+async def test_only_configured_api_keys_identify_a_client(identity_api, monkeypatch):
+    monkeypatch.setattr(settings, "OLLAMA_CLIENT_API_KEYS", ["team-secret"])
+
+    assert (await _whoami(identity_api, {"X-API-Key": "team-secret"})).startswith("key:")
+    assert await _whoami(identity_api, {"X-API-Key": "made-up"}) == "10.0.0.7"
+    assert await _whoami(identity_api, {}) == "10.0.0.7"
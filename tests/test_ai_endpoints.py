@@ -0,0 +1,47 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.api.v1.endpoints import ai
+from app.core.di import get_ollama_service
+from app.core.exceptions import (
+    ModelNotLoadedError,
+    ServiceConnectionError,
+    ServiceOverloadedError,
+    ValidationError
+)
+
+class FailingOllama:
+    def __init__(self, error: Exception):
+        self.error = error
+
+    async def get_embedding_array(self, text: str):
+        raise self.error
+
+    async def get_embeddings_array(self, texts):
+        raise self.error
+
+    async def generate_text(self, prompt: str, **kwargs):
+        raise self.error
+
+@pytest.mark.parametrize("error, status", [
+    (ValidationError("Texts cannot be empty"), 400),
+    (ModelNotLoadedError("llama2"), 503),
+    (ServiceConnectionError("Ollama", "connection refused"), 503),
+    (ServiceOverloadedError("Ollama", 3), 503),
+    (RuntimeError("boom"), 500)
+])
+@pytest.mark.parametrize("path, body", [
+    ("/embed", {"text": "hi"}),
+    ("/embed/batch", {"texts": ["hi"]}),
+    ("/generate", {"prompt": "hi"})
+])
+async def test_service_errors_keep_their_status(error, status, path, body):
+    app = FastAPI()
+    app.include_router(ai.router)
+    app.dependency_overrides[get_ollama_service] = lambda: FailingOllama(error)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://autodev") as client:
+        response = await client.post(path, json=body)
+    assert response.status_code == status
+    if isinstance(error, ServiceOverloadedError):
+        assert response.headers["Retry-After"] == "3"
@@ -0,0 +1,126 @@
+from typing import Dict, List, Optional, Set
+
+import httpx
+import pytest
+
+from app.services.ai.balancer import OllamaBackend, OllamaBalancer
+
+class FakeOllama:
+    """One Ollama server: serves /api/generate for its models and lists them on /api/ps."""
+    def __init__(self, models: Set[str], status: Optional[int] = None):
+        self.models = models
+        self.status = status
+        self.requests: List[str] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request.url.path)
+        if self.status is not None:
+            return httpx.Response(self.status)
+        if request.url.path == "/api/ps":
+            return httpx.Response(200, json={"models": [{"name": m} for m in sorted(self.models)]})
+        model = httpx.Response(200, content=request.content).json()["model"]
+        if model not in self.models:
+            return httpx.Response(404, json={"error": f"model '{model}' not found"})
+        return httpx.Response(200, json={"response": "ok"})
+
+def _balancer(servers: Dict[str, FakeOllama], **kwargs) -> OllamaBalancer:
+    backends = [
+        OllamaBackend(url, httpx.AsyncClient(base_url=url, transport=httpx.MockTransport(server)))
+        for url, server in servers.items()
+    ]
+    # A long probe interval keeps the background loop out of the way; tests probe by hand
+    return OllamaBalancer(backends, probe_interval=3600, **kwargs)
+
+async def _generate(balancer: OllamaBalancer, model: str = "llama2:latest", **kwargs) -> httpx.Response:
+    return await balancer.request(model, "POST", "/api/generate", json={"model": model}, **kwargs)
+
+async def _send(balancer: OllamaBalancer, backend: OllamaBackend) -> None:
+    """Send one request that the balancer routes to backend."""
+    others = [b for b in balancer.backends if b is not backend]
+    async with balancer.backend("llama2:latest", exclude=others) as chosen:
+        assert chosen is backend
+        response = await chosen.client.post("/api/generate", json={"model": "llama2:latest"})
+        response.raise_for_status()
+
+async def test_404_fails_over_to_a_backend_with_the_model():
+    servers = {"http://a": FakeOllama(set()), "http://b": FakeOllama({"llama2:latest"})}
+    balancer = _balancer(servers)
+    try:
+        for _ in range(2):
+            response = await _generate(balancer)
+            assert response.json() == {"response": "ok"}
+
+        a, b = balancer.backends
+        assert "llama2:latest" not in a.loaded_models
+        assert "llama2:latest" in b.loaded_models
+        # Once b is known to have the model, a is no longer tried
+        assert len(servers["http://a"].requests) <= 1
+        assert a.healthy and a.failures == 0
+    finally:
+        await balancer.close()
+
+async def test_404_from_every_backend_is_raised():
+    balancer = _balancer({"http://a": FakeOllama(set()), "http://b": FakeOllama(set())})
+    try:
+        with pytest.raises(httpx.HTTPStatusError) as excinfo:
+            await _generate(balancer)
+        assert excinfo.value.response.status_code == 404
+    finally:
+        await balancer.close()
+
+async def test_backend_is_ejected_after_consecutive_errors_and_readmitted_by_probe():
+    broken = FakeOllama({"llama2:latest"}, status=500)
+    servers = {"http://a": broken, "http://b": FakeOllama({"llama2:latest"})}
+    balancer = _balancer(servers, eject_after=3)
+    a, b = balancer.backends
+    try:
+        for expected_failures in range(1, 4):
+            with pytest.raises(httpx.HTTPStatusError):
+                await _send(balancer, a)
+            assert a.failures == expected_failures
+        assert not a.healthy
+
+        # Ejected: everything goes to b now
+        for _ in range(3):
+            await _generate(balancer)
+        assert broken.requests.count("/api/generate") == 3
+
+        # A failing probe keeps it out
+        assert await balancer.probe(a) is False
+        assert not a.healthy
+
+        broken.status = None
+        broken.models = {"mistral:latest"}
+        assert await balancer.probe(a) is True
+        assert a.healthy and a.failures == 0 and a.ejected_at is None
+        assert a.loaded_models == {"mistral:latest"}
+        # Re-admitted and preferred for the model it has loaded
+        await _generate(balancer, "mistral:latest")
+        assert broken.requests[-1] == "/api/generate"
+    finally:
+        await balancer.close()
+
+async def test_sessions_stick_to_their_backend():
+    servers = {url: FakeOllama({"llama2:latest"}) for url in ("http://a", "http://b", "http://c")}
+    balancer = _balancer(servers)
+    try:
+        for backend in balancer.backends:
+            assert await balancer.probe(backend)
+        for _ in range(3):
+            await _generate(balancer, session_id="chat-1")
+        served = [url for url, server in servers.items() if "/api/generate" in server.requests]
+        assert len(served) == 1
+
+        # Other traffic still spreads across backends
+        for _ in range(6):
+            await _generate(balancer)
+        assert all("/api/generate" in server.requests for server in servers.values())
+
+        # The session moves only if its backend is ejected
+        sticky = next(b for b in balancer.backends if b.url == served[0])
+        sticky.healthy = False
+        await _generate(balancer, session_id="chat-1")
+        assert balancer._sessions["chat-1"] is not sticky
+        assert balancer.stats()["sticky_sessions"] == 1
+    finally:
+        await balancer.close()
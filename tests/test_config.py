@@ -0,0 +1,13 @@
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import Settings
+
+def test_priority_weights_are_normalized():
+    settings = Settings(WORKFLOW_PRIORITY_WEIGHTS={"LOW": 1.0, "High": 8.0})
+    assert settings.WORKFLOW_PRIORITY_WEIGHTS == {"low": 1.0, "high": 8.0}
+
+@pytest.mark.parametrize("weights", [{"urgent": 5.0}, {"low": 0.0}, {"medium": -1.0}])
+def test_bad_priority_weights_are_rejected(weights):
+    with pytest.raises(ValidationError):
+        Settings(WORKFLOW_PRIORITY_WEIGHTS=weights)
@@ -0,0 +1,109 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from app.core.exceptions import ServiceOverloadedError
+from app.services.workflow.dispatcher import ExecutionDispatcher
+
+LOW, HIGH = 0, 2
+
+class Starts:
+    """Records the order executions were started in."""
+    def __init__(self):
+        self.order: List[str] = []
+
+    def __call__(self, key: str):
+        async def start() -> None:
+            self.order.append(key)
+        return start
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+@pytest.fixture
+def starts():
+    return Starts()
+
+async def test_high_priority_overtakes_queued_low(starts):
+    dispatcher = ExecutionDispatcher(max_concurrency=1, weights={LOW: 1.0, HIGH: 10.0}, aging=30.0)
+    dispatcher.submit("running", LOW, starts("running"))
+    dispatcher.submit("low", LOW, starts("low"))
+    dispatcher.submit("high", HIGH, starts("high"))
+    await _settle()
+    assert starts.order == ["running"]
+
+    dispatcher.release("running")
+    await _settle()
+    assert starts.order == ["running", "high"]
+    dispatcher.release("high")
+    await _settle()
+    assert starts.order == ["running", "high", "low"]
+    await dispatcher.close()
+
+async def test_low_priority_runs_once_it_has_aged(starts):
+    dispatcher = ExecutionDispatcher(max_concurrency=1, weights={LOW: 1.0, HIGH: 2.0}, aging=0.05)
+    dispatcher.submit("running", LOW, starts("running"))
+    dispatcher.submit("low", LOW, starts("low"))
+    # 0.15s of waiting is worth 3 points of weight, more than HIGH's head start
+    await asyncio.sleep(0.15)
+    dispatcher.submit("high", HIGH, starts("high"))
+
+    dispatcher.release("running")
+    await _settle()
+    assert starts.order == ["running", "low"]
+    await dispatcher.close()
+
+async def test_full_queue_rejects_with_retry_after(starts):
+    dispatcher = ExecutionDispatcher(max_concurrency=1, max_queue=2)
+    for key in ("running", "a", "b"):
+        dispatcher.submit(key, LOW, starts(key))
+
+    with pytest.raises(ServiceOverloadedError) as excinfo:
+        dispatcher.submit("c", HIGH, starts("c"))
+    http = excinfo.value.to_http_exception()
+    assert http.status_code == 503
+    assert int(http.headers["Retry-After"]) >= 1
+    assert excinfo.value.details["queue_depth"] == 2
+    await dispatcher.close()
+
+async def test_stats_are_kept_per_priority(starts):
+    dispatcher = ExecutionDispatcher(max_concurrency=1, weights={HIGH: 5.0}, max_queue=2)
+    dispatcher.submit("running", HIGH, starts("running"))
+    dispatcher.submit("low", LOW, starts("low"))
+    dispatcher.submit("high", HIGH, starts("high"))
+    with pytest.raises(ServiceOverloadedError):
+        dispatcher.submit("rejected", LOW, starts("rejected"))
+    await _settle()
+
+    stats = dispatcher.stats()
+    assert stats["running"] == 1
+    assert stats["queue_depth"] == 2
+    assert stats["priorities"][HIGH]["dispatched"] == 1
+    assert stats["priorities"][HIGH]["queued"] == 1
+    assert stats["priorities"][HIGH]["weight"] == 5.0
+    assert stats["priorities"][LOW]["rejected"] == 1
+    assert stats["priorities"][LOW]["queued"] == 1
+    # Unconfigured priorities weigh priority + 1
+    assert stats["priorities"][LOW]["weight"] == 1.0
+
+    dispatcher.release("running")
+    await _settle()
+    stats = dispatcher.stats()
+    assert stats["priorities"][HIGH]["dispatched"] == 2
+    assert stats["priorities"][HIGH]["max_wait_ms"] >= 0.0
+    await dispatcher.close()
+
+async def test_failed_start_frees_its_slot(starts):
+    dispatcher = ExecutionDispatcher(max_concurrency=1)
+
+    async def fail() -> None:
+        raise RuntimeError("n8n is down")
+
+    dispatcher.submit("broken", LOW, fail)
+    dispatcher.submit("next", LOW, starts("next"))
+    await _settle()
+    assert starts.order == ["next"]
+    assert dispatcher.stats()["running"] == 1
+    await dispatcher.close()
@@ -0,0 +1,62 @@
+import asyncio
+from typing import List
+
+import numpy as np
+import pytest
+
+from app.core.exceptions import EmbeddingError
+from app.services.ai.batching import EmbeddingBatcher
+
+class FakeEmbedder:
+    """Embeds each text as [len(text)], failing any batch that contains "bad"."""
+    def __init__(self):
+        self.batches: List[List[str]] = []
+
+    async def __call__(self, texts: List[str]) -> np.ndarray:
+        self.batches.append(list(texts))
+        if "bad" in texts:
+            raise EmbeddingError("model rejected input")
+        return np.array([[float(len(text))] for text in texts], dtype=np.float32)
+
+async def test_concurrent_texts_share_one_batch():
+    embedder = FakeEmbedder()
+    batcher = EmbeddingBatcher(embedder, window=0.01, max_batch_size=64, split_on=(EmbeddingError,))
+
+    results = await asyncio.gather(*(batcher.submit("x" * n) for n in range(1, 9)))
+    assert [float(r[0]) for r in results] == [float(n) for n in range(1, 9)]
+    assert len(embedder.batches) == 1
+
+async def test_failing_input_is_isolated_by_splitting():
+    embedder = FakeEmbedder()
+    batcher = EmbeddingBatcher(embedder, window=0.01, max_batch_size=64, split_on=(EmbeddingError,))
+    texts = ["a", "bb", "bad", "cccc", "ddddd", "ee", "f", "gg"]
+
+    results = await asyncio.gather(*(batcher.submit(text) for text in texts), return_exceptions=True)
+    assert isinstance(results[2], EmbeddingError)
+    for text, result in zip(texts, results):
+        if text != "bad":
+            assert float(result[0]) == len(text)
+    # Only the halves containing "bad" were retried
+    assert ["bad"] in embedder.batches
+    assert len(embedder.batches) <= 1 + 2 * 3
+
+async def test_errors_outside_split_on_fail_the_whole_batch():
+    async def broken(texts: List[str]) -> np.ndarray:
+        raise ConnectionError("down")
+
+    batcher = EmbeddingBatcher(broken, window=0.01, split_on=(EmbeddingError,))
+    results = await asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+    assert all(isinstance(result, ConnectionError) for result in results)
+
+async def test_cancelled_caller_is_dropped_from_the_batch():
+    embedder = FakeEmbedder()
+    batcher = EmbeddingBatcher(embedder, window=0.05, split_on=(EmbeddingError,))
+    kept = asyncio.create_task(batcher.submit("keep"))
+    dropped = asyncio.create_task(batcher.submit("drop"))
+    await asyncio.sleep(0)
+    dropped.cancel()
+
+    assert float((await kept)[0]) == 4.0
+    with pytest.raises(asyncio.CancelledError):
+        await dropped
+    assert embedder.batches == [["keep"]]
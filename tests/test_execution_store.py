@@ -0,0 +1,83 @@
+import asyncio
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+from app.services.workflow.store import MemoryExecutionStore, RedisExecutionStore
+
+def _fields(execution_id: str) -> Dict[str, Any]:
+    return {"id": execution_id, "status": "completed"}
+
+async def test_memory_store_evicts_least_recent_to_stay_under_budget():
+    store = MemoryExecutionStore(max_bytes=400)
+    for i in range(4):
+        await store.put(f"e{i}", _fields(f"e{i}"), result={"blob": "x" * 60}, terminal=True)
+    assert store.stats()["bytes"] <= 400
+    assert store.stats()["evictions"] > 0
+    assert await store.get("e0") is None
+    assert (await store.get("e3"))["result"] == {"blob": "x" * 60}
+
+async def test_memory_store_never_evicts_running_executions():
+    store = MemoryExecutionStore(max_bytes=100)
+    await store.put("running", {"id": "running", "status": "running"})
+    for i in range(10):
+        await store.put(f"e{i}", _fields(f"e{i}"), result={"blob": "x" * 40}, terminal=True)
+    assert (await store.get("running"))["status"] == "running"
+
+async def test_memory_store_keeps_status_when_result_exceeds_budget():
+    store = MemoryExecutionStore(max_bytes=100)
+    await store.put("big", _fields("big"), result={"blob": "x" * 500}, terminal=True)
+    fields = await store.get("big")
+    assert fields["status"] == "completed"
+    assert fields["result"] is None
+
+async def test_memory_store_expires_finished_executions():
+    store = MemoryExecutionStore(ttl=0.2)
+    await store.put("old", _fields("old"), result={"n": 1}, terminal=True)
+    await store.put("running", {"id": "running", "status": "running"})
+    await asyncio.sleep(0.15)
+    await store.put("new", _fields("new"), result={"n": 2}, terminal=True)
+    await asyncio.sleep(0.1)
+
+    assert await store.get("old") is None
+    assert (await store.get("new"))["result"] == {"n": 2}
+    assert await store.get("running") is not None
+    assert store.stats()["expirations"] == 1
+
+    # Writes also sweep expired entries from the cold end
+    await asyncio.sleep(0.25)
+    await store.put("newest", _fields("newest"), terminal=True)
+    assert store.stats()["finished"] == 1
+
+class _Pipeline:
+    def __init__(self, calls: List[Tuple[str, Any, Dict[str, Any]]]):
+        self.calls = calls
+
+    async def __aenter__(self) -> "_Pipeline":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        pass
+
+    def set(self, key: str, value: bytes, **kwargs: Any) -> None:
+        self.calls.append(("set", key, kwargs))
+
+    def delete(self, key: str) -> None:
+        self.calls.append(("delete", key, {}))
+
+    async def execute(self) -> None:
+        pass
+
+class _Redis:
+    def __init__(self):
+        self.calls: List[Tuple[str, Any, Dict[str, Any]]] = []
+
+    def pipeline(self, transaction: bool = True) -> _Pipeline:
+        return _Pipeline(self.calls)
+
+@pytest.mark.parametrize("ttl, expected", [(0.25, 250), (0.0001, 1), (3600, 3_600_000), (None, None)])
+async def test_redis_store_sets_ttl_in_milliseconds(ttl, expected):
+    redis = _Redis()
+    store = RedisExecutionStore(redis, ttl=ttl)
+    await store.put("e1", _fields("e1"), result={"n": 1}, terminal=True)
+    assert [kwargs for op, _, kwargs in redis.calls if op == "set"] == [{"px": expected}] * 2
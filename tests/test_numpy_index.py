@@ -0,0 +1,124 @@
+import numpy as np
+import pytest
+from qdrant_client.http import models
+
+from app.core.config import settings
+from app.services.vector.numpy_index import NumpyIndex
+from app.services.vector.qdrant_service import QdrantService
+
+@pytest.fixture
+def numpy_service(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "VECTOR_BACKEND", "numpy")
+    monkeypatch.setattr(settings, "VECTOR_INDEX_PATH", str(tmp_path))
+    return QdrantService()
+
+def _params(size: int = 4) -> models.VectorParams:
+    return models.VectorParams(size=size, distance=models.Distance.COSINE)
+
+async def test_service_uses_numpy_backend(numpy_service):
+    assert isinstance(numpy_service.client, NumpyIndex)
+
+    await numpy_service.create_collection("docs", vector_size=4)
+    await numpy_service.upsert_vectors(
+        "docs",
+        [[1, 0, 0, 0], [0, 1, 0, 0], [0.9, 0.1, 0, 0]],
+        payloads=[{"tag": "a"}, {"tag": "b"}, {"tag": "a"}],
+        ids=[1, 2, 3]
+    )
+
+    hits = await numpy_service.search_vectors("docs", [1, 0, 0, 0], limit=2)
+    assert [hit["id"] for hit in hits] == [1, 3]
+
+    filtered = await numpy_service.search_vectors(
+        "docs",
+        [1, 0, 0, 0],
+        limit=5,
+        query_filter={"must": [{"key": "tag", "match": {"value": "b"}}]}
+    )
+    assert [hit["id"] for hit in filtered] == [2]
+    await numpy_service.cleanup()
+
+async def test_writes_survive_a_crash_without_flush(tmp_path):
+    index = NumpyIndex(path=str(tmp_path))
+    await index.create_collection("docs", vectors_config=_params())
+    await index.upsert("docs", models.Batch(ids=[1, 2], vectors=[[1, 0, 0, 0], [0, 1, 0, 0]]))
+    await index.delete("docs", models.PointIdsList(points=[2]))
+    await index.upsert("docs", models.Batch(ids=[3], vectors=[[0, 0, 1, 0]], payloads=[{"n": 3}]))
+    # No flush() or close(): the process just goes away
+
+    reopened = NumpyIndex(path=str(tmp_path))
+    assert (await reopened.count("docs")).count == 2
+    hits = await reopened.search("docs", [0, 0, 1, 0], limit=1)
+    assert hits[0].id == 3
+    assert hits[0].payload == {"n": 3}
+
+async def test_torn_log_tail_is_dropped(tmp_path):
+    index = NumpyIndex(path=str(tmp_path))
+    await index.create_collection("docs", vectors_config=_params())
+    await index.upsert("docs", models.Batch(ids=[1], vectors=[[1, 0, 0, 0]]))
+    await index.upsert("docs", models.Batch(ids=[2], vectors=[[0, 1, 0, 0]]))
+    wal = next((tmp_path / "docs").glob("wal-*.log"))
+    wal.write_bytes(wal.read_bytes()[:-5])
+
+    reopened = NumpyIndex(path=str(tmp_path))
+    assert (await reopened.count("docs")).count == 1
+    await reopened.upsert("docs", models.Batch(ids=[4], vectors=[[0, 0, 0, 1]]))
+    assert (await NumpyIndex(path=str(tmp_path)).count("docs")).count == 2
+
+async def test_flush_keeps_one_versioned_snapshot(tmp_path):
+    index = NumpyIndex(path=str(tmp_path))
+    await index.create_collection("docs", vectors_config=_params())
+    await index.upsert("docs", models.Batch(ids=[1], vectors=[[1, 0, 0, 0]]))
+    await index.flush()
+    await index.upsert("docs", models.Batch(ids=[2], vectors=[[0, 1, 0, 0]]))
+    await index.close()
+
+    directory = tmp_path / "docs"
+    assert sorted(p.name for p in directory.iterdir()) == ["meta.json", "vectors-3.npy"]
+    reopened = NumpyIndex(path=str(tmp_path))
+    assert (await reopened.count("docs")).count == 2
+
+async def test_log_is_compacted_past_its_limit(tmp_path):
+    index = NumpyIndex(path=str(tmp_path), wal_max_bytes=256)
+    await index.create_collection("docs", vectors_config=_params())
+    for i in range(20):
+        await index.upsert("docs", models.Batch(ids=[i], vectors=[[1, i, 0, 0]]))
+
+    for wal in (tmp_path / "docs").glob("wal-*.log"):
+        assert wal.stat().st_size <= 256 + 128
+    assert (await NumpyIndex(path=str(tmp_path)).count("docs")).count == 20
+
+async def test_offloaded_search_matches_inline(tmp_path):
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((500, 8)).astype(np.float32)
+    inline = NumpyIndex()
+    offloaded = NumpyIndex(offload_above=0)
+    for index in (inline, offloaded):
+        await index.create_collection("docs", vectors_config=_params(8))
+        await index.upsert("docs", models.Batch(ids=list(range(500)), vectors=vectors))
+
+    query = vectors[7]
+    expected = await inline.search("docs", query, limit=10)
+    actual = await offloaded.search("docs", query, limit=10)
+    assert [hit.id for hit in actual] == [hit.id for hit in expected]
+    assert actual[0].id == 7
+
+async def test_writes_during_an_unfinished_snapshot_survive(tmp_path):
+    index = NumpyIndex(path=str(tmp_path))
+    await index.create_collection("docs", vectors_config=_params())
+    await index.upsert("docs", models.Batch(ids=[1], vectors=[[1, 0, 0, 0]]))
+    directory = tmp_path / "docs"
+    before = {name: (directory / name).read_bytes() for name in ("meta.json", "vectors-1.npy", "wal-1.log")}
+
+    await index.flush()
+    await index.upsert("docs", models.Batch(ids=[2], vectors=[[0, 1, 0, 0]]))
+    # Put back what was on disk before the snapshot's meta.json rename
+    for name, data in before.items():
+        (directory / name).write_bytes(data)
+
+    reopened = NumpyIndex(path=str(tmp_path))
+    assert (await reopened.count("docs")).count == 2
+    await reopened.upsert("docs", models.Batch(ids=[3], vectors=[[0, 0, 1, 0]]))
+    await reopened.close()
+    assert (await NumpyIndex(path=str(tmp_path)).count("docs")).count == 3
+    assert sorted(p.name for p in directory.iterdir()) == ["meta.json", "vectors-3.npy"]
@@ -0,0 +1,35 @@
+import time
+
+from app.services.vector.result_cache import SearchResultCache
+
+def _key(cache: SearchResultCache, collection: str = "docs") -> str:
+    return cache.key(collection, cache.generation(collection), [1.0, 0.0], 5, None, False)
+
+def test_entries_expire_after_ttl(monkeypatch):
+    cache = SearchResultCache(ttl=10.0)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    cache.set(_key(cache), [{"id": 1}])
+    assert cache.get(_key(cache)) == [{"id": 1}]
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+    assert cache.get(_key(cache)) is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["bytes"] == 0
+
+def test_unconfirmed_write_suspends_caching_until_confirmed():
+    cache = SearchResultCache(ttl=10.0)
+    cache.bump("docs", confirmed=False)
+    assert not cache.cacheable("docs")
+    assert cache.cacheable("other")
+
+    cache.bump("docs")
+    assert cache.cacheable("docs")
+
+def test_unconfirmed_write_is_trusted_after_ttl(monkeypatch):
+    cache = SearchResultCache(ttl=10.0)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    cache.bump("docs", confirmed=False)
+    monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+    assert cache.cacheable("docs")
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from app.services.ai.singleflight import SingleFlight
+
+class Upstream:
+    def __init__(self):
+        self.calls = 0
+        self.cancelled = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return "result"
+
+async def test_concurrent_callers_share_one_call():
+    flight, upstream = SingleFlight(), Upstream()
+    callers = [asyncio.create_task(flight.do(("generate", "p"), upstream)) for _ in range(5)]
+    await asyncio.sleep(0)
+    upstream.release.set()
+
+    assert await asyncio.gather(*callers) == ["result"] * 5
+    assert upstream.calls == 1
+    assert flight.stats()["generate"] == {"upstream_calls": 1, "saved_calls": 4, "in_flight": 0}
+
+async def test_one_cancelled_caller_does_not_cancel_the_others():
+    flight, upstream = SingleFlight(), Upstream()
+    first = asyncio.create_task(flight.do(("generate", "p"), upstream))
+    second = asyncio.create_task(flight.do(("generate", "p"), upstream))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    await asyncio.sleep(0)
+    upstream.release.set()
+
+    assert await second == "result"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    assert upstream.cancelled == 0
+
+async def test_call_is_cancelled_once_every_caller_is():
+    flight, upstream = SingleFlight(), Upstream()
+    callers = [asyncio.create_task(flight.do(("embed", "t"), upstream)) for _ in range(3)]
+    await asyncio.sleep(0)
+
+    for caller in callers:
+        caller.cancel()
+    await asyncio.gather(*callers, return_exceptions=True)
+    await asyncio.sleep(0)
+
+    assert upstream.cancelled == 1
+    assert flight.stats()["embed"]["in_flight"] == 0
+
+async def test_failure_is_shared_and_not_cached():
+    flight = SingleFlight()
+    attempts = 0
+
+    async def failing() -> str:
+        nonlocal attempts
+        attempts += 1
+        await asyncio.sleep(0)
+        raise RuntimeError("upstream down")
+
+    results = await asyncio.gather(
+        flight.do(("embed", "t"), failing), flight.do(("embed", "t"), failing), return_exceptions=True
+    )
+    assert all(isinstance(result, RuntimeError) for result in results)
+    with pytest.raises(RuntimeError):
+        await flight.do(("embed", "t"), failing)
+    assert attempts == 2
@@ -0,0 +1,97 @@
+from typing import AsyncIterator, List
+
+import httpx
+import numpy as np
+import pytest
+from fastapi import FastAPI
+
+from app.api.v1.endpoints import vector
+from app.core.config import settings
+from app.core.di import get_qdrant_service
+from app.services.vector.qdrant_service import QdrantService
+from app.services.vector.transfer import (
+    PointStreamReader,
+    encode_end,
+    encode_header,
+    encode_points,
+    export_header
+)
+
+POINTS = [
+    {"id": 1, "vector": [1.0, 0.0, 0.0], "payload": {"tag": "a"}},
+    {"id": 2, "vector": [0.0, 1.0, 0.0], "payload": None}
+]
+
+def _export(fmt: str, points: List[dict] = POINTS, count: int = len(POINTS)) -> bytes:
+    return (
+        encode_header(export_header("docs", 3, "Cosine"), fmt)
+        + encode_points(points, fmt)
+        + encode_end(count, fmt)
+    )
+
+async def _chunks(data: bytes, size: int = 7) -> AsyncIterator[bytes]:
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+async def _read(data: bytes, fmt: str) -> List[dict]:
+    reader = PointStreamReader(_chunks(data), fmt)
+    return [point async for point in reader.points()]
+
+@pytest.mark.parametrize("fmt", ["ndjson", "binary"])
+async def test_round_trip(fmt):
+    points = await _read(_export(fmt), fmt)
+    assert [p["id"] for p in points] == [1, 2]
+    assert [p["payload"] for p in points] == [{"tag": "a"}, None]
+    assert np.allclose(np.asarray(points[1]["vector"], dtype=np.float32), [0, 1, 0])
+
+@pytest.mark.parametrize("fmt", ["ndjson", "binary"])
+async def test_stream_without_end_record_is_rejected(fmt):
+    # Cut on a record boundary, so only the missing end record gives it away
+    data = encode_header(export_header("docs", 3, "Cosine"), fmt) + encode_points(POINTS, fmt)
+    with pytest.raises(ValueError, match="without its end record"):
+        await _read(data, fmt)
+
+@pytest.mark.parametrize("fmt", ["ndjson", "binary"])
+async def test_count_mismatch_is_rejected(fmt):
+    with pytest.raises(ValueError, match="end record says 3"):
+        await _read(_export(fmt, count=3), fmt)
+
+@pytest.mark.parametrize("fmt", ["ndjson", "binary"])
+async def test_data_after_end_record_is_rejected(fmt):
+    with pytest.raises(ValueError, match="after the end"):
+        await _read(_export(fmt) + encode_points(POINTS[:1], fmt), fmt)
+
+async def test_binary_point_without_id_is_a_value_error():
+    data = _export("binary", points=[{"vector": [1.0, 0.0, 0.0], "payload": {}, "id": None}], count=1)
+    with pytest.raises(ValueError, match="no id"):
+        await _read(data, "binary")
+
+@pytest.fixture
+async def api(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "VECTOR_BACKEND", "numpy")
+    monkeypatch.setattr(settings, "VECTOR_INDEX_PATH", str(tmp_path))
+    service = QdrantService()
+    app = FastAPI()
+    app.include_router(vector.router, prefix="/api/v1/vector")
+    app.dependency_overrides[get_qdrant_service] = lambda: service
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://autodev") as client:
+        yield client
+    await service.cleanup()
+
+@pytest.mark.parametrize("fmt", ["ndjson", "binary"])
+async def test_export_import_through_the_api(api, fmt):
+    response = await api.post("/api/v1/vector/collections/src/import", params={"format": fmt}, content=_export(fmt))
+    assert response.status_code == 200, response.text
+
+    exported = await api.get("/api/v1/vector/collections/src/export", params={"format": fmt})
+    assert exported.status_code == 200
+    assert exported.content.endswith(encode_end(2, fmt))
+
+    response = await api.post(
+        "/api/v1/vector/collections/copy/import", params={"format": fmt}, content=exported.content
+    )
+    assert response.status_code == 200
+    response = await api.post(
+        "/api/v1/vector/collections/cut/import", params={"format": fmt}, content=exported.content[:-3]
+    )
+    assert response.status_code == 400
@@ -0,0 +1,60 @@
+import httpx
+import numpy as np
+import orjson
+import pytest
+from qdrant_client.http import models
+
+from app.core.config import settings
+from app.core.exceptions import VectorCountError
+from app.services.vector.client import build_upsert_body
+from app.services.vector.qdrant_service import QdrantService
+
+def test_body_matches_the_client_batch():
+    matrix = np.random.default_rng(0).random((3, 4), dtype=np.float32)
+    ids = [1, 2, "5c56c793-69f3-4fbf-87e6-c4bf54c28c26"]
+    payloads = [{"i": 0}, {}, {"tag": "x"}]
+
+    body = orjson.loads(build_upsert_body(ids, matrix, payloads))["batch"]
+    expected = models.PointsBatch(batch=models.Batch(ids=ids, vectors=matrix.tolist(), payloads=payloads))
+    expected = orjson.loads(expected.model_dump_json(exclude_none=True))["batch"]
+    # float32 values are written in their shortest form, so compare them as float32
+    assert np.array_equal(np.asarray(body.pop("vectors"), dtype=np.float32), matrix)
+    expected.pop("vectors")
+    assert body == expected
+
+def test_body_omits_missing_payloads():
+    body = orjson.loads(build_upsert_body([1], np.zeros((1, 2), dtype=np.float32)))
+    assert body == {"batch": {"ids": [1], "vectors": [[0.0, 0.0]]}}
+
+async def test_count_mismatch_is_a_client_error(monkeypatch):
+    monkeypatch.setattr(settings, "VECTOR_BACKEND", "numpy")
+    monkeypatch.setattr(settings, "VECTOR_INDEX_PATH", None)
+    service = QdrantService()
+    await service.create_collection("docs", vector_size=2)
+
+    with pytest.raises(VectorCountError) as error:
+        await service.upsert_vectors("docs", [[1, 0], [0, 1]], payloads=[{}])
+    assert error.value.to_http_exception().status_code == 400
+    with pytest.raises(VectorCountError):
+        await service.bulk_upsert("docs", [[1, 0]], ids=[1, 2])
+
+async def test_rest_upserts_use_the_shared_client(monkeypatch):
+    monkeypatch.setattr(settings, "VECTOR_BACKEND", "qdrant")
+    monkeypatch.setattr(settings, "QDRANT_PREFER_GRPC", False)
+    requests = []
+
+    def qdrant(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={"result": {"operation_id": 0, "status": "completed"}, "status": "ok"})
+
+    shared = httpx.AsyncClient(base_url="http://qdrant:6333", transport=httpx.MockTransport(qdrant))
+    service = QdrantService(http_client=shared)
+    await service.rest.upsert("docs", [1], np.ones((1, 2), dtype=np.float32))
+    await service.cleanup()
+
+    assert requests[0].method == "PUT"
+    assert requests[0].url.path == "/collections/docs/points"
+    assert orjson.loads(requests[0].content) == {"batch": {"ids": [1], "vectors": [[1.0, 1.0]]}}
+    # The registry owns the client; the service must leave it open
+    assert not shared.is_closed
+    await shared.aclose()
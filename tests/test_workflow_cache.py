@@ -0,0 +1,157 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+
+import httpx
+import pytest
+
+from app.services.workflow.cache import WorkflowCache
+from app.services.workflow.workflow_service import WorkflowService
+
+class Upstream:
+    """A fetch that returns a new revision each call, optionally held until released."""
+    def __init__(self, gated: bool = False):
+        self.calls = 0
+        self.gate = asyncio.Event()
+        if not gated:
+            self.gate.set()
+
+    async def __call__(self) -> Dict[str, Any]:
+        self.calls += 1
+        revision = self.calls
+        await self.gate.wait()
+        return {"id": "wf-1", "revision": revision, "updatedAt": f"2026-01-0{revision}"}
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+async def test_stale_entry_is_served_while_refetching_in_background():
+    cache = WorkflowCache(ttl=0.05, stale_ttl=10.0)
+    upstream = Upstream()
+    key = WorkflowCache.workflow_key("wf-1")
+    assert (await cache.get(key, upstream))["revision"] == 1
+
+    await asyncio.sleep(0.1)
+    upstream.gate.clear()
+    # Stale: answered from the cache at once, with a refetch started behind it
+    stale = await asyncio.wait_for(cache.get(key, upstream), 0.5)
+    assert stale["revision"] == 1
+    assert upstream.calls == 2
+    # A second stale hit does not start another refetch
+    await cache.get(key, upstream)
+    assert upstream.calls == 2
+
+    upstream.gate.set()
+    await _settle()
+    assert (await cache.get(key, upstream))["revision"] == 2
+    stats = cache.stats()
+    assert (stats["misses"], stats["stale_hits"], stats["hits"], stats["revalidations"]) == (1, 2, 1, 1)
+    await cache.close()
+
+async def test_entry_past_stale_ttl_waits_for_a_fresh_copy():
+    cache = WorkflowCache(ttl=0.02, stale_ttl=0.05)
+    upstream = Upstream()
+    key = WorkflowCache.workflow_key("wf-1")
+    await cache.get(key, upstream)
+
+    await asyncio.sleep(0.1)
+    assert (await cache.get(key, upstream))["revision"] == 2
+    assert cache.stats()["misses"] == 2
+    await cache.close()
+
+async def test_concurrent_misses_share_one_fetch():
+    cache = WorkflowCache()
+    upstream = Upstream(gated=True)
+    key = WorkflowCache.workflow_key("wf-1")
+    callers = [asyncio.create_task(cache.get(key, upstream)) for _ in range(3)]
+    await _settle()
+    upstream.gate.set()
+
+    results = await asyncio.gather(*callers)
+    assert upstream.calls == 1
+    assert [r["revision"] for r in results] == [1, 1, 1]
+    # Each caller gets its own copy
+    results[0]["revision"] = 99
+    assert (await cache.get(key, upstream))["revision"] == 1
+    await cache.close()
+
+async def test_fetch_in_flight_during_invalidate_is_not_stored():
+    cache = WorkflowCache()
+    upstream = Upstream(gated=True)
+    key = WorkflowCache.workflow_key("wf-1")
+    caller = asyncio.create_task(cache.get(key, upstream))
+    await _settle()
+
+    cache.invalidate("wf-1")
+    upstream.gate.set()
+    # The caller still gets its answer, but the pre-write copy is not kept
+    assert (await caller)["revision"] == 1
+    assert cache.stats()["entries"] == 0
+    assert (await cache.get(key, upstream))["revision"] == 2
+    assert upstream.calls == 2
+    await cache.close()
+
+async def test_refetch_with_same_updated_at_keeps_the_cached_copy():
+    cache = WorkflowCache(ttl=0.02, stale_ttl=10.0)
+    key = WorkflowCache.workflow_key("wf-1")
+
+    async def fetch() -> Dict[str, Any]:
+        return {"id": "wf-1", "updatedAt": "2026-01-01"}
+
+    await cache.get(key, fetch)
+    await asyncio.sleep(0.05)
+    await cache.get(key, fetch)
+    await _settle()
+    assert cache.stats()["unchanged"] == 1
+    # Revalidated, so fresh again
+    await cache.get(key, fetch)
+    assert cache.stats()["hits"] == 1
+    await cache.close()
+
+class FakeWorkflows:
+    """n8n's GET /workflows, paged by cursor."""
+    def __init__(self, ids: List[str], page_size: int):
+        self.ids = ids
+        self.page_size = page_size
+        self.cursors: List[Optional[str]] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path != "/api/v1/workflows":
+            return httpx.Response(404)
+        cursor = request.url.params.get("cursor")
+        self.cursors.append(cursor)
+        start = int(cursor) if cursor else 0
+        end = start + self.page_size
+        return httpx.Response(200, json={
+            "data": [{"id": i, "updatedAt": "2026-01-01"} for i in self.ids[start:end]],
+            "nextCursor": str(end) if end < len(self.ids) else None
+        })
+
+@pytest.fixture
+async def workflows():
+    n8n = FakeWorkflows([f"wf-{i}" for i in range(5)], page_size=2)
+    service = WorkflowService(
+        base_url="http://n8n",
+        http_client=httpx.AsyncClient(base_url="http://n8n/api/v1", transport=httpx.MockTransport(n8n))
+    )
+    yield service, n8n
+    await service.cleanup()
+
+async def test_list_workflows_returns_one_page_with_its_cursor(workflows):
+    service, n8n = workflows
+    page = await service.list_workflows(limit=2)
+    assert [w["id"] for w in page["data"]] == ["wf-0", "wf-1"]
+    assert page["nextCursor"] == "2"
+
+    following = await service.list_workflows(limit=2, cursor=page["nextCursor"])
+    assert [w["id"] for w in following["data"]] == ["wf-2", "wf-3"]
+
+async def test_iter_workflows_follows_cursors(workflows):
+    service, n8n = workflows
+    collected = [w["id"] async for w in service.iter_workflows()]
+    assert collected == [f"wf-{i}" for i in range(5)]
+    assert n8n.cursors == [None, "2", "4"]
+
+    # Pages are cached, so a second walk does not go back to n8n
+    assert [w["id"] async for w in service.iter_workflows()] == collected
+    assert len(n8n.cursors) == 3
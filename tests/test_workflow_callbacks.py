@@ -0,0 +1,175 @@
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.api.v1.endpoints import workflow
+from app.core.config import settings
+from app.core.di import get_workflow_service
+from app.services.workflow.store import SQLiteExecutionStore
+from app.services.workflow.workflow_service import WorkflowService, WorkflowStatus
+
+class FakeN8N:
+    """Just enough of n8n's public API: execute, the running list and execution lookups."""
+    def __init__(self):
+        self.started: Dict[str, Dict[str, Any]] = {}
+        self.workflows: Dict[str, str] = {}
+        self.finished: Dict[str, Dict[str, Any]] = {}
+        self.requests = 0
+
+    def finish(self, execution_id: str, data: Dict[str, Any]) -> None:
+        self.finished[execution_id] = {"id": execution_id, "finished": True, "success": True, "data": data}
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        parts = request.url.path.strip("/").split("/")[2:]
+        if request.method == "POST" and parts[0] == "workflows" and parts[2:] == ["execute"]:
+            execution_id = str(len(self.started) + 1)
+            self.started[execution_id] = httpx.Response(200, content=request.content).json()
+            self.workflows[execution_id] = parts[1]
+            return httpx.Response(200, json={"executionId": execution_id})
+        if parts == ["executions"]:
+            workflow_id = request.url.params.get("workflowId")
+            running = [
+                {"id": execution_id} for execution_id, owner in self.workflows.items()
+                if owner == workflow_id and execution_id not in self.finished
+            ]
+            return httpx.Response(200, json={"data": running, "nextCursor": None})
+        if parts[0] == "executions" and len(parts) == 2:
+            status = self.finished.get(parts[1], {"id": parts[1], "finished": False})
+            return httpx.Response(200, json=status)
+        return httpx.Response(404)
+
+@pytest.fixture
+def n8n():
+    return FakeN8N()
+
+@pytest.fixture
+async def service(n8n):
+    service = WorkflowService(
+        base_url="http://n8n",
+        http_client=httpx.AsyncClient(base_url="http://n8n/api/v1", transport=httpx.MockTransport(n8n)),
+        callback_url="http://autodev/api/v1/workflow"
+    )
+    yield service
+    await service.cleanup()
+
+@pytest.fixture
+async def api(service):
+    app = FastAPI()
+    app.include_router(workflow.router, prefix="/api/v1/workflow")
+    app.dependency_overrides[get_workflow_service] = lambda: service
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://autodev") as client:
+        yield client
+
+async def _started(service: WorkflowService, n8n: FakeN8N) -> Dict[str, Any]:
+    execution = await service.execute_workflow("wf-1", {"x": 1})
+    for _ in range(100):
+        if n8n.started:
+            break
+        await asyncio.sleep(0.01)
+    payload = n8n.started["1"]
+    assert payload["callback"]["url"] == f"http://autodev/api/v1/workflow/executions/{execution.id}/callback"
+    return {"id": execution.id, "token": payload["callback"]["token"]}
+
+async def _callback(api: httpx.AsyncClient, execution_id: Any, token: Optional[str]) -> httpx.Response:
+    headers = {"X-Callback-Token": token} if token is not None else {}
+    return await api.post(
+        f"/api/v1/workflow/executions/{execution_id}/callback",
+        json={"success": True, "data": {"answer": 42}},
+        headers=headers
+    )
+
+async def test_callback_with_token_completes_execution(service, n8n, api):
+    started = await _started(service, n8n)
+
+    response = await _callback(api, started["id"], started["token"])
+    assert response.status_code == 200
+    assert response.json()["execution_status"] == "completed"
+
+    execution = await service.get_workflow_execution(started["id"])
+    assert execution.status == WorkflowStatus.COMPLETED
+    assert execution.result == {"answer": 42}
+    assert service.dispatcher.stats()["running"] == 0
+
+@pytest.mark.parametrize("token", ["not-the-token", None])
+async def test_callback_with_wrong_or_missing_token_is_rejected(service, n8n, api, token):
+    started = await _started(service, n8n)
+
+    response = await _callback(api, started["id"], token)
+    assert response.status_code == 401
+    execution = await service.get_workflow_execution(started["id"])
+    assert execution.status == WorkflowStatus.RUNNING
+
+async def test_wait_is_woken_by_callback(service, n8n, api, monkeypatch):
+    # Long enough that only the callback, not a store recheck, can end the wait in time
+    monkeypatch.setattr(settings, "WORKFLOW_WAIT_RECHECK", 10.0)
+    started = await _started(service, n8n)
+
+    began = time.monotonic()
+    waiting = asyncio.create_task(api.get(f"/api/v1/workflow/executions/{started['id']}", params={"wait": 20}))
+    await asyncio.sleep(0.1)
+    assert not waiting.done()
+
+    await _callback(api, started["id"], started["token"])
+    response = await asyncio.wait_for(waiting, 2.0)
+    assert response.json()["status"] == "completed"
+    assert time.monotonic() - began < 2.0
+    assert service._waiters == {}
+
+async def test_reconcile_poll_finishes_execution_without_callback(n8n, monkeypatch):
+    monkeypatch.setattr(settings, "N8N_RECONCILE_INTERVAL", 0.05)
+    service = WorkflowService(
+        base_url="http://n8n",
+        http_client=httpx.AsyncClient(base_url="http://n8n/api/v1", transport=httpx.MockTransport(n8n)),
+        callback_url="http://autodev/api/v1/workflow"
+    )
+    try:
+        started = await _started(service, n8n)
+        n8n.finish("1", {"answer": 7})
+
+        execution = await service.wait_for_execution(started["id"], 2.0)
+        assert execution.status == WorkflowStatus.COMPLETED
+        assert execution.result == {"answer": 7}
+        assert service.poller.stats()["finished"] == 1
+    finally:
+        await service.cleanup()
+
+async def test_wait_timeout_leaves_no_waiter(service, n8n):
+    started = await _started(service, n8n)
+
+    execution = await service.wait_for_execution(started["id"], 0.05)
+    assert execution.status == WorkflowStatus.RUNNING
+    assert service._waiters == {}
+    assert service._waiting == {}
+
+async def test_callback_on_another_worker_frees_the_slot(n8n, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "WORKFLOW_SLOT_RECHECK", 0.05)
+    path = str(tmp_path / "executions.db")
+    workers = [
+        WorkflowService(
+            base_url="http://n8n",
+            http_client=httpx.AsyncClient(base_url="http://n8n/api/v1", transport=httpx.MockTransport(n8n)),
+            callback_url="http://autodev/api/v1/workflow",
+            store=SQLiteExecutionStore(path)
+        )
+        for _ in range(2)
+    ]
+    origin, other = workers
+    try:
+        started = await _started(origin, n8n)
+        assert origin.dispatcher.stats()["running"] == 1
+
+        await other.complete_execution(started["id"], started["token"], {"success": True, "data": {}})
+        for _ in range(100):
+            if origin.dispatcher.stats()["running"] == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert origin.dispatcher.stats()["running"] == 0
+        assert origin.poller.stats()["pending"] == 0
+    finally:
+        for worker in workers:
+            await worker.cleanup()